@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Benchmarks import the application the same way it is started in production (from inside `src/`)
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
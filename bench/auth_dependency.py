@@ -0,0 +1,125 @@
+"""
+Overhead of authenticating a request: `get_current_principal` with the revocation filter, compared to decoding
+the token alone and to checking revocations with a database query per request.
+
+    python -m bench.auth_dependency --revoked 100000 --iterations 5000
+
+Fills `token_revocations` with `--revoked` unexpired revocations and synchronizes the filter once, then measures
+with a token that has not been revoked (the case of almost every request):
+
+- `decode`: verifying the JWT, the floor of any check
+- `filter`: `get_current_principal`, the JWT and a lookup in the Bloom filter
+- `database`: the JWT and a `token_revocations` lookup through the connection pool, as a per-request check would
+
+Also reports the cost of a filter lookup alone and the share of random token IDs the filter reports as revoked,
+each of which would cost a query. Requires a running Postgres configured through `.env` (tables are created if
+they do not exist), the revocations created for the run are removed afterwards.
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import statistics
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, List
+
+from bench.utils import summarize
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--revoked", type=int, default=100_000, help="Unexpired revocations in the table")
+    parser.add_argument("--iterations", type=int, default=5000, help="Calls measured per variant")
+    parser.add_argument("--probes", type=int, default=200_000, help="Random IDs looked up in the filter")
+    return parser.parse_args()
+
+
+async def measure(call: Callable[[], Awaitable[object]], iterations: int) -> Dict[str, float]:
+    for _ in range(min(iterations, 100)):
+        await call()
+    latencies: List[float] = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        await call()
+        latencies.append(time.perf_counter() - started)
+    return {**summarize(latencies), "mean_us": round(statistics.fmean(latencies) * 1e6, 2)}
+
+
+async def run(args: argparse.Namespace) -> Dict[str, object]:
+    from sqlalchemy import delete, insert
+
+    from auth import security
+    from auth.current_user import get_current_principal
+    from auth.revocation import revocation_list
+    from core.database import async_session_maker, engine, metadata
+    from models import TokenRevocationModel
+    from repositories.token_repository import TokenRepository
+
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata.create_all)
+
+    expires_at = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(hours=1)
+    revoked = [uuid.uuid4() for _ in range(args.revoked)]
+    async with async_session_maker() as session:
+        for start in range(0, len(revoked), 10_000):
+            rows = [{"jti": jti, "expires_at": expires_at} for jti in revoked[start : start + 10_000]]
+            await session.execute(insert(TokenRevocationModel), rows)
+        await session.commit()
+
+    try:
+        started = time.perf_counter()
+        await revocation_list.sync()
+        sync_s = time.perf_counter() - started
+
+        token = security.create_access_token(
+            data={"sub": str(uuid.uuid4()), "sid": str(uuid.uuid4())}, expires_delta=datetime.timedelta(hours=1)
+        )
+
+        async def decode() -> None:
+            security.jwt_codec.decode(token)
+
+        async def database() -> None:
+            payload = security.jwt_codec.decode(token)
+            async with async_session_maker() as session:
+                await TokenRepository(session).is_revoked(uuid.UUID(payload["jti"]))
+
+        report: Dict[str, object] = {
+            "revoked": args.revoked,
+            "initial_sync_s": round(sync_s, 3),
+            "decode": await measure(decode, args.iterations),
+            "filter": await measure(lambda: get_current_principal(token), args.iterations),
+            "database": await measure(database, args.iterations),
+        }
+
+        bloom = revocation_list._filter
+        probes = [uuid.uuid4() for _ in range(args.probes)]
+        started = time.perf_counter()
+        hits = sum(jti in bloom for jti in probes)
+        lookup_ns = (time.perf_counter() - started) / args.probes * 1e9
+        report["filter_lookup_ns"] = round(lookup_ns)
+        report["filter_false_positive_rate"] = hits / args.probes
+        report["filter_bytes"] = (bloom.size + 7) // 8
+        report["filter_hashes"] = bloom.hashes
+        return report
+    finally:
+        async with async_session_maker() as session:
+            for start in range(0, len(revoked), 10_000):
+                batch = revoked[start : start + 10_000]
+                await session.execute(delete(TokenRevocationModel).where(TokenRevocationModel.jti.in_(batch)))
+            await session.commit()
+        await engine.dispose()
+
+
+def main(args: argparse.Namespace) -> None:
+    # Settings are read at import time: only the explicit synchronization of the run may query the table
+    os.environ["REVOCATION_SYNC_INTERVAL"] = "3600"
+    # Every call verifies the token, the cache of decoded tokens is measured by `bench.jwt_codecs`
+    os.environ["DECODED_TOKEN_CACHE_SIZE"] = "0"
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main(parse_args())
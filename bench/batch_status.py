@@ -0,0 +1,129 @@
+"""
+Triage of a popular position: one request per application vs a single batch request.
+
+    python -m bench.batch_status --applications 500
+
+Every application is decided once through `POST /api/v1/applications/{id}/approved|rejected` and once (on
+a fresh set of applications) through `POST /api/v1/positions/{id}/applications:batch`. The application is
+driven in-process through `httpx.ASGITransport` against the database configured through `.env` (run
+`alembic upgrade head` first). Seeded rows are removed afterwards.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from datetime import timedelta
+from typing import List, Tuple
+from uuid import UUID, uuid4
+
+from bench.utils import summarize
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--applications", type=int, default=500, help="Applications decided by each method")
+    parser.add_argument("--approve-ratio", type=float, default=0.2, help="Share of approvals among decisions")
+    return parser.parse_args()
+
+
+async def main(args: argparse.Namespace) -> None:
+    from httpx import ASGITransport, AsyncClient
+    from sqlalchemy import delete, insert
+
+    from auth.security import create_access_token
+    from core.database import async_session_maker, engine
+    from main import app
+    from models import ApplicationModel, PositionModel, ProjectModel, UserModel
+    from models.project import Difficulty
+
+    owner_id, project_id = uuid4(), uuid4()
+    applicant_ids = [uuid4() for _ in range(args.applications)]
+    approvals = int(args.applications * args.approve_ratio)
+
+    async def seed_position() -> Tuple[UUID, List[UUID]]:
+        position_id = uuid4()
+        application_ids = [uuid4() for _ in applicant_ids]
+        async with async_session_maker() as session:
+            await session.execute(
+                insert(PositionModel).values(id=position_id, name="Bench", project_id=project_id, count=approvals)
+            )
+            await session.execute(
+                insert(ApplicationModel),
+                [
+                    {"id": id_, "user_id": user_id, "position_id": position_id, "message": "Bench"}
+                    for id_, user_id in zip(application_ids, applicant_ids)
+                ],
+            )
+            await session.commit()
+        return position_id, application_ids
+
+    def decide(index: int) -> str:
+        return "APPROVED" if index < approvals else "REJECTED"
+
+    async with async_session_maker() as session:
+        await session.execute(
+            insert(UserModel),
+            [
+                {"id": id_, "email": f"{id_}@bench", "username": str(id_), "hashed_password": "-"}
+                for id_ in (owner_id, *applicant_ids)
+            ],
+        )
+        await session.execute(
+            insert(ProjectModel).values(
+                id=project_id,
+                name="Bench",
+                description="Seeded by bench.batch_status",
+                difficulty=Difficulty.EASY,
+                owner_id=owner_id,
+            )
+        )
+        await session.commit()
+
+    token = create_access_token(data={"sub": str(owner_id)}, expires_delta=timedelta(hours=1))
+    headers = {"Authorization": f"Bearer {token}"}
+
+    try:
+        async with AsyncClient(transport=ASGITransport(app), base_url="http://bench") as client:
+            position_id, application_ids = await seed_position()
+            latencies: List[float] = []
+            started = time.perf_counter()
+            for index, application_id in enumerate(application_ids):
+                action = decide(index).lower()
+                call_started = time.perf_counter()
+                response = await client.post(f"/api/v1/applications/{application_id}/{action}", headers=headers)
+                latencies.append(time.perf_counter() - call_started)
+                assert response.status_code == 200, response.text
+            individual_s = time.perf_counter() - started
+
+            position_id, application_ids = await seed_position()
+            decisions = [
+                {"application_id": str(application_id), "status": decide(index)}
+                for index, application_id in enumerate(application_ids)
+            ]
+            started = time.perf_counter()
+            response = await client.post(
+                f"/api/v1/positions/{position_id}/applications:batch", headers=headers, json={"decisions": decisions}
+            )
+            batch_s = time.perf_counter() - started
+            assert response.status_code == 200, response.text
+            assert all(result["success"] for result in response.json())
+    finally:
+        async with async_session_maker() as session:
+            await session.execute(delete(ApplicationModel).where(ApplicationModel.user_id.in_(applicant_ids)))
+            await session.execute(delete(ProjectModel).where(ProjectModel.id == project_id))
+            await session.execute(delete(UserModel).where(UserModel.id.in_([owner_id, *applicant_ids])))
+            await session.commit()
+        await engine.dispose()
+
+    report = {
+        "applications": args.applications,
+        "approvals": approvals,
+        "individual": {"elapsed_s": round(individual_s, 3), "per_call": summarize(latencies)},
+        "batch": {"elapsed_s": round(batch_s, 3)},
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
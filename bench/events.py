@@ -0,0 +1,80 @@
+"""
+Fan-out of outbox notifications to idle event streams of a worker.
+
+    python -m bench.events --subscribers 5000 --events 2000
+
+Subscribes `--subscribers` streams of distinct users to one broadcaster (a single listening connection), then
+commits `--events` outbox events addressed to random subscribers one by one. Reports the latency from the start
+of the commit to the message reaching the queue of the stream, and the memory held by every idle subscription. Uses the
+database configured through `.env` (run `alembic upgrade head` first), the events are removed afterwards.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import tracemalloc
+from typing import Dict, List
+from uuid import uuid4
+
+from bench.utils import summarize
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--subscribers", type=int, default=5000, help="Idle streams of distinct users")
+    parser.add_argument("--events", type=int, default=2000, help="Events committed one by one")
+    return parser.parse_args()
+
+
+async def main(args: argparse.Namespace) -> None:
+    from sqlalchemy import delete, insert
+
+    from core.database import async_session_maker, engine
+    from core.events import EventBroadcaster
+    from models import OutboxEventModel
+    from models.outbox import APPLICATION_APPROVED
+    from settings import settings
+
+    rng = random.Random(0)
+    broadcaster = EventBroadcaster(settings.postgres.dsn, queue_size=args.events + 1)
+    await broadcaster.start()
+
+    user_ids = [str(uuid4()) for _ in range(args.subscribers)]
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    subscriptions = {user_id: broadcaster.subscribe(user_id) for user_id in user_ids}
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies: List[float] = []
+    try:
+        for _ in range(args.events):
+            user_id = rng.choice(user_ids)
+            async with async_session_maker() as session:
+                payload = {"bench": True, "application_id": str(uuid4()), "user_id": user_id}
+                await session.execute(insert(OutboxEventModel).values(event_type=APPLICATION_APPROVED, payload=payload))
+                # Notifications are sent during the commit, they may arrive before it returns
+                committing = time.perf_counter()
+                await session.commit()
+            assert await subscriptions[user_id].get(timeout=5) is not None, "Event has not been pushed"
+            latencies.append(time.perf_counter() - committing)
+    finally:
+        await broadcaster.close()
+        async with async_session_maker() as session:
+            await session.execute(delete(OutboxEventModel).where(OutboxEventModel.payload.has_key("bench")))
+            await session.commit()
+        await engine.dispose()
+
+    report: Dict = {
+        "subscribers": args.subscribers,
+        "events": args.events,
+        "bytes_per_subscription": round((after - before) / args.subscribers),
+        "commit_to_push": summarize(latencies),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,73 @@
+"""
+Time it takes to import the application, as a fresh worker process does on start.
+
+    python -m bench.import_time --repeat 20
+
+Every run imports `main` in a new interpreter with `-X importtime`. Reports the cumulative import time of
+`main`, the time spent in the schema modules themselves (they build their pydantic models at import time)
+and the modules with the longest own import time.
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+from bench.utils import percentile, summarize
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+TOP = 10
+# import time:       self [us] |  cumulative | imported package
+LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20, help="Number of fresh interpreters")
+    return parser.parse_args()
+
+
+def import_times() -> Dict[str, Tuple[float, float]]:
+    """Own and cumulative import time in seconds of every module imported by `import main`"""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=SRC,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in completed.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            times[match.group(4)] = (int(match.group(1)) / 1_000_000, int(match.group(2)) / 1_000_000)
+    return times
+
+
+def main(args: argparse.Namespace) -> None:
+    main_: List[float] = []
+    schemas: List[float] = []
+    own: Dict[str, List[float]] = defaultdict(list)
+    for _ in range(args.repeat):
+        times = import_times()
+        main_.append(times["main"][1])
+        schemas.append(sum(self_ for module, (self_, _) in times.items() if module.split(".")[0] == "schemas"))
+        for module, (self_, _) in times.items():
+            own[module].append(self_)
+
+    slowest = sorted(own, key=lambda module: percentile(own[module], 50), reverse=True)[:TOP]
+    report = {
+        "repeat": args.repeat,
+        "main": summarize(main_),
+        "schemas_own": summarize(schemas),
+        "slowest_own_p50_ms": {module: round(percentile(own[module], 50) * 1000, 3) for module in slowest},
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main(parse_args())
@@ -0,0 +1,243 @@
+"""
+Mixed workload (login, browse, apply, approve) against the whole API with a report per route.
+
+    python -m bench.load --duration 60 --concurrency 50 --output load.json
+    python -m bench.load --base-url http://localhost:9999 --output load.json
+
+Without `--base-url` the application is driven in-process through `httpx.ASGITransport`, with it the requests
+go to a running server (e.g. gunicorn started by `docker compose up`) which must use the database configured
+through `.env`. Data seeded by `bench.seed` is reused, if there is none it is seeded with the given sizes first
+and kept, so consecutive runs work on the same data (`python -m bench.seed --remove` deletes it). The report
+is written with sorted keys, so reports of two commits can be compared with `diff`.
+
+The virtual users log in far more often than the rate limits of login allow, and in-process they all come from
+the same address: the in-process app runs with the rate limiter disabled. A server driven through `--base-url`
+has to be started with `RATE_LIMIT_ENABLED=false`, the report counts the requests it rejected with 429.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from bench.seed import SEED_PASSWORD, Dataset, add_size_arguments, load_dataset, seed, sizes_from_args
+from bench.utils import summarize
+
+DEFAULT_MIX = "login=1,browse=14,apply=3,approve=2"
+
+
+def parse_mix(value: str) -> Dict[str, int]:
+    mix = {}
+    for item in value.split(","):
+        action, _, weight = item.partition("=")
+        if action not in VirtualUser.ACTIONS or not weight.isdigit():
+            raise argparse.ArgumentTypeError(f"Expected action=weight with one of {', '.join(VirtualUser.ACTIONS)}")
+        mix[action] = int(weight)
+    return mix
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", help="URL of a running server, the app is run in-process if omitted")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds the workload runs for")
+    parser.add_argument("--concurrency", type=int, default=20, help="Number of simulated users")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX), help="Weights of the actions")
+    parser.add_argument("--think-time", type=float, default=0, help="Seconds a user waits between actions")
+    parser.add_argument("--output", default="load-report.json", help="Path of the JSON report")
+    parser.add_argument("--seed", type=int, default=42)
+    add_size_arguments(parser)
+    return parser.parse_args()
+
+
+class Recorder:
+    """Latencies and statuses of requests, grouped by route template"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Counter] = defaultdict(Counter)
+
+    async def request(self, client, method: str, route: str, url: Optional[str] = None, **kwargs: Any):
+        """
+        Sends a request and records it under `METHOD route`, `url` defaults to the route itself.
+
+        Transport failures are recorded with the `error` status and None is returned.
+        """
+        import httpx
+
+        key = f"{method} {route}"
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url or route, **kwargs)
+        except httpx.HTTPError:
+            self.statuses[key]["error"] += 1
+            return None
+        finally:
+            self.latencies[key].append(time.perf_counter() - started)
+        self.statuses[key][str(response.status_code)] += 1
+        return response
+
+    def report(self, elapsed: float) -> Dict[str, Dict]:
+        routes = {}
+        for key, latencies in self.latencies.items():
+            statuses = self.statuses[key]
+            routes[key] = {
+                **summarize(latencies),
+                "throughput_rps": round(len(latencies) / elapsed, 2),
+                "statuses": dict(statuses),
+                "errors": sum(count for code, count in statuses.items() if code == "error" or code.startswith("5")),
+            }
+        return routes
+
+
+class VirtualUser:
+    """One seeded user going through the actions of the mix, one request at a time"""
+
+    ACTIONS = ("login", "browse", "apply", "approve")
+
+    def __init__(self, client, recorder: Recorder, dataset: Dataset, user_id: UUID, rng: random.Random):
+        self._client = client
+        self._recorder = recorder
+        self._dataset = dataset
+        self._user_id = user_id
+        self._rng = rng
+        self._headers: Dict[str, str] = {}
+
+    async def login(self) -> None:
+        response = await self._recorder.request(
+            self._client,
+            "POST",
+            "/api/v1/auth/login",
+            data={"username": self._dataset.emails[self._user_id], "password": SEED_PASSWORD},
+        )
+        if response is not None and response.status_code == 200:
+            self._headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    async def browse(self) -> None:
+        response = await self._recorder.request(self._client, "GET", "/api/v1/projects/", params={"limit": 20})
+        if response is not None and "X-Next-Cursor" in response.headers and self._rng.random() < 0.3:
+            await self._recorder.request(
+                self._client,
+                "GET",
+                "/api/v1/projects/",
+                params={"limit": 20, "cursor": response.headers["X-Next-Cursor"]},
+            )
+
+        project_id = self._rng.choice(self._dataset.project_ids)
+        await self._recorder.request(
+            self._client,
+            "GET",
+            "/api/v1/projects/{project_id}",
+            f"/api/v1/projects/{project_id}",
+            params={"include": "positions,vacancies"} if self._rng.random() < 0.5 else None,
+        )
+        await self._recorder.request(
+            self._client, "GET", "/api/v1/projects/{project_id}/positions", f"/api/v1/projects/{project_id}/positions"
+        )
+
+        if self._dataset.vocabulary and self._rng.random() < 0.5:
+            # Frequent words are looked for more often than rare ones
+            rank = min(int(self._rng.expovariate(1 / 50)), len(self._dataset.vocabulary) - 1)
+            word = self._dataset.vocabulary[rank]
+            await self._recorder.request(self._client, "GET", "/api/v1/search/projects", params={"q": word})
+
+    async def apply(self) -> None:
+        if not self._headers:
+            await self.login()
+        position_id = self._rng.choice(self._dataset.position_ids)
+        if self._dataset.positions[position_id] == self._user_id:
+            return
+        await self._recorder.request(
+            self._client,
+            "POST",
+            "/api/v1/positions/{position_id}/applications",
+            f"/api/v1/positions/{position_id}/applications",
+            headers=self._headers,
+            json={"message": "Seeded by bench.load"},
+        )
+
+    async def approve(self) -> None:
+        pending = self._dataset.pending_applications.get(self._user_id)
+        if not pending:
+            return await self.browse()
+        if not self._headers:
+            await self.login()
+        application_id = pending.pop()
+        action = "approved" if self._rng.random() < 0.5 else "rejected"
+        await self._recorder.request(
+            self._client,
+            "POST",
+            f"/api/v1/applications/{{application_id}}/{action}",
+            f"/api/v1/applications/{application_id}/{action}",
+            headers=self._headers,
+        )
+
+    async def run(self, mix: Dict[str, int], deadline: float, think_time: float) -> None:
+        actions = [getattr(self, action) for action in mix]
+        weights = list(mix.values())
+        await self.login()
+        while time.perf_counter() < deadline:
+            await self._rng.choices(actions, weights=weights)[0]()
+            if think_time:
+                await asyncio.sleep(think_time)
+
+
+async def main(args: argparse.Namespace) -> None:
+    # Settings are read at import time, so the limiter has to be disabled before the app is imported
+    os.environ["RATE_LIMIT_ENABLED"] = "false"
+
+    from httpx import ASGITransport, AsyncClient, Limits
+
+    from core.database import engine
+
+    dataset = await load_dataset()
+    if not dataset.projects:
+        dataset = await seed(sizes_from_args(args), random.Random(args.seed))
+    await engine.dispose()
+
+    if args.base_url:
+        client = AsyncClient(base_url=args.base_url, timeout=30, limits=Limits(max_connections=args.concurrency))
+    else:
+        from main import app
+
+        client = AsyncClient(transport=ASGITransport(app), base_url="http://bench", timeout=30)
+
+    rng = random.Random(args.seed)
+    # Owners of pending applications are able to go through every action of the mix
+    identities = list(dataset.pending_applications) or list(dataset.emails)
+    recorder = Recorder()
+    async with client:
+        users = [
+            VirtualUser(client, recorder, dataset, rng.choice(identities), random.Random(rng.random()))
+            for _ in range(args.concurrency)
+        ]
+        started = time.perf_counter()
+        deadline = started + args.duration
+        await asyncio.gather(*(user.run(args.mix, deadline, args.think_time) for user in users))
+        elapsed = time.perf_counter() - started
+    await engine.dispose()
+
+    routes = recorder.report(elapsed)
+    requests = sum(route["count"] for route in routes.values())
+    report = {
+        "target": args.base_url or "asgi",
+        "duration_s": round(elapsed, 1),
+        "concurrency": args.concurrency,
+        "mix": args.mix,
+        "data": dataset.counts(),
+        "requests": requests,
+        "throughput_rps": round(requests / elapsed, 2),
+        "rate_limited": sum(route["statuses"].get("429", 0) for route in routes.values()),
+        "routes": routes,
+    }
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2, sort_keys=True)
+    print(json.dumps({"output": args.output, "requests": requests, "throughput_rps": report["throughput_rps"]}))
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,105 @@
+"""
+Latency of `GET /api/health` while a storm of logins is running.
+
+The application is driven in-process through `httpx.ASGITransport`, so health probes share the event loop
+with the logins exactly like they do inside a single uvicorn worker. Compare the blocking behaviour with the
+pooled one by switching the executor:
+
+    python -m bench.login_storm --executor inline
+    python -m bench.login_storm --executor thread
+
+Requires a running Postgres configured through `.env` (tables are created if they do not exist).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from collections import Counter
+from typing import List
+
+from bench.utils import summarize
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--executor", choices=("inline", "thread", "process"), default="thread")
+    parser.add_argument("--workers", type=int, default=2, help="Size of the password hashing pool")
+    parser.add_argument("--queue-size", type=int, default=32, help="Operations allowed to wait for the pool")
+    parser.add_argument("--logins", type=int, default=200, help="Total number of login requests")
+    parser.add_argument("--concurrency", type=int, default=50, help="Logins in flight at the same time")
+    parser.add_argument("--probe-interval", type=float, default=0.01, help="Seconds between health probes")
+    return parser.parse_args()
+
+
+async def main(args: argparse.Namespace) -> None:
+    # Settings are read at import time, so the pool has to be configured before the app is imported
+    os.environ["PASSWORD_HASHING_EXECUTOR"] = args.executor
+    os.environ["PASSWORD_HASHING_WORKERS"] = str(args.workers)
+    os.environ["PASSWORD_HASHING_QUEUE_SIZE"] = str(args.queue_size)
+    # Every login is for the same account from the same address, the storm has to reach the password hashing
+    os.environ["RATE_LIMIT_ENABLED"] = "false"
+
+    from httpx import ASGITransport, AsyncClient
+
+    from core.database import async_session_maker, engine, metadata
+    from main import app
+    from schemas.user import UserCreateSchema
+    from services.user_service import UserService
+
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata.create_all)
+
+    email = f"bench-{time.time_ns()}@example.com"
+    password = "bench-password"
+    async with async_session_maker() as session:
+        await UserService(session).create(
+            UserCreateSchema(email=email, password=password, username=email.split("@")[0])
+        )
+
+    statuses: Counter = Counter()
+    probe_latencies: List[float] = []
+    login_latencies: List[float] = []
+    storm_done = asyncio.Event()
+
+    async with AsyncClient(transport=ASGITransport(app), base_url="http://bench") as client:
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def login() -> None:
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.post("/api/v1/auth/login", data={"username": email, "password": password})
+                login_latencies.append(time.perf_counter() - started)
+                statuses[response.status_code] += 1
+
+        async def storm() -> None:
+            await asyncio.gather(*(login() for _ in range(args.logins)))
+            storm_done.set()
+
+        async def probe() -> None:
+            while not storm_done.is_set():
+                started = time.perf_counter()
+                await client.get("/api/health")
+                probe_latencies.append(time.perf_counter() - started)
+                await asyncio.sleep(args.probe_interval)
+
+        started = time.perf_counter()
+        await asyncio.gather(storm(), probe())
+        elapsed = time.perf_counter() - started
+
+    await engine.dispose()
+
+    report = {
+        "executor": args.executor,
+        "workers": args.workers,
+        "elapsed_s": round(elapsed, 3),
+        "login_statuses": dict(statuses),
+        "login": summarize(login_latencies),
+        "health": summarize(probe_latencies),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
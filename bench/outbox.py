@@ -0,0 +1,112 @@
+"""
+Throughput of the outbox dispatcher.
+
+    python -m bench.outbox --events 20000 --dispatchers 1 2 4 --sink webhook
+
+For every number of dispatchers the outbox is filled with `--events` events, which are then drained by that many
+dispatchers running concurrently (as separate dispatcher processes would, every one with its own connections).
+The `null` sink accepts events right away and measures the dispatcher itself, the `webhook` sink posts them to a
+local HTTP server. Uses the database configured through `.env` (run `alembic upgrade head` first), the outbox
+must not contain other due events.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Dict, List
+
+from bench.utils import summarize
+
+EVENT_TYPE = "bench.event"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=20000, help="Events drained by every run")
+    parser.add_argument("--dispatchers", type=int, nargs="+", default=[1, 2, 4], help="Concurrent dispatchers")
+    parser.add_argument("--batch-size", type=int, default=100, help="Events claimed by a batch")
+    parser.add_argument("--sink", choices=("null", "webhook"), default="null")
+    return parser.parse_args()
+
+
+async def _handle_webhook(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        while await reader.readline():
+            length = 0
+            while (line := await reader.readline()) not in (b"\r\n", b""):
+                name, _, value = line.partition(b":")
+                if name.strip().lower() == b"content-length":
+                    length = int(value)
+            await reader.readexactly(length)
+            writer.write(b"HTTP/1.1 204 No Content\r\n\r\n")
+            await writer.drain()
+    finally:
+        writer.close()
+
+
+async def main(args: argparse.Namespace) -> None:
+    from sqlalchemy import delete, insert
+
+    from core.database import async_session_maker, engine
+    from core.outbox import OutboxDispatcher, OutboxSink, WebhookSink
+    from models import OutboxEventModel
+
+    class NullSink(OutboxSink):
+        name = "null"
+
+        async def deliver(self, event: OutboxEventModel) -> None:
+            pass
+
+    server = await asyncio.start_server(_handle_webhook, "127.0.0.1", 0)
+    host, port = server.sockets[0].getsockname()[:2]
+
+    runs: Dict[str, Dict] = {}
+    try:
+        for count in args.dispatchers:
+            async with async_session_maker() as session:
+                await session.execute(
+                    insert(OutboxEventModel),
+                    [{"event_type": EVENT_TYPE, "payload": {"index": index}} for index in range(args.events)],
+                )
+                await session.commit()
+
+            sinks = [
+                WebhookSink(f"http://{host}:{port}/events", timeout=5) if args.sink == "webhook" else NullSink()
+                for _ in range(count)
+            ]
+            batches: List[float] = []
+
+            async def drain(dispatcher: OutboxDispatcher) -> None:
+                while True:
+                    started = time.perf_counter()
+                    claimed = await dispatcher.dispatch_batch()
+                    if not claimed:
+                        return
+                    batches.append(time.perf_counter() - started)
+
+            dispatchers = [OutboxDispatcher(async_session_maker, [sink], batch_size=args.batch_size) for sink in sinks]
+            started = time.perf_counter()
+            await asyncio.gather(*(drain(dispatcher) for dispatcher in dispatchers))
+            elapsed = time.perf_counter() - started
+            for dispatcher in dispatchers:
+                await dispatcher.close()
+
+            runs[str(count)] = {
+                "seconds": round(elapsed, 3),
+                "events_per_second": round(args.events / elapsed),
+                "batch": summarize(batches),
+            }
+    finally:
+        server.close()
+        async with async_session_maker() as session:
+            await session.execute(delete(OutboxEventModel).where(OutboxEventModel.event_type == EVENT_TYPE))
+            await session.commit()
+        await engine.dispose()
+
+    report = {"events": args.events, "batch_size": args.batch_size, "sink": args.sink, "dispatchers": runs}
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
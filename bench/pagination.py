@@ -0,0 +1,104 @@
+"""
+Per-page latency of the projects feed at increasing depths: keyset cursor vs OFFSET.
+
+    python -m bench.pagination --projects 200000
+
+Seeds the given number of projects into the database configured through `.env` (run `alembic upgrade head`
+first) and removes them afterwards.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+from uuid import uuid4
+
+from bench.utils import summarize
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--projects", type=int, default=200_000, help="Number of projects to seed")
+    parser.add_argument("--limit", type=int, default=50, help="Page size")
+    parser.add_argument("--repeat", type=int, default=30, help="Fetches of every page")
+    return parser.parse_args()
+
+
+async def main(args: argparse.Namespace) -> None:
+    from sqlalchemy import delete, insert, select
+
+    from core.database import async_session_maker, engine
+    from models import ProjectModel, UserModel
+    from models.project import Difficulty
+    from repositories.project_repository import ProjectRepository
+
+    owner_id = uuid4()
+    now = datetime.utcnow()
+    async with async_session_maker() as session:
+        await session.execute(
+            insert(UserModel).values(
+                id=owner_id, email=f"{owner_id}@bench", username=str(owner_id), hashed_password="-"
+            )
+        )
+        batch = 10_000
+        for start in range(0, args.projects, batch):
+            await session.execute(
+                insert(ProjectModel),
+                [
+                    {
+                        "id": uuid4(),
+                        "name": f"Project {i}",
+                        "description": "Seeded by bench.pagination",
+                        "difficulty": Difficulty.EASY,
+                        "owner_id": owner_id,
+                        "created_at": now - timedelta(seconds=i),
+                        "updated_at": now,
+                    }
+                    for i in range(start, min(start + batch, args.projects))
+                ],
+            )
+        await session.commit()
+
+    report: Dict[str, Dict] = {}
+    try:
+        async with async_session_maker() as session:
+            repository = ProjectRepository(session)
+            ordering = (ProjectModel.created_at.desc(), ProjectModel.id.desc())
+
+            for fraction in (0, 0.01, 0.1, 0.5, 0.9, 0.99):
+                depth = int(args.projects * fraction)
+                after = None
+                if depth:
+                    anchor = await session.execute(
+                        select(ProjectModel.created_at, ProjectModel.id).order_by(*ordering).offset(depth - 1).limit(1)
+                    )
+                    after = tuple(anchor.one())
+
+                keyset: List[float] = []
+                offset: List[float] = []
+                for _ in range(args.repeat):
+                    started = time.perf_counter()
+                    await repository.get_page(args.limit, after)
+                    keyset.append(time.perf_counter() - started)
+                    session.expunge_all()
+
+                    started = time.perf_counter()
+                    await session.execute(select(ProjectModel).order_by(*ordering).offset(depth).limit(args.limit))
+                    offset.append(time.perf_counter() - started)
+                    session.expunge_all()
+
+                report[str(depth)] = {"keyset": summarize(keyset), "offset": summarize(offset)}
+    finally:
+        async with async_session_maker() as session:
+            await session.execute(delete(ProjectModel).where(ProjectModel.owner_id == owner_id))
+            await session.execute(delete(UserModel).where(UserModel.id == owner_id))
+            await session.commit()
+        await engine.dispose()
+
+    print(json.dumps({"projects": args.projects, "limit": args.limit, "depths": report}, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
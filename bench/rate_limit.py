@@ -0,0 +1,178 @@
+"""
+CPU spent on a credential stuffing attack against `POST /auth/login`, with and without rate limiting.
+
+    python -m bench.rate_limit --limiter off
+    python -m bench.rate_limit --limiter local
+    python -m bench.rate_limit --limiter shared
+
+Replays a recorded-like attack: `--attempts` logins with wrong passwords from `--ips` addresses, half of them
+for existing accounts (a lookup and a bcrypt verification each) and half for unknown emails. The trace is split
+between `--workers` forked processes that serve it like gunicorn workers, each through its own in-process app.
+Reports the statuses, the CPU time of the workers (bcrypt threads included) and the latency of a legitimate
+login to an account outside of the attack, made from a fresh address right after it.
+
+Requires a running Postgres configured through `.env` (tables are created if they do not exist), the users
+created for the run are removed afterwards.
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import resource
+import tempfile
+import time
+from collections import Counter
+from typing import Dict, List, Tuple
+
+from bench.utils import summarize
+
+PASSWORD = "bench-password"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--limiter", choices=("off", "local", "shared"), default="shared")
+    parser.add_argument("--workers", type=int, default=4, help="Forked worker processes")
+    parser.add_argument("--attempts", type=int, default=2000, help="Login attempts in the attack")
+    parser.add_argument("--ips", type=int, default=20, help="Addresses the attack comes from")
+    parser.add_argument("--accounts", type=int, default=10, help="Existing accounts targeted by the attack")
+    parser.add_argument("--concurrency", type=int, default=8, help="Attempts in flight per worker")
+    return parser.parse_args()
+
+
+def configure(args: argparse.Namespace) -> None:
+    # Settings are read at import time, so they have to be set before the app is imported
+    os.environ["RATE_LIMIT_ENABLED"] = str(args.limiter != "off").lower()
+    os.environ["RATE_LIMIT_BACKEND"] = "shared" if args.limiter == "shared" else "local"
+    os.environ["RATE_LIMIT_SHARED_PATH"] = os.path.join(tempfile.mkdtemp(), "rate_limit")
+    os.environ["PASSWORD_HASHING_QUEUE_SIZE"] = str(args.concurrency)
+
+
+async def replay(trace: List[Tuple[str, str]], concurrency: int) -> Counter:
+    from httpx import ASGITransport, AsyncClient
+
+    from core.database import engine
+    from main import app
+
+    statuses: Counter = Counter()
+    semaphore = asyncio.Semaphore(concurrency)
+    clients: Dict[str, AsyncClient] = {}
+
+    async def attempt(ip: str, email: str) -> None:
+        if ip not in clients:
+            clients[ip] = AsyncClient(transport=ASGITransport(app, client=(ip, 12345)), base_url="http://bench")
+        async with semaphore:
+            response = await clients[ip].post("/api/v1/auth/login", data={"username": email, "password": "wrong"})
+            statuses[response.status_code] += 1
+
+    await asyncio.gather(*(attempt(ip, email) for ip, email in trace))
+    for client in clients.values():
+        await client.aclose()
+    await engine.dispose()
+    return statuses
+
+
+def serve(trace: List[Tuple[str, str]], concurrency: int, results: multiprocessing.Queue) -> None:
+    statuses = asyncio.run(replay(trace, concurrency))
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    results.put((dict(statuses), usage.ru_utime + usage.ru_stime))
+
+
+async def create_users(count: int) -> List[str]:
+    from core.database import async_session_maker, engine, metadata
+    from schemas.user import UserCreateSchema
+    from services.user_service import UserService
+
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata.create_all)
+
+    emails = [f"bench-{time.time_ns()}-{index}@example.com" for index in range(count)]
+    async with async_session_maker() as session:
+        for email in emails:
+            await UserService(session).create(
+                UserCreateSchema(email=email, password=PASSWORD, username=email.split("@")[0])
+            )
+    await engine.dispose()
+    return emails
+
+
+async def legitimate_login(email: str) -> float:
+    from httpx import ASGITransport, AsyncClient
+
+    from core.database import engine
+    from main import app
+
+    transport = ASGITransport(app, client=("192.0.2.1", 12345))
+    async with AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        response = await client.post("/api/v1/auth/login", data={"username": email, "password": PASSWORD})
+        elapsed = time.perf_counter() - started
+    assert response.status_code == 200, response.text
+    await engine.dispose()
+    return elapsed
+
+
+async def delete_users(emails: List[str]) -> None:
+    from sqlalchemy import delete
+
+    from core.database import async_session_maker, engine
+    from models import UserModel
+
+    async with async_session_maker() as session:
+        await session.execute(delete(UserModel).where(UserModel.email.in_(emails)))
+        await session.commit()
+    await engine.dispose()
+
+
+def main(args: argparse.Namespace) -> None:
+    configure(args)
+    emails = asyncio.run(create_users(args.accounts + 1))
+    legitimate_email, targeted = emails[0], emails[1:]
+
+    rng = random.Random(0)
+    ips = [f"198.51.100.{index + 1}" for index in range(args.ips)]
+    trace = [
+        (rng.choice(ips), rng.choice(targeted) if rng.random() < 0.5 else f"unknown-{index}@example.com")
+        for index in range(args.attempts)
+    ]
+
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    workers = [
+        context.Process(target=serve, args=(trace[index :: args.workers], args.concurrency, results))
+        for index in range(args.workers)
+    ]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    outcomes = [results.get() for _ in workers]
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+
+    try:
+        login = asyncio.run(legitimate_login(legitimate_email))
+    finally:
+        asyncio.run(delete_users(emails))
+
+    statuses: Counter = Counter()
+    for worker_statuses, _ in outcomes:
+        statuses.update(worker_statuses)
+    report = {
+        "limiter": args.limiter,
+        "workers": args.workers,
+        "attempts": args.attempts,
+        "elapsed_s": round(elapsed, 3),
+        "statuses": dict(statuses),
+        "cpu_s": round(sum(cpu for _, cpu in outcomes), 3),
+        "cpu_ms_per_attempt": round(sum(cpu for _, cpu in outcomes) / args.attempts * 1000, 3),
+        "legitimate_login": summarize([login]),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main(parse_args())
@@ -0,0 +1,124 @@
+"""
+Statements and latency of a single `update` on every repository.
+
+    python -m bench.repository_update --repeat 200
+
+Compares the former path (get, jsonable_encoder, flush, refresh, commit) with `BaseRepository.update`
+called with an ID and with an already loaded instance. Runs against the database configured through `.env`
+(run `alembic upgrade head` first), seeded rows are removed afterwards.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, Callable, Dict, List
+from uuid import uuid4
+
+from bench.utils import summarize
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200, help="Updates per repository and path")
+    return parser.parse_args()
+
+
+async def legacy_update(session, model, id_, update_data: Dict[str, Any]):
+    """`BaseRepository.update` as it was before the single statement path"""
+    from fastapi.encoders import jsonable_encoder
+
+    db_obj = await session.get(model, id_)
+    if db_obj:
+        obj_data = jsonable_encoder(db_obj)
+        for field in obj_data:
+            if field in update_data:
+                setattr(db_obj, field, update_data[field])
+        await session.flush()
+        await session.refresh(db_obj)
+        await session.commit()
+    return db_obj
+
+
+async def main(args: argparse.Namespace) -> None:
+    from sqlalchemy import delete, event, insert
+
+    from core.database import async_session_maker, engine
+    from models import ApplicationModel, PositionModel, ProjectModel, UserModel
+    from models.project import Difficulty
+    from repositories.application_repository import ApplicationRepository
+    from repositories.position_repository import PositionRepository
+    from repositories.project_repository import ProjectRepository
+    from repositories.user_repository import UserRepository
+
+    owner_id, applicant_id, project_id, position_id, application_id = (uuid4() for _ in range(5))
+    async with async_session_maker() as session:
+        await session.execute(
+            insert(UserModel),
+            [
+                {"id": id_, "email": f"{id_}@bench", "username": str(id_), "hashed_password": "-"}
+                for id_ in (owner_id, applicant_id)
+            ],
+        )
+        await session.execute(
+            insert(ProjectModel).values(
+                id=project_id, name="Bench", description="-", difficulty=Difficulty.EASY, owner_id=owner_id
+            )
+        )
+        await session.execute(insert(PositionModel).values(id=position_id, name="Bench", project_id=project_id))
+        await session.execute(
+            insert(ApplicationModel).values(
+                id=application_id, user_id=applicant_id, position_id=position_id, message="-"
+            )
+        )
+        await session.commit()
+
+    statements: List[str] = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count)
+
+    cases: List[tuple] = [
+        ("users", UserRepository, UserModel, owner_id, lambda i: {"username": f"bench-{owner_id}-{i}"}),
+        ("projects", ProjectRepository, ProjectModel, project_id, lambda i: {"name": f"Bench {i}"}),
+        ("positions", PositionRepository, PositionModel, position_id, lambda i: {"name": f"Bench {i}"}),
+        ("applications", ApplicationRepository, ApplicationModel, application_id, lambda i: {"message": f"{i}"}),
+    ]
+
+    report: Dict[str, Dict] = {}
+    try:
+        for name, repository_class, model, id_, values in cases:
+            report[name] = {}
+
+            async def measure(path: str, run: Callable) -> None:
+                latencies: List[float] = []
+                statements.clear()
+                for i in range(args.repeat):
+                    async with async_session_maker() as session:
+                        loaded = await session.get(model, id_) if path == "instance" else None
+                        started = time.perf_counter()
+                        await run(session, loaded, values(i))
+                        latencies.append(time.perf_counter() - started)
+                # Loading the instance is done by the service anyway and is not part of the update
+                per_update = (len(statements) - (args.repeat if path == "instance" else 0)) / args.repeat
+                report[name][path] = {"statements": per_update, **summarize(latencies)}
+
+            await measure("legacy", lambda session, _, data: legacy_update(session, model, id_, data))
+            await measure("by_id", lambda session, _, data: repository_class(session).update(id_, data))
+            await measure("instance", lambda session, obj, data: repository_class(session).update(obj, data))
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", count)
+        async with async_session_maker() as session:
+            await session.execute(delete(ApplicationModel).where(ApplicationModel.id == application_id))
+            await session.execute(delete(ProjectModel).where(ProjectModel.id == project_id))
+            await session.execute(delete(UserModel).where(UserModel.id.in_([owner_id, applicant_id])))
+            await session.commit()
+        await engine.dispose()
+
+    print(json.dumps({"repeat": args.repeat, "repositories": report}, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
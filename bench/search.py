@@ -0,0 +1,157 @@
+"""
+Latency of `GET /api/v1/search/projects` over a large number of projects.
+
+    python -m bench.search --projects 1000000 --slo-ms 100
+
+Seeds the projects (and positions for a share of them) with COPY into the database configured through `.env`
+(run `alembic upgrade head` first), runs a mix of searches in-process through `httpx.ASGITransport` and
+removes the seeded rows afterwards. Words of names and descriptions follow a Zipf-like distribution,
+so queries range from words matching a large share of projects to rare ones.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from itertools import accumulate
+from typing import Dict, List
+from uuid import uuid4
+
+from bench.utils import summarize
+
+VOCABULARY_SIZE = 5000
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--projects", type=int, default=1_000_000, help="Number of projects to seed")
+    parser.add_argument("--positions-share", type=float, default=0.2, help="Share of projects with a position")
+    parser.add_argument("--repeat", type=int, default=50, help="Requests per kind of search")
+    parser.add_argument("--slo-ms", type=float, default=100, help="Target p95 latency")
+    parser.add_argument("--seed", type=int, default=42)
+    return parser.parse_args()
+
+
+def make_vocabulary(rng: random.Random) -> List[str]:
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(rng.choices(letters, k=rng.randint(5, 10))) for _ in range(VOCABULARY_SIZE)]
+
+
+async def main(args: argparse.Namespace) -> None:
+    from httpx import ASGITransport, AsyncClient
+    from sqlalchemy import delete, insert, text
+
+    from core.database import async_session_maker, engine
+    from main import app
+    from models import ProjectModel, UserModel
+
+    rng = random.Random(args.seed)
+    vocabulary = make_vocabulary(rng)
+    # Zipf-like weights: the most frequent word occurs in about a fifth of the projects
+    cum_weights = list(accumulate(1 / (rank + 20) for rank in range(VOCABULARY_SIZE)))
+
+    def words(k: int) -> str:
+        return " ".join(rng.choices(vocabulary, cum_weights=cum_weights, k=k))
+
+    owner_id = uuid4()
+    now = datetime.utcnow()
+    started = time.perf_counter()
+    async with async_session_maker() as session:
+        await session.execute(
+            insert(UserModel).values(
+                id=owner_id, email=f"{owner_id}@bench", username=str(owner_id), hashed_password="-"
+            )
+        )
+        await session.commit()
+
+        connection = await (await session.connection()).get_raw_connection()
+        driver = connection.driver_connection
+        batch = 50_000
+        for start in range(0, args.projects, batch):
+            projects, positions = [], []
+            for i in range(start, min(start + batch, args.projects)):
+                project_id = uuid4()
+                created_at = now - timedelta(seconds=i)
+                projects.append(
+                    (project_id, words(3), words(20), rng.choice(("EASY", "MEDIUM", "HARD")), owner_id, created_at)
+                )
+                if rng.random() < args.positions_share:
+                    count = rng.randint(1, 3)
+                    positions.append(
+                        (uuid4(), words(2), project_id, count, rng.randint(0, count), created_at, created_at)
+                    )
+            await driver.copy_records_to_table(
+                "projects",
+                records=projects,
+                columns=["id", "name", "description", "difficulty", "owner_id", "created_at"],
+            )
+            await driver.copy_records_to_table(
+                "positions",
+                records=positions,
+                columns=["id", "name", "project_id", "count", "approved_count", "created_at", "updated_at"],
+            )
+        await session.commit()
+    # As autovacuum would: moves the pending entries of the GIN indexes into the indexes and fills the
+    # visibility map, a search of freshly copied rows scans the pending list of every GIN index it reads
+    async with engine.connect() as connection:
+        connection = await connection.execution_options(isolation_level="AUTOCOMMIT")
+        await connection.execute(text("VACUUM ANALYZE projects"))
+        await connection.execute(text("VACUUM ANALYZE positions"))
+    seeding_s = time.perf_counter() - started
+
+    # Frequent, medium and rare words, a phrase of two words
+    searches: Dict[str, Dict] = {
+        "feed": {},
+        "feed_filtered": {"difficulty": "hard", "has_vacancies": "true"},
+        "frequent_word": {"q": vocabulary[0]},
+        "medium_word": {"q": vocabulary[50]},
+        "rare_word": {"q": vocabulary[3000]},
+        "two_words": {"q": f"{vocabulary[1]} {vocabulary[20]}"},
+        "word_filtered": {"q": vocabulary[5], "difficulty": "easy", "has_vacancies": "true"},
+    }
+
+    report: Dict[str, Dict] = {}
+    try:
+        async with AsyncClient(transport=ASGITransport(app), base_url="http://bench") as client:
+            for name, params in searches.items():
+                latencies: List[float] = []
+                for _ in range(args.repeat):
+                    request_started = time.perf_counter()
+                    response = await client.get("/api/v1/search/projects", params={**params, "limit": 20})
+                    latencies.append(time.perf_counter() - request_started)
+                    assert response.status_code == 200, response.text
+
+                next_page = response.headers.get("X-Next-Cursor")
+                if next_page:
+                    request_started = time.perf_counter()
+                    await client.get("/api/v1/search/projects", params={**params, "limit": 20, "cursor": next_page})
+                    latencies.append(time.perf_counter() - request_started)
+
+                summary = summarize(latencies)
+                report[name] = {
+                    "params": params,
+                    "matches": sum(response.json()["difficulty_facets"].values()),
+                    "matches_truncated": response.json()["difficulty_facets_truncated"],
+                    **summary,
+                    "within_slo": summary["p95_ms"] <= args.slo_ms,
+                }
+    finally:
+        async with async_session_maker() as session:
+            # Positions are removed by the cascade
+            await session.execute(delete(ProjectModel).where(ProjectModel.owner_id == owner_id))
+            await session.execute(delete(UserModel).where(UserModel.id == owner_id))
+            await session.commit()
+        await engine.dispose()
+
+    print(
+        json.dumps(
+            {"projects": args.projects, "seeding_s": round(seeding_s, 1), "slo_ms": args.slo_ms, "searches": report},
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,250 @@
+"""
+Bulk seeding of users, projects, positions and applications at production-like sizes.
+
+    python -m bench.seed --users 10000 --projects 50000 --positions-per-project 2 --applications-per-position 5
+    python -m bench.seed --remove
+
+Rows are written with COPY into the database configured through `.env` (run `alembic upgrade head` first).
+Seeded users have `@seed.bench` emails and share the `SEED_PASSWORD` password, `--remove` deletes them
+together with everything they own or applied for.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from functools import cached_property
+from itertools import accumulate
+from typing import Dict, List, Tuple
+from uuid import UUID, uuid4
+
+SEED_EMAIL_DOMAIN = "seed.bench"
+SEED_PASSWORD = "bench-password"
+VOCABULARY_SIZE = 2000
+COPY_BATCH = 50_000
+
+
+@dataclass
+class Sizes:
+    users: int = 10_000
+    projects: int = 50_000
+    positions_per_project: int = 2
+    applications_per_position: int = 5
+
+
+@dataclass
+class Dataset:
+    """IDs of the seeded rows, used to build requests of a workload"""
+
+    emails: Dict[UUID, str] = field(default_factory=dict)
+    # Project ID -> owner ID
+    projects: Dict[UUID, UUID] = field(default_factory=dict)
+    # Position ID -> owner ID of the project
+    positions: Dict[UUID, UUID] = field(default_factory=dict)
+    # Owner ID -> IDs of pending applications to positions of the owner's projects
+    pending_applications: Dict[UUID, List[UUID]] = field(default_factory=dict)
+    # Words names and descriptions are made of, from the most to the least frequent
+    vocabulary: List[str] = field(default_factory=list)
+
+    @cached_property
+    def project_ids(self) -> List[UUID]:
+        return list(self.projects)
+
+    @cached_property
+    def position_ids(self) -> List[UUID]:
+        return list(self.positions)
+
+    def counts(self) -> Dict[str, int]:
+        return {
+            "users": len(self.emails),
+            "projects": len(self.projects),
+            "positions": len(self.positions),
+            "pending_applications": sum(len(ids) for ids in self.pending_applications.values()),
+        }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_size_arguments(parser)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--remove", action="store_true", help="Remove the seeded rows instead")
+    return parser.parse_args()
+
+
+def add_size_arguments(parser: argparse.ArgumentParser) -> None:
+    defaults = Sizes()
+    parser.add_argument("--users", type=int, default=defaults.users)
+    parser.add_argument("--projects", type=int, default=defaults.projects)
+    parser.add_argument("--positions-per-project", type=int, default=defaults.positions_per_project)
+    parser.add_argument("--applications-per-position", type=int, default=defaults.applications_per_position)
+
+
+def sizes_from_args(args: argparse.Namespace) -> Sizes:
+    return Sizes(args.users, args.projects, args.positions_per_project, args.applications_per_position)
+
+
+def make_vocabulary(rng: random.Random) -> List[str]:
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(rng.choices(letters, k=rng.randint(5, 10))) for _ in range(VOCABULARY_SIZE)]
+
+
+async def seed(sizes: Sizes, rng: random.Random) -> Dataset:
+    """
+    Writes users, their projects, positions of the projects and applications to the positions with COPY.
+
+    Owners of projects are picked uniformly, applicants of a position are distinct users other than
+    the owner, every application is pending.
+    """
+    from sqlalchemy import text
+
+    from auth.security import get_password_hash
+    from core.database import async_session_maker
+
+    dataset = Dataset(vocabulary=make_vocabulary(rng))
+    # Zipf-like frequencies of words, so searches range from frequent to rare words
+    cum_weights = list(accumulate(1 / (rank + 20) for rank in range(VOCABULARY_SIZE)))
+
+    def words(k: int) -> str:
+        return " ".join(rng.choices(dataset.vocabulary, cum_weights=cum_weights, k=k))
+
+    # Hashing is deliberately slow, every seeded user gets the same hash
+    hashed_password = get_password_hash(SEED_PASSWORD)
+    now = datetime.utcnow()
+
+    users = []
+    for _ in range(sizes.users):
+        user_id = uuid4()
+        dataset.emails[user_id] = f"{user_id.hex}@{SEED_EMAIL_DOMAIN}"
+        users.append((user_id, dataset.emails[user_id], user_id.hex, hashed_password, False, now, now))
+    user_ids = list(dataset.emails)
+
+    projects, positions, applications = [], [], []
+    difficulties = ("EASY", "MEDIUM", "HARD")
+    for i in range(sizes.projects):
+        project_id, owner_id = uuid4(), rng.choice(user_ids)
+        created_at = now - timedelta(seconds=i)
+        dataset.projects[project_id] = owner_id
+        projects.append((project_id, words(3), words(20), rng.choice(difficulties), owner_id, created_at, created_at))
+
+        for _ in range(sizes.positions_per_project):
+            position_id = uuid4()
+            dataset.positions[position_id] = owner_id
+            count = rng.randint(1, 5)
+            positions.append((position_id, words(2), words(10), project_id, count, 0, created_at, created_at))
+
+            applicants = rng.sample(user_ids, min(sizes.applications_per_position + 1, len(user_ids)))
+            for user_id in [id_ for id_ in applicants if id_ != owner_id][: sizes.applications_per_position]:
+                application_id = uuid4()
+                dataset.pending_applications.setdefault(owner_id, []).append(application_id)
+                applications.append((application_id, user_id, position_id, words(8), "PENDING", now, now))
+
+    tables = [
+        ("users", ["id", "email", "username", "hashed_password", "is_verified", "created_at", "updated_at"], users),
+        (
+            "projects",
+            ["id", "name", "description", "difficulty", "owner_id", "created_at", "updated_at"],
+            projects,
+        ),
+        (
+            "positions",
+            ["id", "name", "description", "project_id", "count", "approved_count", "created_at", "updated_at"],
+            positions,
+        ),
+        (
+            "applications",
+            ["id", "user_id", "position_id", "message", "status", "created_at", "updated_at"],
+            applications,
+        ),
+    ]
+    async with async_session_maker() as session:
+        connection = await (await session.connection()).get_raw_connection()
+        for table, columns, records in tables:
+            for start in range(0, len(records), COPY_BATCH):
+                await connection.driver_connection.copy_records_to_table(
+                    table, records=records[start : start + COPY_BATCH], columns=columns
+                )
+        await session.commit()
+        await session.execute(text("ANALYZE users, projects, positions, applications"))
+        await session.commit()
+
+    return dataset
+
+
+async def load_dataset() -> Dataset:
+    """Reads back the rows seeded earlier, so a workload can be repeated on the same data"""
+    from sqlalchemy import select
+
+    from core.database import async_session_maker
+    from models import ApplicationModel, PositionModel, ProjectModel, UserModel
+    from models.associations.application import ApplicationStatus
+
+    dataset = Dataset()
+    async with async_session_maker() as session:
+        seeded = UserModel.email.endswith(f"@{SEED_EMAIL_DOMAIN}")
+        dataset.emails = dict((await session.execute(select(UserModel.id, UserModel.email).where(seeded))).all())
+        seeded_projects = select(ProjectModel.id, ProjectModel.owner_id).join(UserModel).where(seeded)
+        dataset.projects = dict((await session.execute(seeded_projects)).all())
+        seeded_positions = (
+            select(PositionModel.id, ProjectModel.owner_id).join(ProjectModel).join(UserModel).where(seeded)
+        )
+        dataset.positions = dict((await session.execute(seeded_positions)).all())
+        pending = (
+            select(ProjectModel.owner_id, ApplicationModel.id)
+            .join(PositionModel, ApplicationModel.position_id == PositionModel.id)
+            .join(ProjectModel)
+            .join(UserModel, ProjectModel.owner_id == UserModel.id)
+            .where(seeded, ApplicationModel.status == ApplicationStatus.PENDING)
+        )
+        for owner_id, application_id in await session.execute(pending):
+            dataset.pending_applications.setdefault(owner_id, []).append(application_id)
+        names = await session.scalars(select(ProjectModel.name).join(UserModel).where(seeded).limit(1000))
+        frequencies = Counter(word for name in names for word in name.split())
+        dataset.vocabulary = [word for word, _ in frequencies.most_common()]
+    return dataset
+
+
+async def remove() -> Tuple[int, int]:
+    """
+    Removes the seeded users, their projects cascade to positions and applications.
+
+    :return: Number of removed applications of the seeded users and number of removed users.
+    """
+    from sqlalchemy import delete, select
+
+    from core.database import async_session_maker
+    from models import ApplicationModel, UserModel
+
+    async with async_session_maker() as session:
+        seeded = UserModel.email.endswith(f"@{SEED_EMAIL_DOMAIN}")
+        # Applications do not cascade from their users
+        applications = await session.execute(
+            delete(ApplicationModel).where(ApplicationModel.user_id.in_(select(UserModel.id).where(seeded)))
+        )
+        users = await session.execute(delete(UserModel).where(seeded))
+        await session.commit()
+    return applications.rowcount, users.rowcount
+
+
+async def main(args: argparse.Namespace) -> None:
+    from core.database import engine
+
+    started = time.perf_counter()
+    try:
+        if args.remove:
+            applications, users = await remove()
+            report = {"removed": {"users": users, "applications": applications}}
+        else:
+            dataset = await seed(sizes_from_args(args), random.Random(args.seed))
+            report = {"seeded": dataset.counts()}
+    finally:
+        await engine.dispose()
+
+    print(json.dumps({**report, "elapsed_s": round(time.perf_counter() - started, 1)}, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
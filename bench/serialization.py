@@ -0,0 +1,115 @@
+"""
+CPU time of building a response with thousands of applications of a position.
+
+    python -m bench.serialization --applications 5000 --repeat 30
+
+Compares the former path (ORM instances validated against `response_model` by FastAPI and encoded with
+the stdlib JSON encoder), the same path encoded with orjson, and rows serialized straight to JSON
+(`ApplicationRepository.get_all_by_position_id` with `rows_response`). Every path fetches the page from the
+database configured through `.env` (run `alembic upgrade head` first), seeded rows are removed afterwards.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Awaitable, Callable, Dict, List
+from uuid import uuid4
+
+from bench.utils import summarize
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--applications", type=int, default=5000, help="Applications in the response")
+    parser.add_argument("--repeat", type=int, default=30, help="Responses built by every path")
+    return parser.parse_args()
+
+
+async def main(args: argparse.Namespace) -> None:
+    from fastapi.responses import JSONResponse, ORJSONResponse
+    from fastapi.routing import serialize_response
+    from fastapi.utils import create_response_field
+    from sqlalchemy import delete, insert, select
+
+    from core.database import async_session_maker, engine
+    from models import ApplicationModel, PositionModel, ProjectModel, UserModel
+    from models.project import Difficulty
+    from repositories.application_repository import ApplicationRepository
+    from routers.responses import rows_response
+    from schemas.application import ApplicationSchema
+
+    owner_id, project_id, position_id = uuid4(), uuid4(), uuid4()
+    applicant_ids = [uuid4() for _ in range(args.applications)]
+    async with async_session_maker() as session:
+        await session.execute(
+            insert(UserModel),
+            [
+                {"id": id_, "email": f"{id_}@bench", "username": str(id_), "hashed_password": "-"}
+                for id_ in (owner_id, *applicant_ids)
+            ],
+        )
+        await session.execute(
+            insert(ProjectModel).values(
+                id=project_id, name="Bench", description="-", difficulty=Difficulty.EASY, owner_id=owner_id
+            )
+        )
+        await session.execute(insert(PositionModel).values(id=position_id, name="Bench", project_id=project_id))
+        await session.execute(
+            insert(ApplicationModel),
+            [
+                {"id": uuid4(), "user_id": user_id, "position_id": position_id, "message": "Seeded by bench"}
+                for user_id in applicant_ids
+            ],
+        )
+        await session.commit()
+
+    field = create_response_field(name="Response", type_=List[ApplicationSchema], mode="serialization")
+    ordering = (ApplicationModel.created_at.desc(), ApplicationModel.id.desc())
+
+    async def response_model_path(response_class) -> bytes:
+        async with async_session_maker() as session:
+            statement = select(ApplicationModel).filter_by(position_id=position_id).order_by(*ordering)
+            applications = (await session.execute(statement.limit(args.applications))).scalars().all()
+            content = await serialize_response(field=field, response_content=applications)
+            return response_class(content).body
+
+    async def rows_path() -> bytes:
+        async with async_session_maker() as session:
+            rows, _ = await ApplicationRepository(session).get_all_by_position_id(
+                position_id, tuple(ApplicationSchema.model_fields), args.applications
+            )
+            return rows_response(rows).body
+
+    paths: Dict[str, Callable[[], Awaitable[bytes]]] = {
+        "orm_response_model_json": lambda: response_model_path(JSONResponse),
+        "orm_response_model_orjson": lambda: response_model_path(ORJSONResponse),
+        "rows_orjson": rows_path,
+    }
+
+    report: Dict[str, Dict] = {}
+    try:
+        bodies = {name: json.loads(await path()) for name, path in paths.items()}
+        assert all(body == bodies["orm_response_model_json"] for body in bodies.values()), "Bodies differ"
+
+        for name, path in paths.items():
+            cpu: List[float] = []
+            wall: List[float] = []
+            for _ in range(args.repeat):
+                cpu_started, wall_started = time.process_time(), time.perf_counter()
+                await path()
+                cpu.append(time.process_time() - cpu_started)
+                wall.append(time.perf_counter() - wall_started)
+            report[name] = {"cpu": summarize(cpu), "wall": summarize(wall)}
+    finally:
+        async with async_session_maker() as session:
+            await session.execute(delete(ProjectModel).where(ProjectModel.id == project_id))
+            await session.execute(delete(UserModel).where(UserModel.id.in_([owner_id, *applicant_ids])))
+            await session.commit()
+        await engine.dispose()
+
+    print(json.dumps({"applications": args.applications, "repeat": args.repeat, "paths": report}, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
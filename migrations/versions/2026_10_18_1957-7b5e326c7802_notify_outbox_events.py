@@ -0,0 +1,39 @@
+"""notify outbox events
+
+Revision ID: 7b5e326c7802
+Revises: 57a854156527
+Create Date: 2026-10-18 19:57:11.109271
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '7b5e326c7802'
+down_revision: Union[str, None] = '57a854156527'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Same as the DDL of `models.outbox`, events are published on the channel on commit
+    op.execute("""CREATE OR REPLACE FUNCTION notify_outbox_event() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify(
+        'outbox_events',
+        json_build_object(
+            'id', NEW.id, 'type', NEW.event_type, 'created_at', NEW.created_at, 'payload', NEW.payload
+        )::text
+    );
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql""")
+    op.execute("""CREATE TRIGGER outbox_events_notify AFTER INSERT ON outbox_events
+FOR EACH ROW EXECUTE FUNCTION notify_outbox_event()""")
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER outbox_events_notify ON outbox_events")
+    op.execute("DROP FUNCTION notify_outbox_event()")
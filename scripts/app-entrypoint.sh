@@ -5,6 +5,11 @@ echo "Running migrations..."
 alembic upgrade head
 
 
+# Workers share metrics through files, left overs of a previous run must be removed
+export PROMETHEUS_MULTIPROC_DIR=${PROMETHEUS_MULTIPROC_DIR:-/tmp/prometheus}
+rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+
 # Starting gunicorn
 cd src
 gunicorn main:app --workers 4 --worker-class uvicorn.workers.UvicornWorker --bind 0.0.0.0:8000
\ No newline at end of file
@@ -0,0 +1,126 @@
+"""
+Pick the cost of password hashes for this host.
+
+    cd src && python -m auth.calibrate --target-ms 250
+    cd src && python -m auth.calibrate --scheme argon2 --target-ms 250 --memory-cost 65536
+
+Measures the time of a single hash on an idle core and prints the settings of the most expensive policy that
+stays within the target. A login costs one verification, which takes as long as a hash; every worker of the
+password hashing pool serves about `1000 / target-ms` logins per second.
+"""
+
+import argparse
+import statistics
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from passlib.context import CryptContext
+
+BCRYPT_MIN_ROUNDS = 10
+ARGON2_MIN_MEMORY_COST = 19456  # KiB, the least OWASP recommends for argon2id
+
+Measure = Callable[[CryptContext], float]
+
+
+def measure_hash(context: CryptContext, samples: int = 5) -> float:
+    """Median time of hashing a password, in seconds"""
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        context.hash("calibration-password")
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def calibrate_bcrypt(target: float, measure: Measure) -> Tuple[Optional[Dict[str, int]], List[Tuple[int, float]]]:
+    """
+    Find the highest bcrypt rounds whose hash takes at most `target` seconds. Every round doubles the time.
+
+    :param target: Latency budget of a hash in seconds
+    :param measure: Measures the time of a hash made with the context
+    :return: Settings of the policy (None if even the least secure one is too slow) and the measured timings
+    """
+    timings: List[Tuple[int, float]] = []
+    best = None
+    for rounds in range(BCRYPT_MIN_ROUNDS, 32):
+        elapsed = measure(CryptContext(schemes=["bcrypt"], bcrypt__rounds=rounds))
+        timings.append((rounds, elapsed))
+        if elapsed > target:
+            break
+        best = {"PASSWORD_BCRYPT_ROUNDS": rounds}
+    return best, timings
+
+
+def calibrate_argon2(
+    target: float, measure: Measure, memory_cost: int, parallelism: int
+) -> Tuple[Optional[Dict[str, int]], List[Tuple[int, int, float]]]:
+    """
+    Find the highest argon2id time cost whose hash takes at most `target` seconds. When a single pass over
+    `memory_cost` KiB is already too slow, the memory is halved down to `ARGON2_MIN_MEMORY_COST`.
+
+    :param target: Latency budget of a hash in seconds
+    :param measure: Measures the time of a hash made with the context
+    :param memory_cost: Memory of a hash in KiB
+    :param parallelism: Lanes of a hash
+    :return: Settings of the policy (None if even the least secure one is too slow) and the measured timings
+    """
+    timings: List[Tuple[int, int, float]] = []
+    while True:
+        best = None
+        for time_cost in range(1, 64):
+            context = CryptContext(
+                schemes=["argon2"],
+                argon2__type="ID",
+                argon2__rounds=time_cost,
+                argon2__memory_cost=memory_cost,
+                argon2__parallelism=parallelism,
+            )
+            elapsed = measure(context)
+            timings.append((memory_cost, time_cost, elapsed))
+            if elapsed > target:
+                break
+            best = {
+                "PASSWORD_ARGON2_TIME_COST": time_cost,
+                "PASSWORD_ARGON2_MEMORY_COST": memory_cost,
+                "PASSWORD_ARGON2_PARALLELISM": parallelism,
+            }
+        if best is not None or memory_cost // 2 < ARGON2_MIN_MEMORY_COST:
+            return best, timings
+        memory_cost //= 2
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scheme", choices=("bcrypt", "argon2"), default="bcrypt")
+    parser.add_argument("--target-ms", type=float, default=250, help="Latency budget of a single hash")
+    parser.add_argument("--samples", type=int, default=5, help="Hashes measured per candidate policy")
+    parser.add_argument("--memory-cost", type=int, default=65536, help="argon2 memory in KiB")
+    parser.add_argument("--parallelism", type=int, default=4, help="argon2 lanes")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    target = args.target_ms / 1000
+
+    def measure(context: CryptContext) -> float:
+        return measure_hash(context, args.samples)
+
+    if args.scheme == "bcrypt":
+        best, bcrypt_timings = calibrate_bcrypt(target, measure)
+        for rounds, elapsed in bcrypt_timings:
+            print(f"# bcrypt rounds={rounds}: {elapsed * 1000:.1f} ms")
+    else:
+        best, argon2_timings = calibrate_argon2(target, measure, args.memory_cost, args.parallelism)
+        for memory_cost, time_cost, elapsed in argon2_timings:
+            print(f"# argon2id m={memory_cost} t={time_cost} p={args.parallelism}: {elapsed * 1000:.1f} ms")
+
+    if best is None:
+        raise SystemExit(f"No {args.scheme} policy hashes within {args.target_ms} ms on this host")
+    print(f"PASSWORD_HASH_SCHEME={args.scheme}")
+    for name, value in best.items():
+        print(f"{name}={value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,48 @@
+import hashlib
+import time
 from typing import Optional
 from uuid import UUID
 
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
 from auth import security
+from auth.jwt_codecs import InvalidTokenError
+from auth.revocation import revocation_list, token_id
+from core.cache import TTLCache
 from core.database import get_async_session
 from models import UserModel
+from schemas.auth import TokenData
+from schemas.user import UserSchema
+from settings import settings
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
+# Per-worker cache of authenticated users, keyed by user id
+current_user_cache: TTLCache[UUID, UserSchema] = TTLCache(
+    maxsize=settings.auth.current_user_cache_size,
+    ttl=settings.auth.current_user_cache_ttl,
+)
+
+
+# Per-worker cache of verified tokens, keyed by their SHA-256 digest. Entries expire with their tokens
+decoded_token_cache: TTLCache[bytes, TokenData] = TTLCache(
+    maxsize=settings.auth.decoded_token_cache_size,
+    ttl=settings.auth.decoded_token_cache_ttl,
+)
+
+
+def invalidate_current_user(id_: UUID) -> None:
+    """
+    Drop the cached record of a user, so that the next request reloads it from the database.
+
+    Args:
+        id_ (UUID): The id of the user that has been updated or deleted.
+    """
+    current_user_cache.delete(UUID(str(id_)))
+
 
 async def _get_user(session: AsyncSession, id_: UUID) -> Optional[UserModel]:
     """
@@ -29,34 +59,94 @@ async def _get_user(session: AsyncSession, id_: UUID) -> Optional[UserModel]:
     return obj
 
 
-async def get_current_user(token: str = Depends(oauth2_scheme), session: AsyncSession = Depends(get_async_session)):
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def _decode_token(token: str) -> TokenData:
     """
-    Get the current user based on the provided token.
+    Verify the token, or take its claims from the cache when it has been verified before.
 
     Args:
         token (str): The authentication token.
+
+    Raises:
+        HTTPException: If the token is invalid or has expired.
+
+    Returns:
+        TokenData: The claims of the token.
+    """
+    key = hashlib.sha256(token.encode()).digest()
+    principal = decoded_token_cache.get(key)
+    if principal is not None:
+        return principal
+
+    try:
+        payload = security.jwt_codec.decode(token)
+        user_id, jti, expires_at = payload.get("sub"), payload.get("jti"), payload.get("exp")
+        if user_id is None or not isinstance(jti, str) or not isinstance(expires_at, (int, float)):
+            raise _credentials_exception()
+        principal = TokenData(id=user_id, jti=token_id(jti), sid=payload.get("sid"), expires_at=expires_at)
+    except (InvalidTokenError, ValueError):
+        raise _credentials_exception()
+
+    decoded_token_cache.set(key, principal, ttl=expires_at - time.time())
+    return principal
+
+
+async def get_current_principal(token: str = Depends(oauth2_scheme)) -> TokenData:
+    """
+    Get the identity of the caller straight from the token claims, without touching the database.
+
+    Suitable for routes that only need the id of the user. The user is not checked to still exist.
+    Revoked tokens are rejected, see `auth.revocation`.
+
+    Args:
+        token (str): The authentication token.
+
+    Raises:
+        HTTPException: If credentials cannot be validated.
+
+    Returns:
+        TokenData: The id of the authenticated user.
+    """
+    principal = _decode_token(token)
+    if await revocation_list.is_revoked(principal.jti):
+        raise _credentials_exception()
+    return principal
+
+
+async def get_current_user(
+    principal: TokenData = Depends(get_current_principal),
+    session: AsyncSession = Depends(get_async_session),
+) -> UserSchema:
+    """
+    Get the current user based on the provided token.
+
+    Users are served from the per-worker cache when possible and loaded from the database otherwise.
+
+    Args:
+        principal (TokenData): The identity taken from the token.
         session (Session): The database session.
 
     Raises:
         HTTPException: If credentials cannot be validated.
 
     Returns:
-        User: The current user.
+        UserSchema: The current user.
     """
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    try:
-        payload = jwt.decode(token, security.SECRET_KEY, algorithms=[security.ALGORITHM])
-        user_id: UUID = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
-
-    user = await _get_user(session, id_=user_id)
-    if user is None:
-        raise credentials_exception
+    user = current_user_cache.get(principal.id)
+    if user is not None:
+        return user
+
+    db_user = await _get_user(session, id_=principal.id)
+    if db_user is None:
+        raise _credentials_exception()
+
+    user = UserSchema.model_validate(db_user)
+    current_user_cache.set(principal.id, user)
     return user
@@ -0,0 +1,117 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Optional, TypeVar
+
+from fastapi import HTTPException
+from starlette import status
+
+from auth import security
+from settings import settings
+
+T = TypeVar("T")
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt hashing and verification outside of the event loop.
+
+    At most `max_workers` operations run at the same time and at most `queue_size` more wait for a free
+    worker. Anything above that is rejected with 503, so a login storm degrades into fast failures instead
+    of stalling every other request served by the worker.
+    """
+
+    def __init__(self, executor: str = "thread", max_workers: int = 2, queue_size: int = 32):
+        self._executor_kind = executor
+        self._max_workers = max_workers
+        self._capacity = max_workers + queue_size
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        """Number of operations that are running or waiting for a worker."""
+        return self._pending
+
+    @property
+    def capacity(self) -> int:
+        """Maximum number of operations that may be running or waiting at the same time."""
+        return self._capacity
+
+    def _get_executor(self) -> Optional[Executor]:
+        # Pools are created lazily, so that gunicorn workers do not inherit them from the master process
+        if self._executor is None and self._executor_kind != "inline":
+            if self._executor_kind == "process":
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self._max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._max_workers,
+                    thread_name_prefix="password-hasher",
+                )
+        return self._executor
+
+    async def _run(self, func: Callable[..., T], *args) -> T:
+        if self._pending >= self._capacity:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, try again later",
+                headers={"Retry-After": "1"},
+            )
+
+        self._pending += 1
+        try:
+            executor = self._get_executor()
+            if executor is None:
+                return func(*args)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(executor, partial(func, *args))
+        finally:
+            self._pending -= 1
+
+    async def hash(self, password: str) -> str:
+        """
+        Generate a password hash without blocking the event loop.
+
+        Args:
+            password (str): The password to hash.
+
+        Raises:
+            HTTPException: If too many hashing operations are already in progress.
+
+        Returns:
+            str: The hashed password.
+        """
+        return await self._run(security.get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """
+        Verify a password against its hash without blocking the event loop.
+
+        Args:
+            plain_password (str): The password to check.
+            hashed_password (str): The stored password hash.
+
+        Raises:
+            HTTPException: If too many hashing operations are already in progress.
+
+        Returns:
+            bool: True if the password matches the hash, otherwise False.
+        """
+        return await self._run(security.verify_password, plain_password, hashed_password)
+
+    def shutdown(self) -> None:
+        """Stop the worker pool. It is recreated on the next call if needed."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    executor=settings.auth.password_hashing_executor,
+    max_workers=settings.auth.password_hashing_workers,
+    queue_size=settings.auth.password_hashing_queue_size,
+)
@@ -0,0 +1,211 @@
+"""
+Codecs signing and verifying access tokens (JWS compact serialization).
+
+`JoseCodec` delegates to python-jose and supports every algorithm it does. `HMACCodec` and `EdDSACodec` only
+support their own algorithms and are built on the standard library and `cryptography`: they verify a token without
+the generic parsing of python-jose, and `EdDSACodec` signs with an Ed25519 key whose public half can be handed to
+other services to verify tokens themselves.
+
+Every codec checks the signature, that the `alg` of the header is the configured one, and the `exp` and `nbf`
+claims when they are present.
+"""
+
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey, Ed25519PublicKey
+from jose import JWTError, jwt
+
+HMAC_ALGORITHMS = {"HS256": hashlib.sha256, "HS384": hashlib.sha384, "HS512": hashlib.sha512}
+
+
+class InvalidTokenError(Exception):
+    """The token is malformed, its signature does not match or it has expired"""
+
+
+class JWTCodec(ABC):
+    """Signs claims into a token and verifies tokens back into claims"""
+
+    algorithm: str
+
+    @abstractmethod
+    def encode(self, claims: Dict[str, Any]) -> str:
+        """
+        Sign the claims. Values must be JSON serializable, times are Unix timestamps.
+
+        Args:
+            claims (Dict[str, Any]): The claims of the token.
+
+        Returns:
+            str: The token.
+        """
+
+    @abstractmethod
+    def decode(self, token: str) -> Dict[str, Any]:
+        """
+        Verify a token.
+
+        Args:
+            token (str): The token.
+
+        Raises:
+            InvalidTokenError: If the token cannot be trusted.
+
+        Returns:
+            Dict[str, Any]: The claims of the token.
+        """
+
+
+class JoseCodec(JWTCodec):
+    def __init__(self, algorithm: str, key: str):
+        """
+        Args:
+            algorithm (str): Any algorithm python-jose supports.
+            key (str): The secret of HMAC algorithms, or the PEM private key of asymmetric ones.
+        """
+        self.algorithm = algorithm
+        self._key = key
+        # python-jose verifies signatures of asymmetric algorithms with the public key only
+        if algorithm in HMAC_ALGORITHMS:
+            self._verifying_key = key
+        else:
+            public_key = serialization.load_pem_private_key(key.encode(), password=None).public_key()
+            self._verifying_key = public_key.public_bytes(
+                serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+            ).decode()
+
+    def encode(self, claims: Dict[str, Any]) -> str:
+        return jwt.encode(claims, self._key, algorithm=self.algorithm)
+
+    def decode(self, token: str) -> Dict[str, Any]:
+        try:
+            return jwt.decode(token, self._verifying_key, algorithms=[self.algorithm])
+        except JWTError as exc:
+            raise InvalidTokenError(str(exc)) from exc
+
+
+def _b64encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def _b64decode(data: bytes) -> bytes:
+    return base64.urlsafe_b64decode(data + b"=" * (-len(data) % 4))
+
+
+class CompactCodec(JWTCodec):
+    """Encoding and checks of the claims shared by the codecs that implement a single algorithm"""
+
+    def __init__(self, algorithm: str):
+        self.algorithm = algorithm
+        # Same bytes as python-jose produces, headers of tokens issued here are compared instead of parsed
+        self._header = _b64encode(json.dumps({"alg": algorithm, "typ": "JWT"}, separators=(",", ":")).encode())
+
+    @abstractmethod
+    def _sign(self, signing_input: bytes) -> bytes: ...
+
+    @abstractmethod
+    def _verify(self, signing_input: bytes, signature: bytes) -> bool: ...
+
+    def encode(self, claims: Dict[str, Any]) -> str:
+        payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+        signing_input = self._header + b"." + payload
+        return (signing_input + b"." + _b64encode(self._sign(signing_input))).decode()
+
+    def decode(self, token: str) -> Dict[str, Any]:
+        try:
+            signing_input, _, signature = token.encode("ascii").rpartition(b".")
+            header, _, payload = signing_input.partition(b".")
+            if header != self._header and json.loads(_b64decode(header)).get("alg") != self.algorithm:
+                raise InvalidTokenError("The specified alg value is not allowed")
+            if not self._verify(signing_input, _b64decode(signature)):
+                raise InvalidTokenError("Signature verification failed")
+            claims = json.loads(_b64decode(payload))
+        except (ValueError, AttributeError, binascii.Error) as exc:
+            raise InvalidTokenError("Invalid token") from exc
+
+        if not isinstance(claims, dict):
+            raise InvalidTokenError("Invalid payload")
+        now = time.time()
+        expires_at, not_before = claims.get("exp"), claims.get("nbf")
+        if expires_at is not None and (not isinstance(expires_at, (int, float)) or expires_at <= now):
+            raise InvalidTokenError("Signature has expired")
+        if not_before is not None and (not isinstance(not_before, (int, float)) or not_before > now):
+            raise InvalidTokenError("The token is not yet valid")
+        return claims
+
+
+class HMACCodec(CompactCodec):
+    def __init__(self, algorithm: str, secret: str):
+        """
+        Args:
+            algorithm (str): HS256, HS384 or HS512.
+            secret (str): The shared secret.
+        """
+        if algorithm not in HMAC_ALGORITHMS:
+            raise ValueError(f"HMACCodec does not support {algorithm}")
+        super().__init__(algorithm)
+        self._digest = HMAC_ALGORITHMS[algorithm]
+        self._secret = secret.encode()
+
+    def _sign(self, signing_input: bytes) -> bytes:
+        return hmac.new(self._secret, signing_input, self._digest).digest()
+
+    def _verify(self, signing_input: bytes, signature: bytes) -> bool:
+        return hmac.compare_digest(self._sign(signing_input), signature)
+
+
+class EdDSACodec(CompactCodec):
+    def __init__(self, private_key: Optional[Ed25519PrivateKey], public_key: Optional[Ed25519PublicKey] = None):
+        """
+        Args:
+            private_key (Optional[Ed25519PrivateKey]): The signing key, None for a codec that only verifies.
+            public_key (Optional[Ed25519PublicKey], optional): The verifying key, derived from the private key
+                if None.
+        """
+        if public_key is None:
+            if private_key is None:
+                raise ValueError("EdDSACodec requires a private or a public key")
+            public_key = private_key.public_key()
+        super().__init__("EdDSA")
+        self._private_key = private_key
+        self._public_key = public_key
+
+    @classmethod
+    def from_pem(cls, private_pem: Optional[bytes] = None, public_pem: Optional[bytes] = None) -> "EdDSACodec":
+        """
+        Load the keys, e.g. made with `openssl genpkey -algorithm ed25519` and `openssl pkey -pubout`.
+
+        Args:
+            private_pem (Optional[bytes], optional): The PKCS#8 private key.
+            public_pem (Optional[bytes], optional): The SubjectPublicKeyInfo public key.
+
+        Returns:
+            EdDSACodec: The codec.
+        """
+        private_key = serialization.load_pem_private_key(private_pem, password=None) if private_pem else None
+        public_key = serialization.load_pem_public_key(public_pem) if public_pem else None
+        if private_key is not None and not isinstance(private_key, Ed25519PrivateKey):
+            raise ValueError("The private key is not an Ed25519 key")
+        if public_key is not None and not isinstance(public_key, Ed25519PublicKey):
+            raise ValueError("The public key is not an Ed25519 key")
+        return cls(private_key, public_key)
+
+    def _sign(self, signing_input: bytes) -> bytes:
+        if self._private_key is None:
+            raise RuntimeError("The codec has no private key, it can only verify tokens")
+        return self._private_key.sign(signing_input)
+
+    def _verify(self, signing_input: bytes, signature: bytes) -> bool:
+        try:
+            self._public_key.verify(signature, signing_input)
+        except InvalidSignature:
+            return False
+        return True
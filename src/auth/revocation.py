@@ -0,0 +1,167 @@
+"""
+Revocation of access tokens without a database query per request.
+
+Revoked tokens are rows of `token_revocations`. Every worker mirrors the table in a Bloom filter: a token that
+is not in the filter has certainly not been revoked, which is the answer for almost every request. Only tokens
+the filter reports (revoked ones and a `error_rate` share of false positives) are checked against the table.
+
+The filter is brought up to date with the rows added since the previous synchronization at most every
+`sync_interval` seconds, by the request that finds it stale. A token revoked by another worker is therefore
+accepted by this one for up to `sync_interval` seconds. A Bloom filter cannot forget, so it is rebuilt from the
+rows of unexpired tokens every `rebuild_interval` seconds or once it holds `capacity` tokens.
+"""
+
+import asyncio
+import datetime
+import hashlib
+import logging
+import math
+import time
+from typing import Callable, Iterable, Optional
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from repositories.token_repository import TokenRepository
+from settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Overlap of consecutive synchronizations, longer than any transaction inserting revocations
+SYNC_MARGIN = datetime.timedelta(seconds=30)
+
+
+class BloomFilter:
+    """
+    Set of token IDs with false positives at a rate of `error_rate` while it holds at most `capacity` IDs,
+    and no false negatives.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, jti: UUID) -> Iterable[int]:
+        # Token IDs are random UUIDs from signed tokens, their halves serve as two independent hashes
+        value = jti.int
+        position, step = value >> 64, (value & 0xFFFFFFFFFFFFFFFF) | 1
+        for _ in range(self.hashes):
+            yield position % self.size
+            position += step
+
+    def add(self, jti: UUID) -> None:
+        for position in self._positions(jti):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, jti: UUID) -> bool:
+        # Inlined `_positions`: almost every lookup is of a token that is not in the filter and stops at the first bit
+        bits, size = self._bits, self.size
+        value = jti.int
+        position, step = value >> 64, (value & 0xFFFFFFFFFFFFFFFF) | 1
+        for _ in range(self.hashes):
+            index = position % size
+            if not bits[index >> 3] & (1 << (index & 7)):
+                return False
+            position += step
+        return True
+
+
+def token_id(value: str) -> UUID:
+    """
+    ID of a token given the value of its `jti` claim. Tokens issued here have random UUIDs, anything else is
+    hashed into one.
+    """
+    try:
+        return UUID(value)
+    except ValueError:
+        return UUID(bytes=hashlib.blake2b(value.encode(), digest_size=16).digest())
+
+
+class RevocationList:
+    def __init__(
+        self,
+        session_maker: Callable[[], async_sessionmaker[AsyncSession]],
+        capacity: int = 100_000,
+        error_rate: float = 0.001,
+        sync_interval: float = 1,
+        rebuild_interval: float = 3600,
+    ):
+        """
+        :param session_maker: Returns the factory of sessions of the primary, called on every use
+        :param capacity: Revoked unexpired tokens the filter keeps the error rate for
+        :param error_rate: Share of tokens that are not revoked but are checked against the database
+        :param sync_interval: Seconds between synchronizations with the table
+        :param rebuild_interval: Seconds between rebuilds of the filter
+        """
+        self._session_maker = session_maker
+        self._capacity = capacity
+        self._error_rate = error_rate
+        self.sync_interval = sync_interval
+        self.rebuild_interval = rebuild_interval
+        self._filter = BloomFilter(capacity, error_rate)
+        self._synced_at: Optional[datetime.datetime] = None
+        self._next_sync = 0.0
+        self._next_rebuild = 0.0
+        self._lock = asyncio.Lock()
+
+    def add(self, jtis: Iterable[UUID]) -> None:
+        """Add tokens revoked by this worker, other workers see them after their next synchronization"""
+        for jti in jtis:
+            self._filter.add(jti)
+
+    async def is_revoked(self, jti: UUID) -> bool:
+        """
+        Check whether the token has been revoked. Costs a query only for tokens in the filter, and a
+        synchronization once per `sync_interval` seconds.
+        """
+        if time.monotonic() >= self._next_sync and not self._lock.locked():
+            await self.sync()
+        if jti not in self._filter:
+            return False
+
+        async with self._session_maker()() as session:
+            return await TokenRepository(session).is_revoked(jti)
+
+    async def sync(self) -> None:
+        """Add the revocations made since the previous synchronization, or rebuild the filter when it is due"""
+        async with self._lock:
+            rebuild = time.monotonic() >= self._next_rebuild or self._filter.count >= self._filter.capacity
+            since = None if rebuild or self._synced_at is None else self._synced_at - SYNC_MARGIN
+            try:
+                async with self._session_maker()() as session:
+                    repository = TokenRepository(session)
+                    if rebuild:
+                        await repository.delete_expired()
+                    jtis, synced_at = await repository.get_revocations(since)
+            except Exception:
+                # Tokens revoked elsewhere stay valid here a little longer, requests are not failed because of it
+                logger.exception("Cannot synchronize revoked tokens")
+                self._next_sync = time.monotonic() + self.sync_interval
+                return
+
+            if since is None:
+                self._filter = BloomFilter(max(self._capacity, 2 * len(jtis)), self._error_rate)
+                self._next_rebuild = time.monotonic() + self.rebuild_interval
+            self.add(jtis)
+            self._synced_at = synced_at
+            self._next_sync = time.monotonic() + self.sync_interval
+
+
+def _primary_session_maker() -> async_sessionmaker[AsyncSession]:
+    # Looked up on every use: reads from a lagging replica could miss fresh revocations
+    from core.database import session_router
+
+    return session_router.primary
+
+
+revocation_list = RevocationList(
+    _primary_session_maker,
+    capacity=settings.auth.revocation_filter_capacity,
+    error_rate=settings.auth.revocation_filter_error_rate,
+    sync_interval=settings.auth.revocation_sync_interval,
+    rebuild_interval=settings.auth.revocation_rebuild_interval,
+)
@@ -1,16 +1,85 @@
+import hashlib
+import secrets
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Optional, Tuple
+from uuid import uuid4
 
-from jose import jwt
 from passlib.context import CryptContext
 
-from settings import settings
+from auth.jwt_codecs import EdDSACodec, HMACCodec, JoseCodec, JWTCodec
+from settings import AuthSettings, settings
 
 SECRET_KEY = settings.auth.secret_key
 ALGORITHM = settings.auth.algorithm
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.auth.access_token_expire_minutes
+REFRESH_TOKEN_EXPIRE_DAYS = settings.auth.refresh_token_expire_days
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+PASSWORD_HASH_SCHEMES = ("bcrypt", "argon2")
+
+
+def create_password_context(config: AuthSettings) -> CryptContext:
+    """
+    Create the context hashing passwords under the configured policy.
+
+    Hashes of every known scheme are verified. Hashes of another scheme, or of the same scheme with another cost,
+    are reported by `password_needs_update`.
+
+    Args:
+        config (AuthSettings): Settings with the scheme and the cost of new hashes.
+
+    Returns:
+        CryptContext: The password context.
+    """
+    schemes = [config.password_hash_scheme]
+    schemes += [scheme for scheme in PASSWORD_HASH_SCHEMES if scheme != config.password_hash_scheme]
+    return CryptContext(
+        schemes=schemes,
+        deprecated="auto",
+        bcrypt__rounds=config.bcrypt_rounds,
+        bcrypt__min_rounds=config.bcrypt_rounds,
+        bcrypt__max_rounds=config.bcrypt_rounds,
+        argon2__type="ID",
+        argon2__rounds=config.argon2_time_cost,
+        argon2__min_rounds=config.argon2_time_cost,
+        argon2__max_rounds=config.argon2_time_cost,
+        argon2__memory_cost=config.argon2_memory_cost,
+        argon2__parallelism=config.argon2_parallelism,
+    )
+
+
+pwd_context = create_password_context(settings.auth)
+
+
+def create_jwt_codec(config: AuthSettings) -> JWTCodec:
+    """
+    Create the codec signing and verifying access tokens.
+
+    Args:
+        config (AuthSettings): Settings with the codec, the algorithm and its key.
+
+    Raises:
+        ValueError: If the codec does not support the algorithm or the key is missing.
+
+    Returns:
+        JWTCodec: The codec.
+    """
+    private_key = None
+    if config.jwt_private_key_file:
+        with open(config.jwt_private_key_file, "rb") as key_file:
+            private_key = key_file.read()
+
+    if config.jwt_codec == "jose":
+        if config.algorithm == "EdDSA":
+            raise ValueError("EdDSA requires JWT_CODEC=native")
+        return JoseCodec(config.algorithm, private_key.decode() if private_key else config.secret_key)
+    if config.algorithm == "EdDSA":
+        if private_key is None:
+            raise ValueError("EdDSA requires JWT_PRIVATE_KEY_FILE")
+        return EdDSACodec.from_pem(private_key)
+    return HMACCodec(config.algorithm, config.secret_key)
+
+
+jwt_codec = create_jwt_codec(settings.auth)
 
 
 def get_password_hash(password: str):
@@ -26,9 +95,36 @@ def get_password_hash(password: str):
     return pwd_context.hash(password)
 
 
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verify a password against its hash.
+
+    Args:
+        plain_password (str): The password to check.
+        hashed_password (str): The stored password hash.
+
+    Returns:
+        bool: True if the password matches the hash, otherwise False.
+    """
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+def password_needs_update(hashed_password: str) -> bool:
+    """
+    Check whether a hash was made under another policy. Only the hash string is parsed, it is cheap.
+
+    Args:
+        hashed_password (str): The stored password hash.
+
+    Returns:
+        bool: True if the password should be hashed again, otherwise False.
+    """
+    return pwd_context.needs_update(hashed_password)
+
+
 def create_access_token(*, data: dict, expires_delta: Optional[timedelta] = None):
     """
-    Create an access token.
+    Create an access token. A random `jti` claim is added unless the data has one, tokens are revoked by it.
 
     Args:
         data (dict): The data to encode in the token.
@@ -44,7 +140,32 @@ def create_access_token(*, data: dict, expires_delta: Optional[timedelta] = None
     else:
         expire = datetime.now(timezone.utc) + timedelta(minutes=30)
 
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    to_encode.update({"exp": int(expire.timestamp())})
+    to_encode.setdefault("jti", str(uuid4()))
+    encoded_jwt = jwt_codec.encode(to_encode)
 
     return encoded_jwt
+
+
+def create_refresh_token() -> Tuple[str, str]:
+    """
+    Create an opaque refresh token.
+
+    Returns:
+        Tuple[str, str]: The token and its digest, only the digest is stored.
+    """
+    token = secrets.token_urlsafe(32)
+    return token, hash_refresh_token(token)
+
+
+def hash_refresh_token(token: str) -> str:
+    """
+    Digest of a refresh token. Tokens are random, a fast hash is enough to keep them unusable if the table leaks.
+
+    Args:
+        token (str): The refresh token.
+
+    Returns:
+        str: The SHA-256 digest of the token.
+    """
+    return hashlib.sha256(token.encode()).hexdigest()
@@ -1,17 +1,80 @@
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator, Dict
+from uuid import uuid4
 
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base
+from starlette.requests import Request
 
-from settings import settings
+from core.metrics import instrument_engine
+from core.pool import InstrumentedNullPool, InstrumentedQueuePool
+from core.routing import SessionRouter
+from settings import DatabaseSettings, settings
 
 Base = declarative_base()
 metadata = Base.metadata
 
-engine = create_async_engine(settings.postgres.db_url)
+
+def get_engine_options(database: DatabaseSettings) -> Dict[str, Any]:
+    """
+    Build keyword arguments of `create_async_engine` from the settings.
+
+    :param database: Settings of the pool and the driver
+    :return: Engine options
+    """
+    connect_args: Dict[str, Any] = {}
+    if database.statement_timeout:
+        connect_args["server_settings"] = {"statement_timeout": str(database.statement_timeout)}
+
+    if database.pgbouncer:
+        # PgBouncer in transaction mode may hand every statement to a different server connection,
+        # so neither prepared statements nor application-side pooling can be relied upon
+        connect_args.update(
+            statement_cache_size=0,
+            prepared_statement_cache_size=0,
+            prepared_statement_name_func=lambda: f"__asyncpg_{uuid4()}__",
+        )
+        return {"poolclass": InstrumentedNullPool, "connect_args": connect_args}
+
+    connect_args["prepared_statement_cache_size"] = database.prepared_statement_cache_size
+    return {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": database.pool_size,
+        "max_overflow": database.max_overflow,
+        "pool_timeout": database.pool_timeout,
+        "pool_recycle": database.pool_recycle,
+        "pool_pre_ping": database.pool_pre_ping,
+        "connect_args": connect_args,
+    }
+
+
+engine = create_async_engine(settings.postgres.db_url, **get_engine_options(settings.database))
+instrument_engine(engine)
 async_session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+# Reads of GET requests go to the replica when one is configured, see `core.routing`
+replica_engine = None
+replica_session_maker = None
+if settings.postgres.replica_db_url is not None:
+    replica_engine = create_async_engine(settings.postgres.replica_db_url, **get_engine_options(settings.database))
+    instrument_engine(replica_engine, "replica")
+    replica_session_maker = async_sessionmaker(replica_engine, class_=AsyncSession, expire_on_commit=False)
+
+session_router = SessionRouter(
+    async_session_maker, replica_session_maker, stickiness=settings.database.replica_stickiness
+)
+
+
+async def get_async_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    async with session_router.get_session_maker(request)() as session:
+        yield session
+
+
+async def get_primary_session() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Session bound to the primary for any request.
 
-async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
-    async with async_session_maker() as session:
+    For reads whose results are stored in the shared response cache: a lagging replica could put stale data back
+    into the cache right after a write has invalidated it, for all clients and for the whole TTL.
+    """
+    async with session_router.primary() as session:
         yield session
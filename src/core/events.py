@@ -0,0 +1,256 @@
+"""
+Real-time events of users, streamed as server-sent events.
+
+Every event written to the outbox is also published on the `outbox_events` channel by a trigger. Notifications
+are sent by Postgres on commit, so rolled back changes are never pushed. Every worker listens on one dedicated
+connection, outside the pool and never through PgBouncer (`POSTGRES_DIRECT_HOST`), and fans notifications out to
+the streams of its subscribers: idle subscribers hold no database connection at all.
+
+A stream is authorized once, when it is opened: it is closed when the access token expires or, checked on every
+heartbeat, when the token is revoked. The client reconnects with a fresh token.
+
+A stream resumes after `Last-Event-ID` from the recent events the worker keeps in memory. When the event is not
+there anymore (or notifications may have been missed while the connection was lost), the client gets a `resync`
+event and is expected to reload the state it shows.
+"""
+
+import asyncio
+import functools
+import logging
+import time
+from collections import deque
+from typing import AsyncIterator, Awaitable, Callable, Deque, Dict, Optional, Set, Tuple, Union
+
+import asyncpg
+import orjson
+
+from core.metrics import EVENT_STREAMS, EVENTS_PUSHED
+from models.outbox import APPLICATION_APPROVED, APPLICATION_CREATED, APPLICATION_REJECTED, NOTIFY_CHANNEL
+from settings import DatabaseSettings, PostgresSettings, settings
+
+logger = logging.getLogger(__name__)
+
+# Field of the payload with the ID of the user the event is pushed to
+RECIPIENTS = {
+    APPLICATION_CREATED: "owner_id",
+    APPLICATION_APPROVED: "user_id",
+    APPLICATION_REJECTED: "user_id",
+}
+
+RESYNC = b"event: resync\ndata: {}\n\n"
+# Milliseconds the browser waits before reconnecting a closed stream
+RETRY = 3000
+HEARTBEAT = b": heartbeat\n\n"
+
+
+def format_event(event_id: str, event_type: str, data: bytes) -> bytes:
+    return b"id: %s\nevent: %s\ndata: %s\n\n" % (event_id.encode(), event_type.encode(), data)
+
+
+class Subscription:
+    """Queue of messages of a single stream. A subscriber that falls behind gets a `resync` instead of the backlog"""
+
+    def __init__(self, user_id: str, maxsize: int):
+        self.user_id = user_id
+        self._queue: asyncio.Queue[bytes] = asyncio.Queue(maxsize=maxsize)
+
+    def put(self, message: bytes) -> None:
+        try:
+            self._queue.put_nowait(message)
+        except asyncio.QueueFull:
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            self._queue.put_nowait(RESYNC)
+
+    async def get(self, timeout: float) -> Optional[bytes]:
+        """Next message, None if there was none within `timeout` seconds"""
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class EventBroadcaster:
+    """
+    Fans notifications of the outbox out to the streams of the worker.
+
+    The connection is opened on the first subscription and reopened whenever it is lost, it is checked every
+    `heartbeat_interval` seconds. `dsn` may be a function, it is called on the first subscription: a worker that
+    never streams events (or a script importing the app) does not need a connection it could listen on.
+    """
+
+    def __init__(
+        self,
+        dsn: Union[str, Callable[[], str]],
+        heartbeat_interval: float = 15,
+        replay_size: int = 1024,
+        queue_size: int = 256,
+        connect_timeout: float = 5,
+    ):
+        self.heartbeat_interval = heartbeat_interval
+        self._dsn = dsn
+        self._queue_size = queue_size
+        self._connect_timeout = connect_timeout
+        self._subscriptions: Dict[str, Set[Subscription]] = {}
+        # Recent events of all users: (event ID, recipient ID, message)
+        self._recent: Deque[Tuple[str, str, bytes]] = deque(maxlen=replay_size)
+        self._listening = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """
+        Start listening unless the worker already does, and wait until notifications are received.
+
+        :raises TimeoutError: If the connection could not be established within `connect_timeout` seconds
+        :raises RuntimeError: If there is no connection that can receive notifications, see `listen_dsn`
+        """
+        if self._task is None or self._task.done():
+            if callable(self._dsn):
+                self._dsn = self._dsn()
+            self._task = asyncio.create_task(self._listen())
+        await asyncio.wait_for(self._listening.wait(), timeout=self._connect_timeout)
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _listen(self) -> None:
+        reconnected = False
+        while True:
+            try:
+                connection = await asyncpg.connect(self._dsn, timeout=self._connect_timeout)
+            except (OSError, asyncio.TimeoutError, asyncpg.PostgresError) as exc:
+                logger.warning("Cannot listen to %s: %r", NOTIFY_CHANNEL, exc)
+                await asyncio.sleep(self.heartbeat_interval)
+                continue
+
+            try:
+                await connection.add_listener(NOTIFY_CHANNEL, self._on_notification)
+                if reconnected:
+                    # Notifications sent while the connection was lost are gone
+                    self._recent.clear()
+                    self._broadcast(RESYNC)
+                self._listening.set()
+                reconnected = True
+                while True:
+                    await asyncio.sleep(self.heartbeat_interval)
+                    await connection.fetchval("SELECT 1", timeout=self._connect_timeout)
+            except (OSError, asyncio.TimeoutError, asyncpg.PostgresError, asyncpg.InterfaceError) as exc:
+                logger.warning("Lost the connection listening to %s: %r", NOTIFY_CHANNEL, exc)
+            finally:
+                self._listening.clear()
+                connection.terminate()
+
+    def _on_notification(self, connection: asyncpg.Connection, pid: int, channel: str, payload: str) -> None:
+        event = orjson.loads(payload)
+        recipient_field = RECIPIENTS.get(event["type"])
+        if recipient_field is None:
+            return
+
+        recipient = event["payload"][recipient_field]
+        message = format_event(event["id"], event["type"], payload.encode())
+        self._recent.append((event["id"], recipient, message))
+        for subscription in self._subscriptions.get(recipient, ()):
+            subscription.put(message)
+            EVENTS_PUSHED.inc()
+
+    def _broadcast(self, message: bytes) -> None:
+        for subscriptions in self._subscriptions.values():
+            for subscription in subscriptions:
+                subscription.put(message)
+
+    def subscribe(self, user_id: str, last_event_id: Optional[str] = None) -> Subscription:
+        """
+        Subscribe to the events of the user.
+
+        :param user_id: ID of the user
+        :param last_event_id: ID of the last event the client has received, the events after it are replayed
+        :return: Subscription to pass to `unsubscribe` once the stream is closed
+        """
+        subscription = Subscription(user_id, self._queue_size)
+        if last_event_id is not None:
+            ids = [event_id for event_id, _, _ in self._recent]
+            if last_event_id in ids:
+                for _, recipient, message in list(self._recent)[ids.index(last_event_id) + 1 :]:
+                    if recipient == user_id:
+                        subscription.put(message)
+            else:
+                subscription.put(RESYNC)
+
+        # Registered right after the replay, no notification can be handled in between
+        self._subscriptions.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscriptions = self._subscriptions.get(subscription.user_id)
+        if subscriptions is not None:
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscriptions[subscription.user_id]
+
+    async def stream(
+        self,
+        user_id: str,
+        last_event_id: Optional[str] = None,
+        expires_at: Optional[float] = None,
+        is_revoked: Optional[Callable[[], Awaitable[bool]]] = None,
+    ) -> AsyncIterator[bytes]:
+        """
+        Body of the event stream of the user, a comment is sent when there was nothing to send for
+        `heartbeat_interval` seconds, so proxies do not close the idle connection.
+
+        :param user_id: ID of the user
+        :param last_event_id: ID of the last event the client has received
+        :param expires_at: Unix timestamp the stream ends at, the expiry of the access token it was opened with
+        :param is_revoked: Tells whether the access token has been revoked, called on every heartbeat
+        """
+        subscription = self.subscribe(user_id, last_event_id)
+        EVENT_STREAMS.inc()
+        try:
+            yield b"retry: %d\n\n" % RETRY
+            while True:
+                timeout = self.heartbeat_interval
+                if expires_at is not None:
+                    timeout = min(timeout, expires_at - time.time())
+                    if timeout <= 0:
+                        return
+                message = await subscription.get(timeout)
+                if message is not None:
+                    yield message
+                elif expires_at is None or time.time() < expires_at:
+                    if is_revoked is not None and await is_revoked():
+                        return
+                    yield HEARTBEAT
+        finally:
+            EVENT_STREAMS.dec()
+            self.unsubscribe(subscription)
+
+
+def listen_dsn(postgres: PostgresSettings, database: DatabaseSettings) -> str:
+    """
+    URL of the connection listening to notifications.
+
+    :raises RuntimeError: If connections go through PgBouncer and there is no direct host: LISTEN does not work
+        with transaction pooling
+    """
+    if database.pgbouncer and not postgres.direct_host:
+        raise RuntimeError("DB_PGBOUNCER requires POSTGRES_DIRECT_HOST, notifications cannot be received through it")
+    return postgres.direct_dsn
+
+
+event_broadcaster = EventBroadcaster(
+    functools.partial(listen_dsn, settings.postgres, settings.database),
+    heartbeat_interval=settings.events.heartbeat_interval,
+    replay_size=settings.events.replay_size,
+    queue_size=settings.events.queue_size,
+    connect_timeout=settings.events.connect_timeout,
+)
+
+
+def get_event_broadcaster() -> EventBroadcaster:
+    return event_broadcaster
@@ -0,0 +1,108 @@
+import asyncio
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from core.database import engine
+from core.pool import get_pool_metrics
+from settings import settings
+
+
+class ReadinessProbe:
+    """
+    Checks that the worker can serve requests that need the database.
+
+    The result is cached for `interval` seconds and concurrent probes wait for the check that is already running,
+    so the load balancer cannot make the worker query the database more often than once per interval.
+    `SELECT 1` runs on a connection checked out of the shared pool, no dedicated connection is opened.
+
+    The worker is reported as degraded when connections waited in the pool of the engine longer than
+    `degraded_wait` seconds on average since the previous check, or when a checkout timed out.
+    """
+
+    def __init__(self, engine: AsyncEngine, interval: float, timeout: float, degraded_wait: float):
+        self._engine = engine
+        self._interval = interval
+        self._timeout = timeout
+        self._degraded_wait = degraded_wait
+        self._lock = asyncio.Lock()
+        self._result: Optional[Dict[str, Any]] = None
+        self._checked_at = 0.0
+        metrics = get_pool_metrics(engine.pool)
+        self._checkouts = metrics.checkouts
+        self._wait_seconds_total = metrics.wait_seconds_total
+        self._timeouts = metrics.timeouts
+
+    async def check(self) -> Dict[str, Any]:
+        if self._is_fresh():
+            return self._result
+
+        async with self._lock:
+            # Another probe may have refreshed the result while this one was waiting for the lock
+            if not self._is_fresh():
+                self._result = await self._run()
+                self._checked_at = time.monotonic()
+        return self._result
+
+    def reset(self) -> None:
+        self._result = None
+
+    def _is_fresh(self) -> bool:
+        return self._result is not None and time.monotonic() - self._checked_at < self._interval
+
+    async def _run(self) -> Dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._ping(), timeout=self._timeout)
+            database = {"reachable": True, "latency_seconds": round(time.perf_counter() - started, 6)}
+        except Exception as exc:
+            database = {"reachable": False, "error": type(exc).__name__}
+
+        pool = self._pool_status()
+        if not database["reachable"]:
+            status = "unavailable"
+        elif pool["wait_seconds_mean"] > self._degraded_wait or pool["timeouts"]:
+            status = "degraded"
+        else:
+            status = "ok"
+        return {"status": status, "database": database, "pool": pool}
+
+    async def _ping(self) -> None:
+        async with self._engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+
+    def _pool_status(self) -> Dict[str, Any]:
+        """Pool occupancy now and the checkout statistics since the previous check"""
+        metrics = get_pool_metrics(self._engine.pool)
+        checkouts = metrics.checkouts - self._checkouts
+        wait_seconds = metrics.wait_seconds_total - self._wait_seconds_total
+        timeouts = metrics.timeouts - self._timeouts
+        self._checkouts = metrics.checkouts
+        self._wait_seconds_total = metrics.wait_seconds_total
+        self._timeouts = metrics.timeouts
+
+        status: Dict[str, Any] = {
+            "checkouts": checkouts,
+            "timeouts": timeouts,
+            "wait_seconds_mean": round(wait_seconds / checkouts, 6) if checkouts else 0.0,
+        }
+        pool = self._engine.pool
+        if isinstance(pool, AsyncAdaptedQueuePool):
+            capacity = pool.size() + pool._max_overflow
+            status.update(
+                checked_out=pool.checkedout(),
+                capacity=capacity,
+                saturation=round(pool.checkedout() / capacity, 3),
+            )
+        return status
+
+
+readiness_probe = ReadinessProbe(
+    engine,
+    interval=settings.health.check_interval,
+    timeout=settings.health.check_timeout,
+    degraded_wait=settings.health.degraded_pool_wait / 1000,
+)
@@ -0,0 +1,215 @@
+"""
+Prometheus metrics of HTTP requests, SQL statements, connection pools, rate limiting, the outbox dispatcher and
+event streams.
+
+Under gunicorn every worker is a separate process. When `PROMETHEUS_MULTIPROC_DIR` is set, metrics are written
+to files in that directory and `/api/metrics` aggregates the numbers of all workers.
+"""
+
+import os
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+REQUESTS = Counter(
+    "http_requests_total",
+    "Number of HTTP requests",
+    ["method", "route", "status"],
+)
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Latency of HTTP requests",
+    ["method", "route"],
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "Number of HTTP requests being processed",
+    multiprocess_mode="livesum",
+)
+STATEMENT_DURATION = Histogram(
+    "db_statement_duration_seconds",
+    "Latency of SQL statements",
+    ["operation"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+REQUEST_STATEMENTS = Histogram(
+    "db_statements_per_request",
+    "Number of SQL statements executed while handling an HTTP request",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55),
+)
+REQUEST_DB_DURATION = Histogram(
+    "db_duration_per_request_seconds",
+    "Time spent in SQL statements while handling an HTTP request",
+    ["route"],
+)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time to get a connection out of the pool, including waiting for a free one",
+    ["engine"],
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+DB_POOL_CHECKOUT_TIMEOUTS = Counter(
+    "db_pool_checkout_timeouts_total",
+    "Number of checkouts that gave up waiting for a free connection",
+    ["engine"],
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_connections_checked_out",
+    "Number of connections checked out of the pool",
+    ["engine"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow_connections",
+    "Number of connections opened beyond the size of the pool",
+    ["engine"],
+    multiprocess_mode="livesum",
+)
+OUTBOX_EVENTS = Counter(
+    "outbox_events_total",
+    "Number of outbox events processed by the dispatcher, by the outcome of the delivery",
+    ["event_type", "result"],
+)
+OUTBOX_BATCH_DURATION = Histogram(
+    "outbox_batch_duration_seconds",
+    "Time to claim, deliver and record a batch of outbox events",
+)
+OUTBOX_SINK_DURATION = Histogram(
+    "outbox_sink_duration_seconds",
+    "Latency of deliveries of single outbox events to a sink",
+    ["sink"],
+)
+OUTBOX_DELIVERY_LAG = Histogram(
+    "outbox_delivery_lag_seconds",
+    "Time from writing an outbox event to its delivery",
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 1800),
+)
+EVENT_STREAMS = Gauge(
+    "event_streams",
+    "Number of open server-sent event streams",
+    multiprocess_mode="livesum",
+)
+EVENTS_PUSHED = Counter(
+    "events_pushed_total",
+    "Number of events pushed to server-sent event streams",
+)
+RATE_LIMITED = Counter(
+    "rate_limited_requests_total",
+    "Number of requests rejected by rate limiting, by the policy and the kind of the exhausted bucket",
+    ["policy", "key"],
+)
+
+
+class _RequestDBStats:
+    __slots__ = ("statements", "duration")
+
+    def __init__(self):
+        self.statements = 0
+        self.duration = 0.0
+
+
+_request_db_stats: ContextVar[Optional[_RequestDBStats]] = ContextVar("request_db_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_started_at", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - conn.info["metrics_started_at"].pop()
+    operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+    if operation not in ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH"):
+        operation = "OTHER"
+    STATEMENT_DURATION.labels(operation).observe(duration)
+
+    stats = _request_db_stats.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.duration += duration
+
+
+def instrument_engine(engine: AsyncEngine, name: str = "primary") -> None:
+    """
+    Time every SQL statement executed by the engine and export the checkouts of its pool.
+
+    :param engine: Engine to listen to
+    :param name: Value of the `engine` label of the pool metrics
+    """
+    if not event.contains(engine.sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+    # Instrumented pools of `core.pool`, their counters carry over when the engine is disposed
+    pool_metrics = getattr(engine.pool, "metrics", None)
+    if pool_metrics is not None:
+        pool_metrics.name = name
+
+
+class PrometheusMiddleware:
+    """
+    Collects latency, status and SQL statistics of every HTTP request, labelled by route template.
+
+    Event streams last as long as the client stays connected: they are only counted in `http_requests_total`,
+    `EVENT_STREAMS` tracks the open ones.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        streaming = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, streaming
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                streaming = Headers(raw=message["headers"]).get("content-type", "").startswith("text/event-stream")
+                if streaming:
+                    REQUESTS_IN_PROGRESS.dec()
+            await send(message)
+
+        stats = _RequestDBStats()
+        token = _request_db_stats.set(stats)
+        REQUESTS_IN_PROGRESS.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - started
+            if not streaming:
+                REQUESTS_IN_PROGRESS.dec()
+            _request_db_stats.reset(token)
+
+            # The router stores the matched route in the scope, its path is the template with placeholders
+            route = scope.get("route")
+            route_path = getattr(route, "path", UNMATCHED_ROUTE)
+            method = scope["method"]
+
+            REQUESTS.labels(method, route_path, str(status_code)).inc()
+            if not streaming:
+                REQUEST_DURATION.labels(method, route_path).observe(duration)
+                REQUEST_STATEMENTS.labels(route_path).observe(stats.statements)
+                REQUEST_DB_DURATION.labels(route_path).observe(stats.duration)
+
+
+def render_metrics() -> bytes:
+    """Metrics in the Prometheus text format, aggregated over all workers in multiprocess mode"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
@@ -0,0 +1,255 @@
+"""
+Dispatcher of the transactional outbox.
+
+Repositories write events to `outbox_events` in the same statement as the change they describe, so an event exists
+if and only if the change has been committed and nothing is delivered within the request. The dispatcher drains
+the table in batches: it claims due events with `SELECT ... FOR UPDATE SKIP LOCKED`, delivers every event to all
+sinks and records the outcome in the same transaction, so any number of dispatchers can run side by side.
+
+Delivery is at least once: an event is delivered again when one of the sinks failed or the dispatcher died before
+committing, consumers deduplicate by the event ID. Failed deliveries are retried with exponential backoff, events
+that ran out of attempts are kept with `dead_at` set.
+
+    cd src && python -m core.outbox --metrics-port 9100
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import signal
+import time
+from abc import ABC, abstractmethod
+from contextlib import suppress
+from typing import List, Optional, Sequence
+
+import httpx
+import orjson
+from prometheus_client import start_http_server
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from core.metrics import OUTBOX_BATCH_DURATION, OUTBOX_DELIVERY_LAG, OUTBOX_EVENTS, OUTBOX_SINK_DURATION
+from models import OutboxEventModel
+from repositories.outbox_repository import OutboxRepository
+from settings import OutboxSettings, settings
+
+logger = logging.getLogger(__name__)
+
+
+def serialize_event(event: OutboxEventModel) -> bytes:
+    """JSON document of the event as sinks deliver it"""
+    return orjson.dumps(
+        {
+            "id": str(event.id),
+            "type": event.event_type,
+            "created_at": event.created_at.isoformat(),
+            "payload": event.payload,
+        }
+    )
+
+
+class OutboxSink(ABC):
+    """Destination of outbox events"""
+
+    name: str
+
+    @abstractmethod
+    async def deliver(self, event: OutboxEventModel) -> None:
+        """Deliver the event, raise if it has not been accepted"""
+
+    async def close(self) -> None:
+        pass
+
+
+class LogSink(OutboxSink):
+    """Writes events to the log"""
+
+    name = "log"
+
+    def __init__(self, logger_: Optional[logging.Logger] = None):
+        self._logger = logger_ or logging.getLogger("outbox.events")
+
+    async def deliver(self, event: OutboxEventModel) -> None:
+        self._logger.info("%s", serialize_event(event).decode())
+
+
+class WebhookSink(OutboxSink):
+    """Posts every event to the URL, any response but 2xx is a failed delivery"""
+
+    name = "webhook"
+
+    def __init__(self, url: str, timeout: float):
+        self._url = url
+        self._client = httpx.AsyncClient(timeout=timeout)
+
+    async def deliver(self, event: OutboxEventModel) -> None:
+        response = await self._client.post(
+            self._url,
+            content=serialize_event(event),
+            headers={"Content-Type": "application/json", "X-Event-Id": str(event.id), "X-Event-Type": event.event_type},
+        )
+        response.raise_for_status()
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+def backoff(attempts: int, base: float, maximum: float) -> float:
+    """
+    Delay before the next delivery of an event, exponential in the number of failed attempts.
+
+    The delay is drawn from its upper half, so events that failed together are not retried together.
+
+    :param attempts: Number of failed attempts so far, at least 1
+    :param base: Delay after the first failure
+    :param maximum: Upper bound of the delay
+    :return: Seconds until the next attempt
+    """
+    delay = min(base * 2 ** (attempts - 1), maximum)
+    return random.uniform(delay / 2, delay)
+
+
+class OutboxDispatcher:
+    def __init__(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        sinks: Sequence[OutboxSink],
+        batch_size: int = 100,
+        poll_interval: float = 1,
+        max_attempts: int = 10,
+        backoff_base: float = 1,
+        backoff_max: float = 300,
+    ):
+        self._session_maker = session_maker
+        self._sinks = sinks
+        self._batch_size = batch_size
+        self._poll_interval = poll_interval
+        self._max_attempts = max_attempts
+        self._backoff_base = backoff_base
+        self._backoff_max = backoff_max
+
+    async def dispatch_batch(self) -> int:
+        """
+        Claim a batch of due events, deliver them concurrently and record the outcome in one transaction.
+
+        :return: Number of claimed events
+        """
+        started = time.perf_counter()
+        async with self._session_maker() as session, session.begin():
+            repository = OutboxRepository(session)
+            claimed = await repository.claim(self._batch_size)
+            if not claimed:
+                return 0
+
+            errors = await asyncio.gather(*(self._deliver(event) for event, _ in claimed))
+            elapsed = time.perf_counter() - started
+
+            delivered = []
+            for (event, age), error in zip(claimed, errors):
+                if error is None:
+                    delivered.append(event.id)
+                    OUTBOX_EVENTS.labels(event.event_type, "delivered").inc()
+                    OUTBOX_DELIVERY_LAG.observe(age + elapsed)
+                elif event.attempts + 1 >= self._max_attempts:
+                    await repository.bury(event.id, error)
+                    OUTBOX_EVENTS.labels(event.event_type, "dead").inc()
+                    logger.error("Outbox event %s is dead after %s attempts: %s", event.id, event.attempts + 1, error)
+                else:
+                    delay = backoff(event.attempts + 1, self._backoff_base, self._backoff_max)
+                    await repository.retry(event.id, delay, error)
+                    OUTBOX_EVENTS.labels(event.event_type, "retried").inc()
+                    logger.warning("Outbox event %s is retried in %.1f s: %s", event.id, delay, error)
+            await repository.delete(delivered)
+
+        OUTBOX_BATCH_DURATION.observe(time.perf_counter() - started)
+        return len(claimed)
+
+    async def _deliver(self, event: OutboxEventModel) -> Optional[str]:
+        """Deliver the event to all sinks, stops at the first failure and returns its description"""
+        for sink in self._sinks:
+            started = time.perf_counter()
+            try:
+                await sink.deliver(event)
+            except Exception as exc:
+                return f"{sink.name}: {type(exc).__name__}: {exc}"
+            finally:
+                OUTBOX_SINK_DURATION.labels(sink.name).observe(time.perf_counter() - started)
+        return None
+
+    async def run(self, stop: asyncio.Event) -> None:
+        """
+        Drain the outbox until `stop` is set.
+
+        A full batch is followed by the next one right away, otherwise the outbox is polled again after
+        `poll_interval` seconds. Failed batches (e.g. a lost connection) are logged and retried.
+        """
+        while not stop.is_set():
+            try:
+                claimed = await self.dispatch_batch()
+            except Exception:
+                logger.exception("Outbox batch failed")
+                claimed = 0
+
+            if claimed < self._batch_size:
+                with suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(stop.wait(), timeout=self._poll_interval)
+
+    async def close(self) -> None:
+        for sink in self._sinks:
+            await sink.close()
+
+
+def create_sinks(config: OutboxSettings) -> List[OutboxSink]:
+    sinks: List[OutboxSink] = []
+    for name in config.sinks:
+        if name == "webhook":
+            if not config.webhook_url:
+                raise ValueError("OUTBOX_WEBHOOK_URL is required by the webhook sink")
+            sinks.append(WebhookSink(config.webhook_url, timeout=config.webhook_timeout))
+        else:
+            sinks.append(LogSink())
+    return sinks
+
+
+def create_dispatcher(config: OutboxSettings, session_maker: async_sessionmaker[AsyncSession]) -> OutboxDispatcher:
+    return OutboxDispatcher(
+        session_maker,
+        create_sinks(config),
+        batch_size=config.batch_size,
+        poll_interval=config.poll_interval,
+        max_attempts=config.max_attempts,
+        backoff_base=config.backoff_base,
+        backoff_max=config.backoff_max,
+    )
+
+
+async def _serve(metrics_port: Optional[int]) -> None:
+    from core.database import async_session_maker, engine
+
+    if metrics_port is not None:
+        start_http_server(metrics_port)
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop.set)
+
+    dispatcher = create_dispatcher(settings.outbox, async_session_maker)
+    try:
+        await dispatcher.run(stop)
+    finally:
+        await dispatcher.close()
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--metrics-port", type=int, default=None, help="Serve Prometheus metrics on the port")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+    asyncio.run(_serve(args.metrics_port))
+
+
+if __name__ == "__main__":
+    main()
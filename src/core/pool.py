@@ -0,0 +1,135 @@
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, Pool
+
+from core.metrics import DB_POOL_CHECKED_OUT, DB_POOL_CHECKOUT_TIMEOUTS, DB_POOL_CHECKOUT_WAIT, DB_POOL_OVERFLOW
+
+
+class PoolMetrics:
+    """
+    Counters of connection checkouts of one pool, collected per worker process.
+
+    Once the pool is named by `core.metrics.instrument_engine`, they are also exported to Prometheus with the name
+    as the `engine` label, so that `/api/metrics` adds up the pools of all workers.
+    """
+
+    def __init__(self):
+        self.name: Optional[str] = None
+        self.checkouts = 0
+        self.checked_out = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def observe(self, wait_seconds: float) -> None:
+        self.checkouts += 1
+        self.checked_out += 1
+        self.wait_seconds_total += wait_seconds
+        self.wait_seconds_max = max(self.wait_seconds_max, wait_seconds)
+        if self.name is not None:
+            DB_POOL_CHECKOUT_WAIT.labels(self.name).observe(wait_seconds)
+
+    def observe_timeout(self) -> None:
+        self.timeouts += 1
+        if self.name is not None:
+            DB_POOL_CHECKOUT_TIMEOUTS.labels(self.name).inc()
+
+    def observe_return(self) -> None:
+        self.checked_out -= 1
+
+    def export_occupancy(self, overflow: Optional[int]) -> None:
+        """
+        Publish the number of checked out connections and, for queue pools, of overflow connections.
+
+        :param overflow: Connections opened beyond the size of the pool, None for pools without a size
+        """
+        if self.name is None:
+            return
+        DB_POOL_CHECKED_OUT.labels(self.name).set(self.checked_out)
+        if overflow is not None:
+            # Negative while the pool has not opened all of its connections yet
+            DB_POOL_OVERFLOW.labels(self.name).set(max(overflow, 0))
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "checkouts": self.checkouts,
+            "checked_out": self.checked_out,
+            "timeouts": self.timeouts,
+            "wait_seconds_total": round(self.wait_seconds_total, 6),
+            "wait_seconds_max": round(self.wait_seconds_max, 6),
+        }
+
+
+class _CheckoutTimingMixin:
+    """
+    Measures how long it takes to get a connection out of the pool, including waiting for a free one.
+
+    Every pool counts its own checkouts, so the primary and the replica engines are reported separately.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def recreate(self):
+        # `Engine.dispose()` replaces the pool, the counters carry over to the new one
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.observe_timeout()
+            raise
+        self.metrics.observe(time.perf_counter() - started)
+        self.metrics.export_occupancy(self._overflow_count())
+        return connection
+
+    def _do_return_conn(self, record):
+        super()._do_return_conn(record)
+        self.metrics.observe_return()
+        self.metrics.export_occupancy(self._overflow_count())
+
+    def _overflow_count(self) -> Optional[int]:
+        return self.overflow() if isinstance(self, AsyncAdaptedQueuePool) else None
+
+
+class InstrumentedQueuePool(_CheckoutTimingMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+class InstrumentedNullPool(_CheckoutTimingMixin, NullPool):
+    pass
+
+
+def get_pool_metrics(pool: Pool) -> PoolMetrics:
+    """
+    Checkout counters of the pool.
+
+    :param pool: Pool of the engine
+    :return: Counters of an instrumented pool, empty ones for any other pool
+    """
+    return getattr(pool, "metrics", None) or PoolMetrics()
+
+
+def pool_status(pool: Pool) -> Dict[str, Any]:
+    """
+    Current state of the pool together with the checkout counters.
+
+    :param pool: Pool of the engine
+    :return: Pool occupancy (for queue pools) and checkout statistics
+    """
+    status = {"class": type(pool).__name__, **get_pool_metrics(pool).as_dict()}
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        status.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=pool.overflow(),
+        )
+    return status
@@ -0,0 +1,363 @@
+"""
+Rate limiting of abusable endpoints with token buckets.
+
+Every policy matches a single route and limits it per client IP and, optionally, per account named in the
+request body (e.g. the email a login is attempted for). A bucket holds up to `burst` tokens and refills at
+`burst` tokens per `period` seconds, every request takes one token. A request that finds a bucket empty is
+rejected with 429 and `Retry-After`.
+
+Limits are checked by a middleware before the request reaches the router: a rejected login costs neither a
+database lookup nor a password verification.
+
+The shared backend (the default) keeps the buckets of all workers of the machine in one memory-mapped file. With
+the local backend every gunicorn worker keeps its own buckets, so a client gets up to `workers` times the limit.
+
+The client IP is the one of the ASGI scope. Behind a proxy the server has to trust its `X-Forwarded-For`
+(`--forwarded-allow-ips`), otherwise all clients share the bucket of the proxy.
+"""
+
+import fcntl
+import hashlib
+import math
+import mmap
+import os
+import re
+import struct
+import tempfile
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+import orjson
+from fastapi.responses import ORJSONResponse
+from starlette import status
+from starlette.datastructures import Headers
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.metrics import RATE_LIMITED
+from settings import RateLimitSettings, settings
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600}
+_LIMIT_PATTERN = re.compile(r"^(\d+)/(second|minute|hour|\d+(?:\.\d+)?)$")
+
+# Bodies above it are passed through without looking for the account, only the IP limit applies to them
+MAX_INSPECTED_BODY = 64 * 1024
+
+
+class RateLimit(NamedTuple):
+    burst: int
+    period: float
+
+    @property
+    def rate(self) -> float:
+        """Tokens added per second"""
+        return self.burst / self.period
+
+    @classmethod
+    def parse(cls, value: str) -> Optional["RateLimit"]:
+        """
+        Parse a limit like `10/minute` or `10/30` (a period in seconds).
+
+        :param value: The limit, an empty string or a zero burst disables it
+        :return: The limit or None if it is disabled
+        :raises ValueError: If the value is malformed
+        """
+        if not value:
+            return None
+        match = _LIMIT_PATTERN.match(value)
+        if match is None:
+            raise ValueError(f"Invalid rate limit: {value}")
+
+        burst, period = int(match.group(1)), _PERIODS.get(match.group(2)) or float(match.group(2))
+        if burst == 0:
+            return None
+        if period <= 0:
+            raise ValueError(f"Invalid rate limit: {value}")
+        return cls(burst, period)
+
+
+def take_token(tokens: float, updated_at: float, now: float, limit: RateLimit) -> Tuple[float, float]:
+    """
+    Refill the bucket for the time passed since it was updated and take a token from it.
+
+    :return: Tokens left in the bucket and the seconds until a token is available, 0 if one was taken
+    """
+    tokens = min(float(limit.burst), tokens + max(now - updated_at, 0) * limit.rate)
+    if tokens >= 1:
+        return tokens - 1, 0
+    return tokens, (1 - tokens) / limit.rate
+
+
+class RateLimitBackend(ABC):
+    """Storage of token buckets"""
+
+    @abstractmethod
+    async def acquire(self, key: str, limit: RateLimit) -> float:
+        """
+        Take a token from the bucket, a bucket that has never been used is full.
+
+        :param key: Key of the bucket
+        :param limit: Limit of the bucket
+        :return: 0 if a token was taken, otherwise the seconds until one is available
+        """
+
+
+class LocalRateLimitBackend(RateLimitBackend):
+    """Buckets in the memory of the worker, the least recently used ones are dropped above `maxsize`"""
+
+    def __init__(self, maxsize: int):
+        self._maxsize = maxsize
+        self._buckets: OrderedDict[str, Tuple[float, float]] = OrderedDict()
+
+    async def acquire(self, key: str, limit: RateLimit) -> float:
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.get(key, (limit.burst, now))
+        tokens, wait = take_token(tokens, updated_at, now, limit)
+
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self._maxsize:
+            self._buckets.popitem(last=False)
+        return wait
+
+
+class SharedRateLimitBackend(RateLimitBackend):
+    """
+    Buckets in a memory-mapped file shared by all workers of the machine.
+
+    The file is a fixed hash table of `slots` slots: digest of the key, tokens and the time of the last update.
+    A key is looked up in `PROBES` consecutive slots, when all of them are taken by other keys the least recently
+    updated one is reused. Every lookup holds an exclusive `flock` on the file for a few microseconds.
+
+    The file is opened lazily in every process: a lock taken through a descriptor inherited from the gunicorn
+    master would not exclude the other workers.
+    """
+
+    SLOT = struct.Struct("<Qdd")
+    PROBES = 8
+
+    def __init__(self, path: str, slots: int):
+        self._path = path
+        self._slots = slots
+        self._size = slots * self.SLOT.size
+        self._pid: Optional[int] = None
+        self._fd = -1
+        self._mmap: Optional[mmap.mmap] = None
+
+    def _open(self) -> None:
+        if self._pid == os.getpid():
+            return
+
+        fd = os.open(self._path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            if os.fstat(fd).st_size != self._size:
+                # Left by a run with another number of slots, starting with full buckets is harmless
+                os.ftruncate(fd, 0)
+                os.ftruncate(fd, self._size)
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+
+        self._fd = fd
+        self._mmap = mmap.mmap(fd, self._size)
+        self._pid = os.getpid()
+
+    @contextmanager
+    def _locked(self) -> Iterator[mmap.mmap]:
+        self._open()
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            yield self._mmap
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _digest(self, key: str) -> int:
+        # 0 marks an empty slot
+        return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little") or 1
+
+    async def acquire(self, key: str, limit: RateLimit) -> float:
+        digest = self._digest(key)
+        start = digest % self._slots
+        with self._locked() as buckets:
+            now = time.time()
+            slot, tokens, updated_at = None, float(limit.burst), now
+            oldest, oldest_updated_at = start, math.inf
+            for probe in range(self.PROBES):
+                index = (start + probe) % self._slots
+                slot_digest, slot_tokens, slot_updated_at = self.SLOT.unpack_from(buckets, index * self.SLOT.size)
+                if slot_digest == digest:
+                    slot, tokens, updated_at = index, slot_tokens, slot_updated_at
+                    break
+                if slot_digest == 0:
+                    slot = index
+                    break
+                if slot_updated_at < oldest_updated_at:
+                    oldest, oldest_updated_at = index, slot_updated_at
+            if slot is None:
+                slot = oldest
+
+            tokens, wait = take_token(tokens, updated_at, now, limit)
+            self.SLOT.pack_into(buckets, slot * self.SLOT.size, digest, tokens, now)
+        return wait
+
+    def close(self) -> None:
+        if self._pid == os.getpid():
+            self._mmap.close()
+            os.close(self._fd)
+        self._pid = None
+
+
+class RateLimitPolicy(NamedTuple):
+    name: str
+    method: str
+    path: str
+    ip: Optional[RateLimit] = None
+    account: Optional[RateLimit] = None
+    # Form or JSON field of the request body with the account
+    account_field: Optional[str] = None
+
+
+class RateLimiter:
+    def __init__(self, backend: RateLimitBackend, policies: Iterable[RateLimitPolicy], enabled: bool = True):
+        self.backend = backend
+        self.policies: Dict[Tuple[str, str], RateLimitPolicy] = {
+            (policy.method, policy.path): policy for policy in policies
+        }
+        self.enabled = enabled
+
+    def match(self, scope: Scope) -> Optional[RateLimitPolicy]:
+        if not self.enabled:
+            return None
+        return self.policies.get((scope["method"], scope["path"]))
+
+    async def check(self, policy: RateLimitPolicy, ip: Optional[str], account: Optional[str]) -> float:
+        """
+        Take tokens from the buckets of the IP and the account, the account is not charged when the IP is limited.
+
+        :return: 0 if the request is allowed, otherwise the seconds until it would be
+        """
+        buckets: List[Tuple[str, str, RateLimit]] = []
+        if policy.ip is not None and ip is not None:
+            buckets.append(("ip", ip, policy.ip))
+        if policy.account is not None and account is not None:
+            buckets.append(("account", account, policy.account))
+
+        for kind, value, limit in buckets:
+            wait = await self.backend.acquire(f"{policy.name}:{kind}:{value}", limit)
+            if wait:
+                RATE_LIMITED.labels(policy.name, kind).inc()
+                return wait
+        return 0
+
+
+async def _read_body(receive: Receive) -> Tuple[List[Message], Optional[bytes]]:
+    """Messages of the request body read so far, and the body itself unless it is above `MAX_INSPECTED_BODY`"""
+    messages: List[Message] = []
+    size = 0
+    while True:
+        message = await receive()
+        messages.append(message)
+        if message["type"] != "http.request":
+            return messages, None
+        size += len(message.get("body", b""))
+        if size > MAX_INSPECTED_BODY:
+            return messages, None
+        if not message.get("more_body", False):
+            return messages, b"".join(m.get("body", b"") for m in messages)
+
+
+def _replay(messages: List[Message], receive: Receive) -> Receive:
+    pending = list(messages)
+
+    async def replay() -> Message:
+        if pending:
+            return pending.pop(0)
+        return await receive()
+
+    return replay
+
+
+async def _get_account(scope: Scope, messages: List[Message], body: bytes, field: str) -> Optional[str]:
+    try:
+        if Headers(scope=scope).get("content-type", "").startswith("application/json"):
+            data = orjson.loads(body)
+            value = data.get(field) if isinstance(data, dict) else None
+        else:
+            # Both url-encoded and multipart forms, the way the route itself will parse them
+            async with Request(scope, _replay(messages, _disconnected)).form() as form:
+                value = form.get(field)
+    except Exception:
+        return None
+    return value.strip().lower() if isinstance(value, str) and value.strip() else None
+
+
+async def _disconnected() -> Message:
+    return {"type": "http.disconnect"}
+
+
+class RateLimitMiddleware:
+    def __init__(self, app: ASGIApp, limiter: RateLimiter):
+        self.app = app
+        self.limiter = limiter
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        policy = self.limiter.match(scope) if scope["type"] == "http" else None
+        if policy is None:
+            await self.app(scope, receive, send)
+            return
+
+        account = None
+        if policy.account is not None and policy.account_field is not None:
+            messages, body = await _read_body(receive)
+            if body is not None:
+                account = await _get_account(scope, messages, body, policy.account_field)
+            receive = _replay(messages, receive)
+
+        client = scope.get("client")
+        wait = await self.limiter.check(policy, client[0] if client else None, account)
+        if wait:
+            response = ORJSONResponse(
+                {"detail": "Too many requests"},
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                headers={"Retry-After": str(max(math.ceil(wait), 1))},
+            )
+            await response(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
+
+
+def create_policies(config: RateLimitSettings) -> List[RateLimitPolicy]:
+    return [
+        RateLimitPolicy(
+            name="login",
+            method="POST",
+            path="/api/v1/auth/login",
+            ip=RateLimit.parse(config.login_ip),
+            account=RateLimit.parse(config.login_account),
+            account_field="username",
+        ),
+        RateLimitPolicy(
+            name="signup",
+            method="POST",
+            path="/api/v1/auth/signup",
+            ip=RateLimit.parse(config.signup_ip),
+            account=RateLimit.parse(config.signup_account),
+            account_field="email",
+        ),
+    ]
+
+
+def create_backend(config: RateLimitSettings) -> RateLimitBackend:
+    if config.backend == "shared":
+        path = config.shared_path or os.path.join(tempfile.gettempdir(), "code_together_rate_limit")
+        return SharedRateLimitBackend(path, slots=config.shared_slots)
+    return LocalRateLimitBackend(maxsize=config.local_size)
+
+
+rate_limiter = RateLimiter(
+    create_backend(settings.rate_limit), create_policies(settings.rate_limit), enabled=settings.rate_limit.enabled
+)
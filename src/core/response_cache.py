@@ -0,0 +1,146 @@
+"""
+Cache of serialized responses of public read endpoints.
+
+Entries are grouped by tags (e.g. every page of positions of a project shares the tag of the project).
+Every tag has a version stored next to the entries, invalidating a tag replaces its version, so all entries
+written under the old one are never read again and expire on their own.
+
+With the local backend every gunicorn worker has its own cache, invalidation reaches only the worker that made
+the write and other workers may serve stale data for up to `ttl` seconds. The Redis backend is shared by all
+workers.
+"""
+
+import hashlib
+from abc import ABC, abstractmethod
+from typing import Awaitable, Callable, NamedTuple, Optional
+from uuid import uuid4
+
+from core.cache import TTLCache
+from settings import ResponseCacheSettings, settings
+
+
+class CachedResponse(NamedTuple):
+    """Serialized JSON body together with its ETag"""
+
+    body: bytes
+    etag: str
+    next_cursor: Optional[str] = None
+
+    @classmethod
+    def from_body(cls, body: bytes, next_cursor: Optional[str] = None) -> "CachedResponse":
+        return cls(body, f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"', next_cursor)
+
+    def dump(self) -> bytes:
+        # Neither ETags nor cursors contain line breaks
+        return b"\n".join((self.etag.encode(), (self.next_cursor or "").encode(), self.body))
+
+    @classmethod
+    def load(cls, data: bytes) -> "CachedResponse":
+        etag, next_cursor, body = data.split(b"\n", 2)
+        return cls(body, etag.decode(), next_cursor.decode() or None)
+
+
+class CacheBackend(ABC):
+    """Storage of cache entries, values are kept for the `ttl` the backend was configured with"""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]: ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes) -> None: ...
+
+    @abstractmethod
+    async def delete(self, key: str) -> None: ...
+
+
+class LocalCacheBackend(CacheBackend):
+    """LRU cache in the memory of the worker"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache: TTLCache[str, bytes] = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._cache.get(key)
+
+    async def set(self, key: str, value: bytes) -> None:
+        self._cache.set(key, value)
+
+    async def delete(self, key: str) -> None:
+        self._cache.delete(key)
+
+    def stats(self):
+        return self._cache.stats()
+
+
+class RedisCacheBackend(CacheBackend):
+    """Cache shared by all workers, requires the `redis` extra"""
+
+    def __init__(self, url: str, ttl: float):
+        try:
+            from redis.asyncio import Redis
+        except ImportError as exc:
+            raise RuntimeError("Redis cache backend requires `redis`, install it with `poetry install -E redis`") from exc
+
+        self._redis = Redis.from_url(url)
+        self._ttl_ms = max(int(ttl * 1000), 1)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._redis.get(key)
+
+    async def set(self, key: str, value: bytes) -> None:
+        await self._redis.set(key, value, px=self._ttl_ms)
+
+    async def delete(self, key: str) -> None:
+        await self._redis.delete(key)
+
+
+class ResponseCache:
+    def __init__(self, backend: CacheBackend, prefix: str = "response"):
+        self.backend = backend
+        self._prefix = prefix
+
+    async def get_or_load(
+        self, tag: str, variant: str, load: Callable[[], Awaitable[CachedResponse]], fresh: bool = False
+    ) -> CachedResponse:
+        """
+        Get the cached response or build and store it.
+
+        :param tag: Tag the response is invalidated by
+        :param variant: Distinguishes responses under the same tag, e.g. different pages
+        :param load: Builds the response on a miss
+        :param fresh: Build the response even if it is cached, for clients that must read their own writes: the
+            write may have invalidated the cache of another worker only
+        :return: Cached or freshly built response
+        """
+        version = await self._get_version(tag)
+        key = f"{self._prefix}:{tag}:{version}:{variant}"
+
+        data = None if fresh else await self.backend.get(key)
+        if data is not None:
+            return CachedResponse.load(data)
+
+        response = await load()
+        await self.backend.set(key, response.dump())
+        return response
+
+    async def invalidate(self, *tags: str) -> None:
+        for tag in tags:
+            await self.backend.delete(f"{self._prefix}:{tag}")
+
+    async def _get_version(self, tag: str) -> str:
+        version_key = f"{self._prefix}:{tag}"
+        version = await self.backend.get(version_key)
+        if version is None:
+            # A version that has never been used, entries of previous versions cannot be hit anymore
+            version = uuid4().hex.encode()
+            await self.backend.set(version_key, version)
+        return version.decode()
+
+
+def create_backend(config: ResponseCacheSettings) -> CacheBackend:
+    if config.backend == "redis":
+        return RedisCacheBackend(config.redis_url, ttl=config.ttl)
+    return LocalCacheBackend(maxsize=config.size, ttl=config.ttl)
+
+
+response_cache = ResponseCache(create_backend(settings.response_cache))
@@ -0,0 +1,79 @@
+"""
+Routing of request sessions between the primary and a read replica.
+
+Sessions of GET and HEAD requests are bound to the replica, all other requests use the primary. A replica lags
+behind the primary, so a client that has just written something would not necessarily read it back: every
+successful write sets a cookie with the time until which the reads of the client stay on the primary. The stickiness
+window must exceed the replication lag. It is kept by the client, so it holds across workers.
+"""
+
+import time
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from starlette.requests import HTTPConnection
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+STICKY_COOKIE = "db_primary_until"
+READ_METHODS = frozenset({"GET", "HEAD"})
+
+
+class SessionRouter:
+    def __init__(
+        self,
+        primary: async_sessionmaker[AsyncSession],
+        replica: Optional[async_sessionmaker[AsyncSession]] = None,
+        stickiness: float = 5,
+    ):
+        self.primary = primary
+        self.replica = replica
+        self.stickiness = stickiness
+
+    def get_session_maker(self, connection: HTTPConnection) -> async_sessionmaker[AsyncSession]:
+        """
+        Session factory for the request.
+
+        :param connection: Incoming request
+        :return: Factory of replica sessions for reads of clients outside of their stickiness window,
+            of primary sessions otherwise
+        """
+        if self.replica is None or connection.scope.get("method") not in READ_METHODS:
+            return self.primary
+        if self.is_sticky(connection.cookies.get(STICKY_COOKIE)):
+            return self.primary
+        return self.replica
+
+    @staticmethod
+    def is_sticky(cookie: Optional[str]) -> bool:
+        try:
+            return cookie is not None and float(cookie) > time.time()
+        except ValueError:
+            return False
+
+    def sticky_cookie(self) -> bytes:
+        """`Set-Cookie` header value that keeps reads of the client on the primary for the stickiness window"""
+        until = time.time() + self.stickiness
+        max_age = int(self.stickiness) + 1
+        return f"{STICKY_COOKIE}={until:.3f}; Max-Age={max_age}; Path=/; HttpOnly; SameSite=Lax".encode()
+
+
+class ReplicaStickinessMiddleware:
+    """Sets the stickiness cookie on successful responses to writes, when a replica is configured"""
+
+    def __init__(self, app: ASGIApp, router: SessionRouter):
+        self.app = app
+        self.router = router
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] in READ_METHODS or self.router.replica is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                headers = list(message.get("headers", []))
+                headers.append((b"set-cookie", self.router.sticky_cookie()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
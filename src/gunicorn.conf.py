@@ -0,0 +1,6 @@
+from prometheus_client import multiprocess
+
+
+def child_exit(server, worker):
+    # Live gauges of a dead worker must not be summed into the metrics of the rest
+    multiprocess.mark_process_dead(worker.pid)
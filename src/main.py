@@ -1,7 +1,27 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 
+from auth.hashing import password_hasher
+from core.database import session_router
+from core.events import event_broadcaster
+from core.metrics import PrometheusMiddleware
+from core.rate_limit import RateLimitMiddleware, rate_limiter
+from core.routing import ReplicaStickinessMiddleware
 from routers.api import router
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    await event_broadcaster.close()
+    password_hasher.shutdown()
+
+
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
+app.add_middleware(RateLimitMiddleware, limiter=rate_limiter)
+app.add_middleware(PrometheusMiddleware)
+app.add_middleware(ReplicaStickinessMiddleware, router=session_router)
 
 app.include_router(router)
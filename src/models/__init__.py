@@ -8,3 +8,9 @@ from models.user import UserModel
 
 # Associative models
 from models.associations import ApplicationModel
+
+# Events of the transactional outbox
+from models.outbox import OutboxEventModel
+
+# Refresh tokens and revoked access tokens
+from models.token import RefreshTokenModel, TokenRevocationModel
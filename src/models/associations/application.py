@@ -2,7 +2,7 @@ from enum import Enum
 from typing import TYPE_CHECKING
 from uuid import UUID
 
-from sqlalchemy import ForeignKey, UniqueConstraint
+from sqlalchemy import ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from core.database import Base
@@ -26,10 +26,14 @@ class ApplicationModel(Base, IDModelMixin, TimeModelMixin):
             "position_id",
             name="idx_unique_user_position",
         ),
+        # Applications of a position, paged over (created_at, id)
+        Index("ix_applications_position_id_created_at_id", "position_id", "created_at", "id"),
+        # Counting applications of a position with a given status
+        Index("ix_applications_position_id_status", "position_id", "status"),
     )
 
     user_id: Mapped[UUID] = mapped_column(ForeignKey('users.id'))
-    position_id: Mapped[UUID] = mapped_column(ForeignKey('positions.id'))
+    position_id: Mapped[UUID] = mapped_column(ForeignKey('positions.id', ondelete="CASCADE"))
     message: Mapped[str]
     status: Mapped[ApplicationStatus] = mapped_column(
         default=ApplicationStatus.PENDING.value,
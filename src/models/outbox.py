@@ -0,0 +1,62 @@
+import datetime
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from sqlalchemy import DDL, Index, event, func, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from core.database import Base
+
+# Types of events about applications, their payload is built by `ApplicationRepository`
+APPLICATION_CREATED = "application.created"
+APPLICATION_APPROVED = "application.approved"
+APPLICATION_REJECTED = "application.rejected"
+
+# Every event is published on the channel when its transaction commits, see `core.events`
+NOTIFY_CHANNEL = "outbox_events"
+NOTIFY_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION notify_outbox_event() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify(
+        '{NOTIFY_CHANNEL}',
+        json_build_object(
+            'id', NEW.id, 'type', NEW.event_type, 'created_at', NEW.created_at, 'payload', NEW.payload
+        )::text
+    );
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+NOTIFY_TRIGGER = """
+CREATE TRIGGER outbox_events_notify AFTER INSERT ON outbox_events
+FOR EACH ROW EXECUTE FUNCTION notify_outbox_event()
+"""
+
+
+class OutboxEventModel(Base):
+    """
+    Event written in the same transaction as the change it describes, delivered later by `core.outbox`.
+
+    Delivered events are deleted. Events that ran out of attempts stay with `dead_at` set.
+    """
+
+    __tablename__ = "outbox_events"
+    __table_args__ = (
+        # Events waiting for delivery, in the order they become available
+        Index("ix_outbox_events_available_at", "available_at", postgresql_where=text("dead_at IS NULL")),
+    )
+
+    # Generated by the database, events are inserted by INSERT ... SELECT together with the change
+    id: Mapped[UUID] = mapped_column(primary_key=True, server_default=func.gen_random_uuid())
+    event_type: Mapped[str]
+    payload: Mapped[Dict[str, Any]] = mapped_column(JSONB)
+    created_at: Mapped[datetime.datetime] = mapped_column(server_default=func.now())
+    available_at: Mapped[datetime.datetime] = mapped_column(server_default=func.now())
+    attempts: Mapped[int] = mapped_column(default=0, server_default="0")
+    last_error: Mapped[Optional[str]]
+    dead_at: Mapped[Optional[datetime.datetime]]
+
+
+event.listen(OutboxEventModel.__table__, "after_create", DDL(NOTIFY_FUNCTION))
+event.listen(OutboxEventModel.__table__, "after_create", DDL(NOTIFY_TRIGGER))
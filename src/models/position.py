@@ -1,24 +1,58 @@
 from typing import TYPE_CHECKING, Optional, List
 from uuid import UUID
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import DDL, ForeignKey, Index, event
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from core.database import Base
-from models.utils.mixins import IDModelMixin
+from models.utils.mixins import IDModelMixin, TimeModelMixin
 
 if TYPE_CHECKING:
     from models import ProjectModel
     from models.associations import ApplicationModel
 
+# Keeps `projects.vacant_positions` up to date, for every way positions are written
+VACANCY_FUNCTION = """
+CREATE OR REPLACE FUNCTION count_vacant_positions() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.project_id = NEW.project_id
+            AND (OLD.approved_count < OLD.count) = (NEW.approved_count < NEW.count) THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.approved_count < OLD.count THEN
+        UPDATE projects SET vacant_positions = vacant_positions - 1 WHERE id = OLD.project_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.approved_count < NEW.count THEN
+        UPDATE projects SET vacant_positions = vacant_positions + 1 WHERE id = NEW.project_id;
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+VACANCY_TRIGGER = """
+CREATE TRIGGER positions_count_vacant AFTER INSERT OR DELETE OR UPDATE OF count, approved_count, project_id
+ON positions FOR EACH ROW EXECUTE FUNCTION count_vacant_positions()
+"""
 
-class PositionModel(Base, IDModelMixin):
+
+class PositionModel(Base, IDModelMixin, TimeModelMixin):
     __tablename__ = "positions"
+    __table_args__ = (
+        # Positions of a project, paged over (created_at, id)
+        Index("ix_positions_project_id_created_at_id", "project_id", "created_at", "id"),
+    )
 
     name: Mapped[str]
     description: Mapped[Optional[str]]
     count: Mapped[int] = mapped_column(default=1)
+    # Number of approved applications, maintained together with their statuses
+    approved_count: Mapped[int] = mapped_column(default=0, server_default="0")
     project_id: Mapped[UUID] = mapped_column(ForeignKey("projects.id", ondelete="CASCADE"))
 
     project: Mapped["ProjectModel"] = relationship(back_populates="positions")
-    users_details: Mapped[List["ApplicationModel"]] = relationship(back_populates="position")
+    # Applications are deleted by the database together with the position
+    users_details: Mapped[List["ApplicationModel"]] = relationship(back_populates="position", passive_deletes=True)
+
+
+event.listen(PositionModel.__table__, "after_create", DDL(VACANCY_FUNCTION))
+event.listen(PositionModel.__table__, "after_create", DDL(VACANCY_TRIGGER))
@@ -2,7 +2,8 @@ from enum import Enum
 from typing import TYPE_CHECKING, List
 from uuid import UUID
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import Computed, ForeignKey, Index, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from core.database import Base
@@ -20,12 +21,53 @@ class Difficulty(Enum):
 
 class ProjectModel(IDModelMixin, TimeModelMixin, Base):
     __tablename__ = "projects"
+    __table_args__ = (
+        # Keyset pagination of the projects feed
+        Index("ix_projects_created_at_id", "created_at", "id"),
+        Index("ix_projects_owner_id", "owner_id"),
+        # Full-text search over name and description, and over names alone for the first tier of results
+        Index("ix_projects_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_projects_name_vector", "name_vector", postgresql_using="gin"),
+        # Difficulty filter and facet counts of a text query, each reads the matches of one difficulty only
+        *(
+            Index(
+                f"ix_projects_search_vector_{difficulty.value}",
+                "search_vector",
+                postgresql_using="gin",
+                postgresql_where=text(f"difficulty = '{difficulty.name}'"),
+            )
+            for difficulty in Difficulty
+        ),
+        # Search and feed of projects with vacancies
+        Index(
+            "ix_projects_vacant_search_vector",
+            "search_vector",
+            postgresql_using="gin",
+            postgresql_where=text("vacant_positions > 0"),
+        ),
+        Index("ix_projects_vacant_created_at_id", "created_at", "id", postgresql_where=text("vacant_positions > 0")),
+    )
 
     name: Mapped[str]
     description: Mapped[str]
     difficulty: Mapped[Difficulty]
     owner_id: Mapped[UUID] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
+    # Maintained by the database, matches in the name weigh more than in the description
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('english', name), 'A') || setweight(to_tsvector('english', description), 'B')",
+            persisted=True,
+        ),
+        deferred=True,
+    )
+    name_vector: Mapped[str] = mapped_column(
+        TSVECTOR, Computed("to_tsvector('english', name)", persisted=True), deferred=True
+    )
+    # Positions with a vacant slot, maintained by a trigger on positions
+    vacant_positions: Mapped[int] = mapped_column(default=0, server_default="0")
 
     owner: Mapped["UserModel"] = relationship(back_populates="own_projects")
-    positions: Mapped[List["PositionModel"]] = relationship(back_populates='project')
+    # Positions are deleted by the database together with the project
+    positions: Mapped[List["PositionModel"]] = relationship(back_populates='project', passive_deletes=True)
 
@@ -0,0 +1,53 @@
+import datetime
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Identity, Index, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from core.database import Base
+from models.utils.mixins import IDModelMixin
+
+
+class RefreshTokenModel(IDModelMixin, Base):
+    """
+    Refresh token of a login session, only the SHA-256 digest of the token is stored.
+
+    Every refresh replaces the token with a new one of the same `family_id` (the session). A token that is
+    presented again after it has been used means it has leaked, the whole family is revoked then.
+    """
+
+    __tablename__ = "refresh_tokens"
+
+    user_id: Mapped[UUID] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), index=True)
+    family_id: Mapped[UUID] = mapped_column(index=True)
+    token_hash: Mapped[str] = mapped_column(unique=True)
+    # Access token issued together with the refresh token, revoked with the family
+    access_jti: Mapped[UUID]
+    # Expiry times come from the claims of the tokens, they are compared with `now()` of the database
+    access_expires_at: Mapped[datetime.datetime] = mapped_column(DateTime(timezone=True))
+    created_at: Mapped[datetime.datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    # Expired tokens are deleted by every worker, see `TokenRepository.delete_expired`
+    expires_at: Mapped[datetime.datetime] = mapped_column(DateTime(timezone=True), index=True)
+    used_at: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime(timezone=True))
+    revoked_at: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime(timezone=True))
+
+
+class TokenRevocationModel(Base):
+    """
+    Revoked access token, kept until the token expires. Workers mirror the table in memory, see `auth.revocation`.
+    """
+
+    __tablename__ = "token_revocations"
+    __table_args__ = (
+        # Incremental synchronization of the workers
+        Index("ix_token_revocations_created_at", "created_at"),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, Identity(), primary_key=True)
+    jti: Mapped[UUID] = mapped_column(index=True)
+    expires_at: Mapped[datetime.datetime] = mapped_column(DateTime(timezone=True), index=True)
+    # Time of the insert rather than of the start of its transaction, see `TokenRepository.get_revocations`
+    created_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.clock_timestamp()
+    )
@@ -1,11 +1,12 @@
 from abc import ABC
-from typing import Any, Dict, Generic, Optional, Type, Union
+from typing import Any, Dict, Generic, Optional, Sequence, Tuple, Type, Union
 from uuid import UUID
 
-from fastapi.encoders import jsonable_encoder
+from sqlalchemy import ColumnElement, Select, delete, inspect, select, tuple_, update
 from sqlalchemy.exc import DatabaseError, IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from repositories.utils.pagination import Cursor, encode_cursor
 from typing_ import CreateSchemaType, ModelType, UpdateSchemaType
 
 
@@ -22,6 +23,44 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType], ABC
         obj = await self.get_by_id(id_)
         return obj is not None
 
+    async def get_page(
+        self, limit: int, after: Optional[Cursor] = None, **filters: Any
+    ) -> Tuple[Sequence[ModelType], Optional[str]]:
+        """
+        Retrieves a page of records matching the filters, newest first.
+
+        :param limit: Maximum number of records on the page.
+        :param after: Position of the last record of the previous page.
+        :param filters: Column values the records must have.
+        :return: Records of the page and the cursor of the next page if there is one.
+        """
+        return await self._paginate(select(self._model).filter_by(**filters), limit, after)
+
+    async def _paginate(
+        self, statement: Select, limit: int, after: Optional[Cursor] = None, scalars: bool = True
+    ) -> Tuple[Sequence[Any], Optional[str]]:
+        """
+        Keyset pagination over (created_at, id).
+
+        Instead of OFFSET the page starts right after the last seen record, so every page costs the same
+        index range scan no matter how deep it is. With `scalars=False` whole rows are returned, they must
+        contain the `created_at` and `id` columns.
+        """
+        created_at, id_ = self._model.created_at, self._model.id
+        if after is not None:
+            statement = statement.where(tuple_(created_at, id_) < tuple_(*after))
+
+        # One extra row tells whether there is a next page
+        statement = statement.order_by(created_at.desc(), id_.desc()).limit(limit + 1)
+        result = await self._session.execute(statement)
+        items = result.scalars().all() if scalars else result.all()
+
+        if len(items) <= limit:
+            return items, None
+
+        last = items[limit - 1]
+        return items[:limit], encode_cursor(last.created_at, last.id)
+
     async def create(self, obj: CreateSchemaType, **kwargs) -> Optional[ModelType]:
         db_obj: ModelType = self._model(**obj.model_dump(), **kwargs)
         self._session.add(db_obj)
@@ -33,34 +72,67 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType], ABC
             await self._session.rollback()
             return None
 
-    async def update(self, id_: UUID, obj_in: Union[UpdateSchemaType, Dict[str, Any]]) -> Optional[ModelType]:
-        db_obj = await self.get_by_id(id_)
-        # Check if exists
-        if db_obj:
-            obj_data = jsonable_encoder(db_obj)
-            if isinstance(obj_in, dict):
-                update_data = obj_in
-            else:
-                update_data = obj_in.model_dump(exclude_unset=True)
+    async def update(
+        self,
+        target: Union[UUID, ModelType],
+        obj_in: Union[UpdateSchemaType, Dict[str, Any]],
+        *criteria: ColumnElement[bool],
+    ) -> Optional[ModelType]:
+        """
+        Updates a record with a single UPDATE ... RETURNING statement.
 
-            # Update the object
-            for field in obj_data:
-                if field in update_data:
-                    setattr(db_obj, field, update_data[field])
+        Only the fields set in the schema are written. A loaded instance may be passed instead of the ID,
+        it is refreshed with the returned row.
 
-            await self._session.flush()
-            await self._session.refresh(db_obj)
+        :param target: The ID of the record or the record itself.
+        :param obj_in: New values of the fields.
+        :param criteria: Additional conditions the record must satisfy, checked by the UPDATE itself.
+        :return: Updated record or None if there is no record with the ID satisfying the criteria.
+        :raises ValueError: If the values contain fields that are not columns of the model.
+        """
+        loaded = isinstance(target, self._model)
+        id_ = target.id if loaded else target
+        update_data = obj_in if isinstance(obj_in, dict) else obj_in.model_dump(exclude_unset=True)
 
-            await self._session.commit()
+        unknown = update_data.keys() - inspect(self._model).column_attrs.keys()
+        if unknown:
+            raise ValueError(f"{self._model.__name__} has no columns {sorted(unknown)}")
 
-        return db_obj
+        if not update_data:
+            return target if loaded else await self.get_by_id(id_)
 
-    async def delete(self, id_: UUID) -> bool:
+        statement = (
+            update(self._model)
+            .where(self._model.id == id_, *criteria)
+            .values(**update_data)
+            .returning(self._model)
+            .execution_options(populate_existing=True)
+        )
         try:
-            db_obj = await self._session.get(self._model, id_)
-            await self._session.delete(db_obj)
+            result = await self._session.execute(statement)
+            db_obj = result.scalar_one_or_none()
             await self._session.commit()
-            return True
+            return db_obj
         except DatabaseError:
             await self._session.rollback()
-            return False
+            return None
+
+    async def delete(self, id_: UUID, *criteria: ColumnElement[bool]) -> Optional[ModelType]:
+        """
+        Deletes a record with a single DELETE ... RETURNING statement.
+
+        Dependent records are removed by the `ON DELETE CASCADE` of the database, nothing is loaded beforehand.
+
+        :param id_: The ID of the record.
+        :param criteria: Additional conditions the record must satisfy, e.g. an ownership predicate.
+        :return: Deleted record or None if there is no record with the ID satisfying the criteria, or if records
+            that are not deleted along with it still reference it.
+        """
+        statement = delete(self._model).where(self._model.id == id_, *criteria).returning(self._model)
+        try:
+            db_obj = (await self._session.execute(statement)).scalar_one_or_none()
+            await self._session.commit()
+            return db_obj
+        except IntegrityError:
+            await self._session.rollback()
+            return None
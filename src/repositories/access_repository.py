@@ -0,0 +1,119 @@
+from typing import NamedTuple, Optional
+from uuid import UUID
+
+from sqlalchemy import exists, false, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import PositionModel, ProjectModel
+from models.associations.application import ApplicationModel, ApplicationStatus
+
+
+class PositionAccess(NamedTuple):
+    """Everything needed to authorize an action on a position"""
+
+    id: UUID
+    project_id: UUID
+    count: int
+    approved_count: int
+    owner_id: UUID
+    has_applied: bool
+
+    def is_owned_by(self, user_id: UUID) -> bool:
+        return str(self.owner_id) == str(user_id)
+
+
+class ApplicationAccess(NamedTuple):
+    """Everything needed to authorize an action on an application"""
+
+    id: UUID
+    user_id: UUID
+    status: ApplicationStatus
+    position_id: UUID
+    position_count: int
+    approved_count: int
+    owner_id: UUID
+
+    def is_owned_by(self, user_id: UUID) -> bool:
+        return str(self.owner_id) == str(user_id)
+
+    def is_authored_by(self, user_id: UUID) -> bool:
+        return str(self.user_id) == str(user_id)
+
+
+class AccessRepository:
+    """
+    Lookups for authorization checks.
+
+    Each method resolves the whole ownership chain in a single SELECT and returns only ids and counts,
+    without loading ORM objects.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self._session = session
+
+    async def get_project_owner_id(self, project_id: UUID) -> Optional[UUID]:
+        """
+        Get the ID of the owner of the project.
+
+        :param project_id: ID of project
+        :return: ID of owner if the project exists
+        """
+        result = await self._session.execute(select(ProjectModel.owner_id).filter_by(id=project_id))
+        return result.scalar_one_or_none()
+
+    async def get_position_access(
+        self, position_id: UUID, applicant_id: Optional[UUID] = None
+    ) -> Optional[PositionAccess]:
+        """
+        Get the position together with the owner of its project.
+
+        :param position_id: ID of position
+        :param applicant_id: ID of user to check for an existing application to the position
+        :return: PositionAccess if the position exists
+        """
+        if applicant_id is not None:
+            has_applied = exists().where(
+                ApplicationModel.position_id == PositionModel.id,
+                ApplicationModel.user_id == applicant_id,
+            )
+        else:
+            has_applied = false()
+
+        statement = (
+            select(
+                PositionModel.id,
+                PositionModel.project_id,
+                PositionModel.count,
+                PositionModel.approved_count,
+                ProjectModel.owner_id,
+                has_applied.label("has_applied"),
+            )
+            .join(ProjectModel, ProjectModel.id == PositionModel.project_id)
+            .where(PositionModel.id == position_id)
+        )
+        row = (await self._session.execute(statement)).one_or_none()
+        return PositionAccess(*row) if row else None
+
+    async def get_application_access(self, application_id: UUID) -> Optional[ApplicationAccess]:
+        """
+        Get the application together with its position and the owner of the project.
+
+        :param application_id: ID of application
+        :return: ApplicationAccess if the application exists
+        """
+        statement = (
+            select(
+                ApplicationModel.id,
+                ApplicationModel.user_id,
+                ApplicationModel.status,
+                PositionModel.id,
+                PositionModel.count,
+                PositionModel.approved_count,
+                ProjectModel.owner_id,
+            )
+            .join(PositionModel, PositionModel.id == ApplicationModel.position_id)
+            .join(ProjectModel, ProjectModel.id == PositionModel.project_id)
+            .where(ApplicationModel.id == application_id)
+        )
+        row = (await self._session.execute(statement)).one_or_none()
+        return ApplicationAccess(*row) if row else None
@@ -1,30 +1,118 @@
-from typing import Optional, Sequence
-from uuid import UUID
+from typing import Dict, Optional, Sequence, Tuple, Union
+from uuid import UUID, uuid4
 
-from sqlalchemy import select
-from sqlalchemy.exc import DatabaseError
+from sqlalchemy import (
+    ARRAY,
+    CTE,
+    ColumnElement,
+    Row,
+    any_,
+    case,
+    delete,
+    exists,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy.exc import DatabaseError, IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
-from models import ApplicationModel
+from models import ApplicationModel, OutboxEventModel, PositionModel, ProjectModel
 from models.associations.application import ApplicationStatus
+from models.outbox import APPLICATION_APPROVED, APPLICATION_CREATED, APPLICATION_REJECTED
 from repositories._base import BaseRepository
+from repositories.utils.pagination import Cursor
 from schemas.application import ApplicationCreateSchema, ApplicationUpdateSchema
 
 
+_STATUS_EVENTS = {
+    ApplicationStatus.APPROVED: APPLICATION_APPROVED,
+    ApplicationStatus.REJECTED: APPLICATION_REJECTED,
+}
+
+
+def _events(applications: CTE, event_type: Union[str, ColumnElement[str]]) -> CTE:
+    """
+    INSERT of outbox events about the applications returned by a data-modifying CTE.
+
+    It is added to the statement that makes the change, so the events are committed or rolled back together
+    with it without an extra round trip.
+
+    :param applications: CTE returning whole rows of applications.
+    :param event_type: Type of the events, or an expression computing it from the rows.
+    :return: CTE to add to the statement.
+    """
+    positions, projects = PositionModel.__table__, ProjectModel.__table__
+    fields = {
+        "application_id": applications.c.id,
+        "position_id": applications.c.position_id,
+        "project_id": positions.c.project_id,
+        "user_id": applications.c.user_id,
+        "owner_id": projects.c.owner_id,
+        "status": applications.c.status,
+    }
+    payload = func.jsonb_build_object(*(item for field in fields.items() for item in field))
+    events = select(literal(event_type) if isinstance(event_type, str) else event_type, payload).select_from(
+        applications.join(positions, positions.c.id == applications.c.position_id).join(
+            projects, projects.c.id == positions.c.project_id
+        )
+    )
+    return (
+        insert(OutboxEventModel)
+        .from_select(["event_type", "payload"], events, include_defaults=False)
+        .cte(f"{applications.name}_events")
+    )
+
+
 class ApplicationRepository(BaseRepository[ApplicationModel, ApplicationCreateSchema, ApplicationUpdateSchema]):
     def __init__(self, session: AsyncSession):
         super().__init__(session, ApplicationModel)
 
-    async def get_all_by_position_id(self, position_id: UUID) -> Sequence[ApplicationModel]:
+    async def create(self, obj: ApplicationCreateSchema, **kwargs) -> Optional[ApplicationModel]:
         """
-        Retrieves all applications associated with the given position ID.
+        Creates an application and its `application.created` outbox event in a single statement.
+
+        :param obj: Data of the application.
+        :param kwargs: Values of the other columns, `position_id` and `user_id`.
+        :return: Created ApplicationModel instance or None if it violates a constraint.
+        """
+        applications = ApplicationModel.__table__
+        created = (
+            insert(applications)
+            .values(id=uuid4(), **obj.model_dump(), **kwargs)
+            .returning(*applications.c)
+            .cte("created")
+        )
+        statement = select(aliased(ApplicationModel, created)).add_cte(_events(created, APPLICATION_CREATED))
+        try:
+            application = (await self._session.execute(statement)).scalar_one()
+            await self._session.commit()
+            return application
+        except IntegrityError:
+            await self._session.rollback()
+            return None
+
+    async def get_all_by_position_id(
+        self, position_id: UUID, fields: Sequence[str], limit: int, after: Optional[Cursor] = None
+    ) -> Tuple[Sequence[Row], Optional[str]]:
+        """
+        Retrieves a page of applications associated with the given position ID.
+
+        Only the given columns are selected and returned as plain rows, no ORM instances are built.
 
         :param position_id: The ID of the position to retrieve applications for.
-        :return: A sequence of ApplicationModel instances.
+        :param fields: Names of the columns to select, they must include `created_at` and `id`.
+        :param limit: Maximum number of applications on the page.
+        :param after: Position of the last item of the previous page.
+        :return: Rows of the page and the cursor of the next page.
         """
-        statement = select(ApplicationModel).filter_by(position_id=position_id)
-        result = await self._session.execute(statement)
-        return result.scalars().all()
+        columns = [ApplicationModel.__table__.c[field] for field in fields]
+        statement = select(*columns).where(ApplicationModel.position_id == position_id)
+        return await self._paginate(statement, limit, after, scalars=False)
 
     async def get_all_by_position_id_and_status(
         self, position_id: UUID, status: ApplicationStatus
@@ -39,3 +127,207 @@ class ApplicationRepository(BaseRepository[ApplicationModel, ApplicationCreateSc
         statement = select(ApplicationModel).filter_by(position_id=position_id, status=status)
         result = await self._session.execute(statement)
         return result.scalars().all()
+
+    async def set_status(self, id_: UUID, status: ApplicationStatus) -> Optional[ApplicationModel]:
+        """
+        Sets the status of the application with a single UPDATE ... RETURNING statement, which also writes
+        the outbox event of the new status.
+
+        :param id_: The ID of the application to update.
+        :param status: The new status of the application.
+        :return: Updated ApplicationModel instance or None if it does not exist.
+        """
+        applications = ApplicationModel.__table__
+        changed = (
+            update(applications)
+            .where(applications.c.id == id_)
+            .values(status=status)
+            .returning(*applications.c)
+            .cte("changed")
+        )
+        statement = select(aliased(ApplicationModel, changed)).execution_options(populate_existing=True)
+        if status in _STATUS_EVENTS:
+            statement = statement.add_cte(_events(changed, _STATUS_EVENTS[status]))
+        try:
+            result = await self._session.execute(statement)
+            application = result.scalar_one_or_none()
+            await self._session.commit()
+            return application
+        except DatabaseError:
+            await self._session.rollback()
+            return None
+
+    async def approve(self, id_: UUID) -> Tuple[Optional[ApplicationModel], bool]:
+        """
+        Approves a pending application and takes a slot of its position in a single statement.
+
+        The slot is taken with a conditional `approved_count = approved_count + 1 WHERE approved_count < count`,
+        so concurrent approvals are serialized on the position row and can never over-fill it.
+        If there is no vacant slot, the transaction is rolled back together with the outbox event.
+
+        :param id_: The ID of the application to approve.
+        :return: Approved ApplicationModel instance (None if the application is not pending)
+            and whether a slot was taken.
+        """
+        applications, positions = ApplicationModel.__table__, PositionModel.__table__
+
+        approved = (
+            update(applications)
+            .where(applications.c.id == id_, applications.c.status == ApplicationStatus.PENDING)
+            .values(status=ApplicationStatus.APPROVED)
+            .returning(*applications.c)
+            .cte("approved")
+        )
+        slot = (
+            update(positions)
+            .where(positions.c.id == approved.c.position_id, positions.c.approved_count < positions.c.count)
+            .values(approved_count=positions.c.approved_count + 1)
+            .returning(positions.c.id)
+            .cte("slot")
+        )
+        statement = (
+            select(aliased(ApplicationModel, approved), exists(select(slot.c.id)))
+            .add_cte(_events(approved, APPLICATION_APPROVED))
+            .execution_options(populate_existing=True)
+        )
+
+        try:
+            row = (await self._session.execute(statement)).one_or_none()
+            if row is None:
+                await self._session.rollback()
+                return None, False
+
+            application, slot_taken = row
+            if not slot_taken:
+                await self._session.rollback()
+                return application, False
+
+            await self._session.commit()
+            return application, True
+        except DatabaseError:
+            await self._session.rollback()
+            return None, False
+
+    async def get_statuses(self, position_id: UUID, ids: Sequence[UUID]) -> Dict[UUID, ApplicationStatus]:
+        """
+        Retrieves the statuses of the given applications of the position.
+
+        :param position_id: The ID of the position the applications must belong to.
+        :param ids: The IDs of the applications.
+        :return: Statuses by application ID, applications of other positions are left out.
+        """
+        statement = select(ApplicationModel.id, ApplicationModel.status).where(
+            ApplicationModel.id == any_(literal(list(ids), ARRAY(ApplicationModel.id.type))),
+            ApplicationModel.position_id == position_id,
+        )
+        result = await self._session.execute(statement)
+        return dict(result.tuples().all())
+
+    async def set_statuses(
+        self, position_id: UUID, approve_ids: Sequence[UUID], reject_ids: Sequence[UUID]
+    ) -> Tuple[Optional[Sequence[ApplicationModel]], bool]:
+        """
+        Approves and rejects pending applications of the position in a single statement.
+
+        Like `approve`, the approved applications take slots of the position with a conditional update of
+        `approved_count`, so the whole batch is applied only if there are enough vacant slots for it.
+        Outbox events of the new statuses are written by the same statement.
+
+        :param position_id: The ID of the position the applications belong to.
+        :param approve_ids: The IDs of the applications to approve.
+        :param reject_ids: The IDs of the applications to reject.
+        :return: Updated ApplicationModel instances (None on a database error, applications that are not pending
+            anymore are left out) and whether there were enough slots. Without slots nothing is changed.
+        """
+        applications, positions = ApplicationModel.__table__, PositionModel.__table__
+        id_array = ARRAY(applications.c.id.type)
+        approved_ids = any_(literal(list(approve_ids), id_array))
+
+        changed = (
+            update(applications)
+            .where(
+                applications.c.id == any_(literal([*approve_ids, *reject_ids], id_array)),
+                applications.c.position_id == position_id,
+                applications.c.status == ApplicationStatus.PENDING,
+            )
+            .values(
+                status=case(
+                    (applications.c.id == approved_ids, ApplicationStatus.APPROVED.value),
+                    else_=ApplicationStatus.REJECTED.value,
+                ).cast(applications.c.status.type)
+            )
+            .returning(*applications.c)
+            .cte("changed")
+        )
+        approved = (
+            select(func.count())
+            .select_from(changed)
+            .where(changed.c.status == ApplicationStatus.APPROVED)
+            .scalar_subquery()
+        )
+        # Rejections take no slots, a batch of them is applied whatever the slots of the position
+        slots = (
+            update(positions)
+            .where(
+                positions.c.id == position_id,
+                or_(approved == 0, positions.c.approved_count + approved <= positions.c.count),
+            )
+            .values(approved_count=positions.c.approved_count + approved)
+            .returning(positions.c.id)
+            .cte("slots")
+        )
+        event_type = case(
+            (changed.c.status == ApplicationStatus.APPROVED, APPLICATION_APPROVED),
+            else_=APPLICATION_REJECTED,
+        )
+        statement = (
+            select(aliased(ApplicationModel, changed), exists(select(slots.c.id)))
+            .add_cte(_events(changed, event_type))
+            .execution_options(populate_existing=True)
+        )
+
+        try:
+            rows = (await self._session.execute(statement)).all()
+            slots_taken = rows[0][1] if rows else True
+            if not slots_taken:
+                await self._session.rollback()
+                return [], False
+
+            await self._session.commit()
+            return [application for application, _ in rows], True
+        except DatabaseError:
+            await self._session.rollback()
+            return None, False
+
+    async def delete(self, id_: UUID, *criteria: ColumnElement[bool]) -> Optional[ApplicationModel]:
+        """
+        Deletes the application and frees the slot of its position if it was approved, in a single statement.
+
+        :param id_: The ID of the application to delete.
+        :param criteria: Additional conditions the application must satisfy.
+        :return: Deleted application or None if there is no application with the ID satisfying the criteria.
+        """
+        applications, positions = ApplicationModel.__table__, PositionModel.__table__
+
+        deleted = (
+            delete(applications)
+            .where(applications.c.id == id_, *criteria)
+            .returning(*applications.c)
+            .cte("deleted")
+        )
+        freed = (
+            update(positions)
+            .where(positions.c.id == deleted.c.position_id, deleted.c.status == ApplicationStatus.APPROVED)
+            .values(approved_count=positions.c.approved_count - 1)
+            .returning(positions.c.id)
+            .cte("freed")
+        )
+        statement = select(aliased(ApplicationModel, deleted)).add_cte(freed)
+
+        try:
+            application = (await self._session.execute(statement)).scalar_one_or_none()
+            await self._session.commit()
+            return application
+        except IntegrityError:
+            await self._session.rollback()
+            return None
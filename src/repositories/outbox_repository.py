@@ -0,0 +1,81 @@
+from datetime import timedelta
+from typing import Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import OutboxEventModel
+
+
+class OutboxRepository:
+    """
+    Delivery bookkeeping of the transactional outbox.
+
+    Events are written by the repositories of the changes they describe, in the same statement. Nothing here
+    commits: the dispatcher holds the locks of claimed events until it has recorded the outcome of their delivery.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self._session = session
+
+    async def claim(self, limit: int) -> Sequence[Tuple[OutboxEventModel, float]]:
+        """
+        Locks a batch of events that are due for delivery with `SELECT ... FOR UPDATE SKIP LOCKED`.
+
+        Events locked by other dispatchers are skipped instead of waited for, so any number of dispatchers
+        can drain the outbox concurrently without delivering an event twice.
+
+        :param limit: Maximum number of events to claim.
+        :return: Claimed events, oldest first, with their age in seconds.
+        """
+        age = func.extract("epoch", func.now() - OutboxEventModel.created_at)
+        statement = (
+            select(OutboxEventModel, age)
+            .where(OutboxEventModel.dead_at.is_(None), OutboxEventModel.available_at <= func.now())
+            .order_by(OutboxEventModel.available_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        result = await self._session.execute(statement)
+        return [(event, float(age)) for event, age in result.tuples()]
+
+    async def delete(self, ids: Sequence[UUID]) -> None:
+        """
+        Deletes delivered events.
+
+        :param ids: The IDs of the events.
+        """
+        if ids:
+            await self._session.execute(delete(OutboxEventModel).where(OutboxEventModel.id.in_(ids)))
+
+    async def retry(self, id_: UUID, delay: float, error: str) -> None:
+        """
+        Counts a failed delivery attempt and postpones the next one.
+
+        :param id_: The ID of the event.
+        :param delay: Seconds until the event is due again.
+        :param error: Description of the failure.
+        """
+        await self._session.execute(
+            update(OutboxEventModel)
+            .where(OutboxEventModel.id == id_)
+            .values(
+                attempts=OutboxEventModel.attempts + 1,
+                available_at=func.now() + timedelta(seconds=delay),
+                last_error=error,
+            )
+        )
+
+    async def bury(self, id_: UUID, error: str) -> None:
+        """
+        Counts the last failed delivery attempt, the event is not claimed anymore.
+
+        :param id_: The ID of the event.
+        :param error: Description of the failure.
+        """
+        await self._session.execute(
+            update(OutboxEventModel)
+            .where(OutboxEventModel.id == id_)
+            .values(attempts=OutboxEventModel.attempts + 1, dead_at=func.now(), last_error=error)
+        )
@@ -1,11 +1,138 @@
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+from uuid import UUID
+
+from sqlalchemy import ColumnElement, cast, func, literal, not_, select, tuple_
+from sqlalchemy.dialects.postgresql import REGCONFIG
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import contains_eager
 
-from models import ProjectModel
+from models import PositionModel, ProjectModel
+from models.project import Difficulty
 from repositories._base import BaseRepository
+from repositories.utils.pagination import Cursor, SearchCursor, encode_search_cursor
 from schemas.project import ProjectCreateSchema, ProjectUpdateSchema
+from schemas.search import ProjectSearchParams
+
+SEARCH_CONFIG = "english"
+# Facet counts stop at this value, the client shows it as "1000+"
+SEARCH_FACETS_LIMIT = 1000
 
 
 class ProjectRepository(BaseRepository[ProjectModel, ProjectCreateSchema, ProjectUpdateSchema]):
     def __init__(self, session: AsyncSession):
         super().__init__(session, ProjectModel)
-    
\ No newline at end of file
+
+    async def get_with_positions(self, project_id: UUID) -> Optional[ProjectModel]:
+        """
+        Retrieves the project together with all its positions in a single query.
+
+        :param project_id: The ID of the project.
+        :return: ProjectModel instance with loaded positions, newest first, or None if it does not exist.
+        """
+        statement = (
+            select(ProjectModel)
+            .outerjoin(ProjectModel.positions)
+            .options(contains_eager(ProjectModel.positions))
+            .where(ProjectModel.id == project_id)
+            .order_by(PositionModel.created_at.desc(), PositionModel.id.desc())
+            .execution_options(populate_existing=True)
+        )
+        result = await self._session.execute(statement)
+        return result.unique().scalar_one_or_none()
+
+    @staticmethod
+    def _tsquery(query: str) -> ColumnElement:
+        return func.websearch_to_tsquery(cast(SEARCH_CONFIG, REGCONFIG), query)
+
+    @staticmethod
+    def _difficulty_is(difficulty: Difficulty) -> ColumnElement[bool]:
+        # Constants of partial index predicates are rendered into the statement: the generic plan of a prepared
+        # statement does not know the value of a parameter and cannot match a partial index with it
+        return ProjectModel.difficulty == literal(difficulty, ProjectModel.difficulty.type, literal_execute=True)
+
+    def _search_criteria(
+        self, params: ProjectSearchParams, with_query: bool = True, with_difficulty: bool = True
+    ) -> List[ColumnElement[bool]]:
+        criteria = []
+        if params.query and with_query:
+            criteria.append(ProjectModel.search_vector.bool_op("@@")(self._tsquery(params.query)))
+        if params.difficulty is not None and with_difficulty:
+            criteria.append(self._difficulty_is(params.difficulty))
+        if params.has_vacancies is not None:
+            # Maintained by a trigger on positions, the partial indexes of projects cover it
+            vacant = ProjectModel.vacant_positions > literal(0, literal_execute=True)
+            criteria.append(vacant if params.has_vacancies else not_(vacant))
+        return criteria
+
+    async def search(
+        self, params: ProjectSearchParams, limit: int, after: Optional[Union[Cursor, SearchCursor]] = None
+    ) -> Tuple[Sequence[ProjectModel], Optional[str]]:
+        """
+        Retrieves a page of projects matching the search parameters.
+
+        Matches of a text query are ranked in two tiers: projects whose name matches the query, then projects
+        matching it through the description only. Both tiers are ordered by recency and paged over
+        (tier, created_at, id), so every match can be reached and every page is a range of an index. Without a
+        text query the projects are paged over (created_at, id) like the feed.
+
+        :param params: Text query and filters.
+        :param limit: Maximum number of projects on the page.
+        :param after: Position of the last item of the previous page.
+        :return: Projects of the page and the cursor of the next page if there is one.
+        """
+        if not params.query:
+            return await self._paginate(select(ProjectModel).where(*self._search_criteria(params)), limit, after)
+
+        criteria = self._search_criteria(params, with_query=False)
+        query = self._tsquery(params.query)
+        in_name = ProjectModel.name_vector.bool_op("@@")(query)
+        tiers = (
+            # A match of the name is almost always a match of the whole project (unless the query excludes a word
+            # of the description). The function form is not planned through the index of search vectors: matches
+            # of the name are read in the order of recency, or through their own index for a rare word
+            (in_name, func.ts_match_vq(ProjectModel.search_vector, query)),
+            (ProjectModel.search_vector.bool_op("@@")(query), not_(in_name)),
+        )
+        first_tier = after[0] if after is not None else 0
+
+        # One extra row tells whether there is a next page, the next tier is only queried for the rest of the page
+        items: List[Tuple[int, ProjectModel]] = []
+        for tier in range(first_tier, len(tiers)):
+            statement = select(ProjectModel).where(*criteria, *tiers[tier])
+            if after is not None and tier == first_tier:
+                statement = statement.where(tuple_(ProjectModel.created_at, ProjectModel.id) < tuple_(*after[1:]))
+            statement = statement.order_by(ProjectModel.created_at.desc(), ProjectModel.id.desc())
+            projects = (await self._session.execute(statement.limit(limit + 1 - len(items)))).scalars()
+            items.extend((tier, project) for project in projects)
+            if len(items) > limit:
+                break
+
+        if len(items) <= limit:
+            return [project for _, project in items], None
+
+        last_tier, last_project = items[limit - 1]
+        next_cursor = encode_search_cursor(last_tier, last_project.created_at, last_project.id)
+        return [project for _, project in items[:limit]], next_cursor
+
+    async def count_by_difficulty(self, params: ProjectSearchParams) -> Tuple[Dict[Difficulty, int], bool]:
+        """
+        Counts projects matching the search parameters per difficulty, ignoring the difficulty filter.
+        Every count stops at `SEARCH_FACETS_LIMIT`.
+
+        :param params: Text query and filters.
+        :return: Number of projects for every difficulty, and whether a count has reached the limit.
+        """
+        criteria = self._search_criteria(params, with_difficulty=False)
+        counts = [
+            select(func.count())
+            .select_from(
+                select(ProjectModel.id)
+                .where(*criteria, self._difficulty_is(difficulty))
+                .limit(SEARCH_FACETS_LIMIT)
+                .subquery()
+            )
+            .scalar_subquery()
+            for difficulty in Difficulty
+        ]
+        row = (await self._session.execute(select(*counts))).one()
+        return dict(zip(Difficulty, row)), any(count >= SEARCH_FACETS_LIMIT for count in row)
@@ -0,0 +1,136 @@
+import datetime
+from typing import List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import RefreshTokenModel, TokenRevocationModel
+
+
+class TokenRepository:
+    def __init__(self, session: AsyncSession):
+        self._session = session
+
+    async def create_refresh_token(
+        self,
+        user_id: UUID,
+        family_id: UUID,
+        token_hash: str,
+        access_jti: UUID,
+        access_expires_at: datetime.datetime,
+        expires_at: datetime.datetime,
+    ) -> None:
+        """
+        Stores a refresh token.
+
+        :param user_id: The ID of the user
+        :param family_id: The ID of the login session the token belongs to
+        :param token_hash: SHA-256 digest of the token
+        :param access_jti: The ID of the access token issued together with the refresh token
+        :param access_expires_at: Expiry of the access token
+        :param expires_at: Expiry of the refresh token
+        """
+        await self._session.execute(
+            insert(RefreshTokenModel).values(
+                user_id=user_id,
+                family_id=family_id,
+                token_hash=token_hash,
+                access_jti=access_jti,
+                access_expires_at=access_expires_at,
+                expires_at=expires_at,
+            )
+        )
+        await self._session.commit()
+
+    async def use_refresh_token(self, token_hash: str) -> Tuple[Optional[RefreshTokenModel], bool]:
+        """
+        Marks a valid refresh token as used with a single UPDATE, so that concurrent refreshes with the same token
+        cannot both succeed. Nothing is committed: the replacement is stored in the same transaction.
+
+        :param token_hash: SHA-256 digest of the token
+        :return: The token, and whether it could be used. A known token that could not be used has been used,
+            revoked or has expired.
+        """
+        statement = (
+            update(RefreshTokenModel)
+            .where(
+                RefreshTokenModel.token_hash == token_hash,
+                RefreshTokenModel.used_at.is_(None),
+                RefreshTokenModel.revoked_at.is_(None),
+                RefreshTokenModel.expires_at > func.now(),
+            )
+            .values(used_at=func.now())
+            .returning(RefreshTokenModel)
+        )
+        token = (await self._session.execute(statement)).scalar_one_or_none()
+        if token is not None:
+            return token, True
+
+        statement = select(RefreshTokenModel).where(RefreshTokenModel.token_hash == token_hash)
+        return (await self._session.execute(statement)).scalar_one_or_none(), False
+
+    async def revoke_family(self, family_id: UUID, user_id: Optional[UUID] = None) -> List[UUID]:
+        """
+        Revokes all refresh tokens of a login session and the access tokens issued with them that have not
+        expired yet, with a single statement.
+
+        :param family_id: The ID of the login session
+        :param user_id: The ID of the user the session must belong to
+        :return: IDs of the revoked access tokens
+        """
+        criteria = [RefreshTokenModel.family_id == family_id]
+        if user_id is not None:
+            criteria.append(RefreshTokenModel.user_id == user_id)
+        revoked = (
+            update(RefreshTokenModel)
+            .where(*criteria)
+            .values(revoked_at=func.coalesce(RefreshTokenModel.revoked_at, func.now()))
+            .returning(RefreshTokenModel.access_jti, RefreshTokenModel.access_expires_at)
+            .cte("revoked")
+        )
+        statement = (
+            insert(TokenRevocationModel)
+            .from_select(
+                ["jti", "expires_at"],
+                select(revoked.c.access_jti, revoked.c.access_expires_at).where(
+                    revoked.c.access_expires_at > func.now()
+                ),
+            )
+            .returning(TokenRevocationModel.jti)
+        )
+        jtis = list((await self._session.execute(statement)).scalars())
+        await self._session.commit()
+        return jtis
+
+    async def is_revoked(self, jti: UUID) -> bool:
+        statement = select(select(TokenRevocationModel.jti).where(TokenRevocationModel.jti == jti).exists())
+        return bool(await self._session.scalar(statement))
+
+    async def get_revocations(
+        self, since: Optional[datetime.datetime] = None
+    ) -> Tuple[Sequence[UUID], datetime.datetime]:
+        """
+        Revocations of access tokens that have not expired yet.
+
+        `created_at` is taken when a row is inserted, its transaction commits a little later. Callers pass a `since`
+        that overlaps the previous call, so that rows committed late are not missed.
+
+        :param since: Only rows created after it, all rows if None
+        :return: IDs of the revoked tokens and the current time of the database
+        """
+        statement = select(TokenRevocationModel.jti, func.now()).where(
+            TokenRevocationModel.expires_at > func.now()
+        )
+        if since is not None:
+            statement = statement.where(TokenRevocationModel.created_at > since)
+
+        rows = (await self._session.execute(statement)).all()
+        now = rows[0][1] if rows else await self._session.scalar(select(func.now()))
+        return [jti for jti, _ in rows], now
+
+    async def delete_expired(self) -> None:
+        """Deletes revocations of expired access tokens and refresh tokens that have expired"""
+        await self._session.execute(delete(TokenRevocationModel).where(TokenRevocationModel.expires_at <= func.now()))
+        await self._session.execute(delete(RefreshTokenModel).where(RefreshTokenModel.expires_at <= func.now()))
+        await self._session.commit()
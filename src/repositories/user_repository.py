@@ -1,10 +1,11 @@
 from typing import Optional
+from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from auth.security import get_password_hash
+from auth.hashing import password_hasher
 from models import UserModel
 from repositories._base import BaseRepository
 from schemas.user import UserCreateSchema, UserUpdateSchema
@@ -34,12 +35,30 @@ class UserRepository(BaseRepository[UserModel, UserCreateSchema, UserUpdateSchem
         user = await self.get_by_username(email)
         return user is not None
 
+    async def replace_password_hash(self, user_id: UUID, old_hash: str, new_hash: str) -> bool:
+        """
+        Replace the password hash unless it has changed in the meantime, e.g. by a password change.
+
+        :param user_id: The ID of the user
+        :param old_hash: The hash the new one was computed to replace
+        :param new_hash: The new hash
+        :return: True if the hash has been replaced
+        """
+        statement = (
+            update(UserModel)
+            .where(UserModel.id == user_id, UserModel.hashed_password == old_hash)
+            .values(hashed_password=new_hash)
+        )
+        result = await self._session.execute(statement)
+        await self._session.commit()
+        return result.rowcount == 1
+
     async def create(self, obj: UserCreateSchema, **kwargs) -> Optional[UserModel]:
         # Replace password with hashed password
         user_dict = obj.model_dump()
         password = user_dict.pop("password")
 
-        user_dict["hashed_password"] = get_password_hash(password)
+        user_dict["hashed_password"] = await password_hasher.hash(password)
 
         # Save user to database
         db_obj: UserModel = self._model(**user_dict)
@@ -0,0 +1,69 @@
+import base64
+import json
+from datetime import datetime
+from typing import Tuple
+from uuid import UUID
+
+# Position of the last item of a page in the (created_at, id) ordering
+Cursor = Tuple[datetime, UUID]
+# Position of the last item of a page of search results in the (tier, created_at, id) ordering
+SearchCursor = Tuple[int, datetime, UUID]
+
+
+def encode_cursor(created_at: datetime, id_: UUID) -> str:
+    """
+    Encode the position of an item into an opaque cursor token.
+
+    :param created_at: Creation time of the item
+    :param id_: ID of the item
+    :return: URL-safe cursor token
+    """
+    raw = json.dumps([created_at.isoformat(), str(id_)], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> Cursor:
+    """
+    Decode a cursor token produced by `encode_cursor`.
+
+    :param token: Cursor token
+    :raises ValueError: If the token is malformed
+    :return: Creation time and ID of the item
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        created_at, id_ = json.loads(raw)
+        return datetime.fromisoformat(created_at), UUID(id_)
+    except (TypeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def encode_search_cursor(tier: int, created_at: datetime, id_: UUID) -> str:
+    """
+    Encode the position of a search result into an opaque cursor token.
+
+    :param tier: Relevance tier of the item
+    :param created_at: Creation time of the item
+    :param id_: ID of the item
+    :return: URL-safe cursor token
+    """
+    raw = json.dumps([tier, created_at.isoformat(), str(id_)], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_search_cursor(token: str) -> SearchCursor:
+    """
+    Decode a cursor token produced by `encode_search_cursor`.
+
+    :param token: Cursor token
+    :raises ValueError: If the token is malformed
+    :return: Relevance tier, creation time and ID of the item
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        tier, created_at, id_ = json.loads(raw)
+        if not isinstance(tier, int) or isinstance(tier, bool) or tier < 0:
+            raise ValueError("Invalid tier")
+        return tier, datetime.fromisoformat(created_at), UUID(id_)
+    except (TypeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
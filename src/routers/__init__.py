@@ -1,4 +1,12 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Response
+from fastapi.responses import JSONResponse
+from prometheus_client import CONTENT_TYPE_LATEST
+
+from auth.current_user import current_user_cache
+from core.database import engine, replica_engine
+from core.health import readiness_probe
+from core.metrics import render_metrics
+from core.pool import pool_status
 
 root = APIRouter(prefix="", tags=["Root"])
 
@@ -6,3 +14,33 @@ root = APIRouter(prefix="", tags=["Root"])
 @root.get("/health", status_code=200)
 def health():
     return {"status": "ok"}
+
+
+@root.get("/health/live", status_code=200)
+async def health_live():
+    # The event loop of the worker is responsive, dependencies are not checked
+    return {"status": "ok"}
+
+
+@root.get("/health/ready", status_code=200)
+async def health_ready():
+    result = await readiness_probe.check()
+    status_code = 200 if result["status"] == "ok" else 503
+    return JSONResponse(result, status_code=status_code)
+
+
+@root.get("/stats", status_code=200)
+def stats():
+    # Numbers are collected per worker process
+    stats = {
+        "current_user_cache": current_user_cache.stats(),
+        "database_pool": pool_status(engine.pool),
+    }
+    if replica_engine is not None:
+        stats["replica_database_pool"] = pool_status(replica_engine.pool)
+    return stats
+
+
+@root.get("/metrics", include_in_schema=False)
+def metrics():
+    return Response(content=render_metrics(), media_type=CONTENT_TYPE_LATEST)
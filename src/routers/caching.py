@@ -0,0 +1,33 @@
+from typing import Optional
+
+from fastapi import Request, Response
+from starlette import status
+
+from core.response_cache import CachedResponse
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison, as required for If-None-Match
+    candidates = (candidate.strip().removeprefix("W/") for candidate in if_none_match.split(","))
+    return etag in candidates
+
+
+def cached_response(request: Request, cached: CachedResponse) -> Response:
+    """
+    Response with the cached body, or 304 Not Modified when the client already has this version.
+
+    :param request: Incoming request, checked for `If-None-Match`
+    :param cached: Serialized body and its ETag
+    """
+    # Clients may keep the body, but have to revalidate it on every use
+    headers = {"ETag": cached.etag, "Cache-Control": "no-cache"}
+    if cached.next_cursor:
+        headers["X-Next-Cursor"] = cached.next_cursor
+
+    if _etag_matches(request.headers.get("if-none-match"), cached.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
@@ -1,11 +1,46 @@
-from typing import Annotated
+from typing import Annotated, Optional
 
-from fastapi import Depends
+from fastapi import Depends, HTTPException, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
+from starlette import status
+
+from auth.current_user import get_current_principal, get_current_user
+from core.database import get_async_session, get_primary_session
+from core.events import EventBroadcaster, get_event_broadcaster
+from core.routing import STICKY_COOKIE, SessionRouter
+from repositories.utils.pagination import decode_cursor
+from schemas.auth import TokenData
+from schemas.pagination import PaginationParams
+from schemas.user import UserSchema
+
+
+def get_pagination(
+    limit: int = Query(default=50, ge=1, le=100, description="Maximum number of items on the page"),
+    cursor: Optional[str] = Query(
+        default=None, description="Value of the `X-Next-Cursor` header returned with the previous page"
+    ),
+) -> PaginationParams:
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return PaginationParams(limit=limit, after=after)
+
+
+def requires_fresh_read(request: Request) -> bool:
+    """
+    Whether the client has written something within the stickiness window. Its reads skip the response cache:
+    caches of the local backend are per worker, the write has invalidated the one of the worker that handled it.
+    """
+    return SessionRouter.is_sticky(request.cookies.get(STICKY_COOKIE))
 
-from auth.current_user import get_current_user
-from core.database import get_async_session
-from models import UserModel
 
 SessionDep = Annotated[AsyncSession, Depends(get_async_session)]
-CurrentUserDep = Annotated[UserModel, Depends(get_current_user)]
+# Reads that fill the shared response cache must not see a lagging replica
+PrimarySessionDep = Annotated[AsyncSession, Depends(get_primary_session)]
+CurrentUserDep = Annotated[UserSchema, Depends(get_current_user)]
+# Only the id of the caller taken from the token, without a database lookup
+CurrentPrincipalDep = Annotated[TokenData, Depends(get_current_principal)]
+PaginationDep = Annotated[PaginationParams, Depends(get_pagination)]
+FreshReadDep = Annotated[bool, Depends(requires_fresh_read)]
+EventBroadcasterDep = Annotated[EventBroadcaster, Depends(get_event_broadcaster)]
@@ -0,0 +1,55 @@
+from functools import lru_cache
+from typing import Any, List, Mapping, Optional, Sequence, Type, Union
+from uuid import UUID
+
+import orjson
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import Row
+
+
+def _encode_default(value: Any) -> Any:
+    # asyncpg returns its own subclass of UUID, orjson only encodes exact UUID instances
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[model])
+
+
+def model_response(
+    content: Union[BaseModel, Sequence[BaseModel]], headers: Optional[Mapping[str, str]] = None
+) -> Response:
+    """
+    Response with models that are already validated, serialized straight to JSON by pydantic-core.
+
+    FastAPI does not validate a returned `Response` against `response_model` once more, the route keeps
+    `response_model` for the docs only.
+
+    :param content: A model or a list of models of the same class
+    :param headers: Additional headers of the response
+    """
+    if isinstance(content, BaseModel):
+        body = content.__pydantic_serializer__.to_json(content)
+    elif content:
+        body = _list_adapter(type(content[0])).dump_json(content)
+    else:
+        body = b"[]"
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def rows_response(rows: Sequence[Row], headers: Optional[Mapping[str, str]] = None) -> Response:
+    """
+    Response with database rows serialized by orjson, without ORM instances and pydantic models in between.
+
+    Rows must only contain the fields of the response model, with values orjson encodes the same way
+    pydantic does (UUID, naive datetime, Enum, str, int, bool).
+
+    :param rows: Rows of the selected columns, named like the fields of the response model
+    :param headers: Additional headers of the response
+    """
+    body = orjson.dumps([row._asdict() for row in rows], default=_encode_default)
+    return Response(content=body, media_type="application/json", headers=headers)
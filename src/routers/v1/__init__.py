@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from . import application, auth, position, project, user
+from . import application, auth, position, project, search, user
 
 router = APIRouter(prefix="/v1")
 
@@ -10,3 +10,4 @@ router.include_router(user.router)
 router.include_router(project.router)
 router.include_router(position.router)
 router.include_router(application.router)
+router.include_router(search.router)
@@ -1,8 +1,8 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, BackgroundTasks, Depends
 from fastapi.security import OAuth2PasswordRequestForm
 
-from routers.depenencies import SessionDep
-from schemas.auth import TokenSchema
+from routers.depenencies import CurrentPrincipalDep, SessionDep
+from schemas.auth import RefreshSchema, TokenSchema
 from schemas.user import UserCreateSchema as SignUpSchema
 from schemas.user import UserSchema
 from services.auth_service import AuthService
@@ -11,9 +11,21 @@ router = APIRouter(prefix="/auth", tags=["Auth"])
 
 
 @router.post("/login", response_model=TokenSchema)
-async def login(session: SessionDep, data: OAuth2PasswordRequestForm = Depends()):
+async def login(session: SessionDep, background_tasks: BackgroundTasks, data: OAuth2PasswordRequestForm = Depends()):
     auth_service = AuthService(session)
-    return await auth_service.login(data)
+    return await auth_service.login(data, background_tasks)
+
+
+@router.post("/refresh", response_model=TokenSchema)
+async def refresh(data: RefreshSchema, session: SessionDep):
+    auth_service = AuthService(session)
+    return await auth_service.refresh(data)
+
+
+@router.post("/logout", response_model=bool)
+async def logout(principal: CurrentPrincipalDep, session: SessionDep):
+    auth_service = AuthService(session)
+    return await auth_service.logout(principal)
 
 
 @router.post("/signup", response_model=UserSchema)
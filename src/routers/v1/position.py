@@ -3,8 +3,14 @@ from uuid import UUID
 
 from fastapi import APIRouter
 
-from routers.depenencies import CurrentUserDep, SessionDep
-from schemas.application import ApplicationCreateSchema, ApplicationSchema
+from routers.depenencies import CurrentPrincipalDep, PaginationDep, SessionDep
+from routers.responses import model_response, rows_response
+from schemas.application import (
+    ApplicationBatchSchema,
+    ApplicationCreateSchema,
+    ApplicationDecisionResultSchema,
+    ApplicationSchema,
+)
 from schemas.position import PositionSchema, PositionUpdateSchema
 from services.application_service import ApplicationService
 from services.position_service import PositionService
@@ -16,7 +22,7 @@ router = APIRouter(prefix="/positions", tags=["Positions"])
 async def update_position(
     position_id: UUID,
     data: PositionUpdateSchema,
-    user: CurrentUserDep,
+    user: CurrentPrincipalDep,
     session: SessionDep,
 ):
     position_service = PositionService(session)
@@ -24,7 +30,7 @@ async def update_position(
 
 
 @router.delete("/{position_id}", response_model=bool)
-async def delete_position(position_id: UUID, user: CurrentUserDep, session: SessionDep):
+async def delete_position(position_id: UUID, user: CurrentPrincipalDep, session: SessionDep):
     position_service = PositionService(session)
     return await position_service.delete(position_id, user.id)
 
@@ -33,7 +39,7 @@ async def delete_position(position_id: UUID, user: CurrentUserDep, session: Sess
 async def apply_for_position(
     position_id: UUID,
     data: ApplicationCreateSchema,
-    user: CurrentUserDep,
+    user: CurrentPrincipalDep,
     session: SessionDep,
 ):
     application_service = ApplicationService(session)
@@ -41,6 +47,23 @@ async def apply_for_position(
 
 
 @router.get("/{position_id}/applications", response_model=List[ApplicationSchema])
-async def get_applications(position_id: UUID, user: CurrentUserDep, session: SessionDep):
+async def get_applications(
+    position_id: UUID,
+    pagination: PaginationDep,
+    user: CurrentPrincipalDep,
+    session: SessionDep,
+):
+    application_service = ApplicationService(session)
+    applications, next_cursor = await application_service.get_all_by_position_id(position_id, user.id, pagination)
+    return rows_response(applications, headers={"X-Next-Cursor": next_cursor} if next_cursor else None)
+
+
+@router.post("/{position_id}/applications:batch", response_model=List[ApplicationDecisionResultSchema])
+async def set_application_statuses(
+    position_id: UUID,
+    data: ApplicationBatchSchema,
+    user: CurrentPrincipalDep,
+    session: SessionDep,
+):
     application_service = ApplicationService(session)
-    return await application_service.get_all_by_position_id(position_id, user.id)
+    return model_response(await application_service.set_statuses(position_id, data.decisions, user.id))
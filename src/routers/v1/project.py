@@ -1,48 +1,98 @@
-from typing import List
+from typing import FrozenSet, List, Optional, Union
 from uuid import UUID
 
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from starlette import status
 
-from routers.depenencies import CurrentUserDep, SessionDep
+from routers.caching import cached_response
+from routers.depenencies import (
+    CurrentPrincipalDep,
+    FreshReadDep,
+    PaginationDep,
+    PrimarySessionDep,
+    SessionDep,
+)
 from schemas.position import PositionCreateSchema, PositionSchema
-from schemas.project import ProjectCreateSchema, ProjectSchema, ProjectUpdateSchema
+from schemas.project import (
+    ProjectCreateSchema,
+    ProjectSchema,
+    ProjectUpdateSchema,
+    ProjectWithPositionsSchema,
+    ProjectWithVacanciesSchema,
+)
 from services.position_service import PositionService
 from services.project_service import ProjectService
 
 router = APIRouter(prefix="/projects", tags=["Projects"])
 
+PROJECT_INCLUDES = frozenset({"positions", "vacancies"})
+
+
+def _parse_include(include: Optional[str]) -> FrozenSet[str]:
+    requested = frozenset(part.strip() for part in (include or "").split(",") if part.strip())
+    unknown = requested - PROJECT_INCLUDES
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown include: {', '.join(sorted(unknown))}",
+        )
+    return requested
+
 
 @router.post("/", response_model=ProjectSchema)
-async def create(data: ProjectCreateSchema, user: CurrentUserDep, session: SessionDep):
+async def create(data: ProjectCreateSchema, user: CurrentPrincipalDep, session: SessionDep):
     project_service = ProjectService(session)
     return await project_service.create(data, user.id)
 
 
-@router.get("/{project_id}", response_model=ProjectSchema)
-async def get_one(project_id: UUID, session: SessionDep):
+@router.get("/", response_model=List[ProjectSchema])
+async def get_all(pagination: PaginationDep, response: Response, session: SessionDep):
+    project_service = ProjectService(session)
+    projects, next_cursor = await project_service.get_all(pagination)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return projects
+
+
+@router.get(
+    "/{project_id}",
+    response_model=Union[ProjectWithVacanciesSchema, ProjectWithPositionsSchema, ProjectSchema],
+)
+async def get_one(
+    project_id: UUID,
+    request: Request,
+    session: PrimarySessionDep,
+    fresh: FreshReadDep,
+    include: Optional[str] = Query(
+        default=None,
+        description="Comma separated related data to embed: `positions`, `vacancies` (positions with vacant slots)",
+    ),
+):
     project_service = ProjectService(session)
-    return await project_service.get_by_id(project_id)
+    return cached_response(request, await project_service.get_by_id(project_id, _parse_include(include), fresh))
 
 
 @router.put("/{project_id}", response_model=ProjectSchema)
-async def update(project_id: UUID, data: ProjectUpdateSchema, user: CurrentUserDep, session: SessionDep):
+async def update(project_id: UUID, data: ProjectUpdateSchema, user: CurrentPrincipalDep, session: SessionDep):
     project_service = ProjectService(session)
     return await project_service.update(project_id, data, user.id)
 
 
 @router.delete("/{project_id}", response_model=bool)
-async def delete(project_id: UUID, user: CurrentUserDep, session: SessionDep):
+async def delete(project_id: UUID, user: CurrentPrincipalDep, session: SessionDep):
     project_service = ProjectService(session)
     return await project_service.delete(project_id, user.id)
 
 
 @router.post("/{project_id}/positions", response_model=PositionSchema)
-async def add_position(project_id: UUID, data: PositionCreateSchema, user: CurrentUserDep, session: SessionDep):
+async def add_position(project_id: UUID, data: PositionCreateSchema, user: CurrentPrincipalDep, session: SessionDep):
     position_service = PositionService(session)
     return await position_service.create(project_id, data, user.id)
 
 
 @router.get("/{project_id}/positions", response_model=List[PositionSchema])
-async def get_positions(project_id: UUID, session: SessionDep):
+async def get_positions(
+    project_id: UUID, pagination: PaginationDep, request: Request, session: PrimarySessionDep, fresh: FreshReadDep
+):
     position_service = PositionService(session)
-    return await position_service.get_all_by_project_id(project_id)
+    return cached_response(request, await position_service.get_all_by_project_id(project_id, pagination, fresh))
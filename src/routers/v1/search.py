@@ -0,0 +1,37 @@
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from starlette import status
+
+from models.project import Difficulty
+from repositories.utils.pagination import decode_cursor, decode_search_cursor
+from routers.depenencies import SessionDep
+from routers.responses import model_response
+from schemas.search import ProjectSearchParams, ProjectSearchSchema
+from services.project_service import ProjectService
+
+router = APIRouter(prefix="/search", tags=["Search"])
+
+
+@router.get("/projects", response_model=ProjectSearchSchema)
+async def search_projects(
+    session: SessionDep,
+    q: Optional[str] = Query(default=None, max_length=255, description="Words to look for in names and descriptions"),
+    difficulty: Optional[Difficulty] = None,
+    has_vacancies: Optional[bool] = Query(default=None, description="Whether a position has a vacant slot"),
+    limit: int = Query(default=50, ge=1, le=100, description="Maximum number of items on the page"),
+    cursor: Optional[str] = Query(
+        default=None, description="Value of the `X-Next-Cursor` header returned with the previous page"
+    ),
+):
+    params = ProjectSearchParams(query=(q or "").strip() or None, difficulty=difficulty, has_vacancies=has_vacancies)
+    try:
+        # Results of a text query are ordered by relevance and have cursors of their own
+        decode = decode_search_cursor if params.query else decode_cursor
+        after = decode(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+    project_service = ProjectService(session)
+    result, next_cursor = await project_service.search(params, limit, after)
+    return model_response(result, headers={"X-Next-Cursor": next_cursor} if next_cursor else None)
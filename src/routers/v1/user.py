@@ -1,8 +1,21 @@
+import asyncio
+from typing import Annotated, Optional
 from uuid import UUID
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Header, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from starlette import status
 
-from routers.depenencies import CurrentUserDep, SessionDep
+from auth.revocation import revocation_list
+from routers.caching import cached_response
+from routers.depenencies import (
+    CurrentPrincipalDep,
+    CurrentUserDep,
+    EventBroadcasterDep,
+    FreshReadDep,
+    PrimarySessionDep,
+    SessionDep,
+)
 from schemas.user import UserSchema, UserUpdateSchema
 from services.user_service import UserService
 
@@ -15,12 +28,45 @@ async def get_me(user: CurrentUserDep):
 
 
 @router.put("/me", response_model=UserSchema)
-async def update_user(user: CurrentUserDep, data: UserUpdateSchema, session: SessionDep):
+async def update_user(user: CurrentPrincipalDep, data: UserUpdateSchema, session: SessionDep):
     user_service = UserService(session)
     return await user_service.update(user.id, data)
 
 
+@router.get(
+    "/me/events",
+    response_class=StreamingResponse,
+    responses={status.HTTP_200_OK: {"content": {"text/event-stream": {}}}},
+)
+async def stream_my_events(
+    principal: CurrentPrincipalDep,
+    broadcaster: EventBroadcasterDep,
+    last_event_id: Annotated[Optional[str], Header()] = None,
+):
+    """
+    Server-sent events: `application.created` for new applications to positions of the user,
+    `application.approved` and `application.rejected` for applications of the user.
+    The stream ends when the access token expires or is revoked.
+    """
+    try:
+        await broadcaster.start()
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Events are unavailable")
+
+    return StreamingResponse(
+        broadcaster.stream(
+            str(principal.id),
+            last_event_id,
+            expires_at=principal.expires_at,
+            is_revoked=lambda: revocation_list.is_revoked(principal.jti),
+        ),
+        media_type="text/event-stream",
+        # Proxies must pass events through as they come
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/{user_id}", response_model=UserSchema)
-async def get_user(user_id: UUID, session: SessionDep):
+async def get_user(user_id: UUID, request: Request, session: PrimarySessionDep, fresh: FreshReadDep):
     user_service = UserService(session)
-    return await user_service.get_by_id(user_id)
+    return cached_response(request, await user_service.get_by_id(user_id, fresh))
@@ -1,9 +1,10 @@
+from typing import List, Optional
 from uuid import UUID
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 from models.associations.application import ApplicationStatus
-from schemas.utils.decorators import pick
+from schemas.utils.decorators import Pick
 from schemas.utils.mixins import IDSchemaMixin, TimeSchemaMixin
 
 
@@ -20,9 +21,31 @@ class ApplicationSchema(_BaseApplicationSchema):
     model_config = ConfigDict(from_attributes=True)
 
 
-@pick("message")
-class ApplicationCreateSchema(_BaseApplicationSchema): ...
+class ApplicationCreateSchema(Pick[_BaseApplicationSchema, "message"]): ...
 
 
-@pick("message")
-class ApplicationUpdateSchema(_BaseApplicationSchema): ...
+class ApplicationUpdateSchema(Pick[_BaseApplicationSchema, "message"]): ...
+
+
+class ApplicationDecisionSchema(BaseModel):
+    application_id: UUID
+    status: ApplicationStatus = Field(examples=[ApplicationStatus.APPROVED])
+
+    @field_validator("status")
+    @classmethod
+    def status_must_be_final(cls, value: ApplicationStatus) -> ApplicationStatus:
+        if value == ApplicationStatus.PENDING:
+            raise ValueError("Application can only be approved or rejected")
+        return value
+
+
+class ApplicationBatchSchema(BaseModel):
+    decisions: List[ApplicationDecisionSchema] = Field(min_length=1, max_length=1000)
+
+
+class ApplicationDecisionResultSchema(BaseModel):
+    application_id: UUID
+    success: bool
+    # Status of the application after the batch, if it exists
+    status: Optional[ApplicationStatus] = None
+    detail: Optional[str] = None
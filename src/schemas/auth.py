@@ -1,3 +1,4 @@
+from typing import Optional
 from uuid import UUID
 
 from pydantic import BaseModel, EmailStr
@@ -6,7 +7,19 @@ from pydantic import BaseModel, EmailStr
 class TokenSchema(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: str
+    # Seconds the access token is valid for
+    expires_in: int
+
+
+class RefreshSchema(BaseModel):
+    refresh_token: str
 
 
 class TokenData(BaseModel):
     id: UUID
+    # ID of the access token and of the login session it was issued for
+    jti: UUID
+    sid: Optional[UUID] = None
+    # Unix timestamp of the `exp` claim
+    expires_at: Optional[float] = None
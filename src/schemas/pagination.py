@@ -0,0 +1,11 @@
+from datetime import datetime
+from typing import Optional, Tuple
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+
+class PaginationParams(BaseModel):
+    limit: int = Field(default=50, ge=1, le=100)
+    # Decoded cursor: (created_at, id) of the last item of the previous page
+    after: Optional[Tuple[datetime, UUID]] = None
@@ -1,9 +1,9 @@
 from typing import Optional
 from uuid import UUID
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, computed_field
 
-from schemas.utils.decorators import omit
+from schemas.utils.decorators import Omit
 from schemas.utils.mixins import IDSchemaMixin
 
 
@@ -14,14 +14,20 @@ class _BasePositionSchema(IDSchemaMixin, BaseModel):
     project_id: UUID
 
 
-@omit("project_id")
-class PositionSchema(_BasePositionSchema):
+class PositionSchema(Omit[_BasePositionSchema, "project_id"]):
     model_config = ConfigDict(from_attributes=True)
 
 
-@omit("id", "project_id")
-class PositionCreateSchema(_BasePositionSchema): ...
+class PositionCreateSchema(Omit[_BasePositionSchema, "id", "project_id"]): ...
 
 
-@omit("id", "project_id")
-class PositionUpdateSchema(_BasePositionSchema): ...
+class PositionUpdateSchema(Omit[_BasePositionSchema, "id", "project_id"]): ...
+
+
+class PositionVacanciesSchema(PositionSchema):
+    approved_count: int
+
+    @computed_field
+    @property
+    def free_slots(self) -> int:
+        return max(self.count - self.approved_count, 0)
@@ -1,9 +1,11 @@
+from typing import List
 from uuid import UUID
 
 from pydantic import BaseModel, ConfigDict, Field
 
 from models.project import Difficulty
-from schemas.utils.decorators import omit, pick
+from schemas.position import PositionSchema, PositionVacanciesSchema
+from schemas.utils.decorators import Pick
 from schemas.utils.mixins import IDSchemaMixin, TimeSchemaMixin
 
 
@@ -18,9 +20,15 @@ class ProjectSchema(_BaseProjectSchema):
     model_config = ConfigDict(from_attributes=True)
 
 
-@pick("name", "description", "difficulty")
-class ProjectCreateSchema(_BaseProjectSchema): ...
+class ProjectWithPositionsSchema(ProjectSchema):
+    positions: List[PositionSchema]
 
 
-@pick("name", "description", "difficulty")
-class ProjectUpdateSchema(_BaseProjectSchema): ...
+class ProjectWithVacanciesSchema(ProjectSchema):
+    positions: List[PositionVacanciesSchema]
+
+
+class ProjectCreateSchema(Pick[_BaseProjectSchema, "name", "description", "difficulty"]): ...
+
+
+class ProjectUpdateSchema(Pick[_BaseProjectSchema, "name", "description", "difficulty"]): ...
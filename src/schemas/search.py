@@ -0,0 +1,22 @@
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+from models.project import Difficulty
+from schemas.project import ProjectSchema
+
+
+class ProjectSearchParams(BaseModel):
+    # Web search syntax: quoted phrases, `or`, `-` to exclude words
+    query: Optional[str] = Field(default=None, max_length=255)
+    difficulty: Optional[Difficulty] = None
+    # Whether at least one position of the project has a vacant slot
+    has_vacancies: Optional[bool] = None
+
+
+class ProjectSearchSchema(BaseModel):
+    items: List[ProjectSchema]
+    # Number of matching projects per difficulty without the difficulty filter, every count stops at a limit
+    difficulty_facets: Dict[Difficulty, int]
+    # Whether a count has reached the limit, such counts are lower bounds (shown as e.g. "1000+")
+    difficulty_facets_truncated: bool
@@ -2,7 +2,7 @@ from typing import Optional
 
 from pydantic import BaseModel, ConfigDict, EmailStr, Field
 
-from schemas.utils.decorators import omit, pick
+from schemas.utils.decorators import Omit, Pick
 from schemas.utils.mixins import IDSchemaMixin
 
 
@@ -14,14 +14,11 @@ class _BaseUserSchema(IDSchemaMixin, BaseModel):
     is_verified: bool = False
 
 
-@omit("password")
-class UserSchema(_BaseUserSchema):
+class UserSchema(Omit[_BaseUserSchema, "password"]):
     model_config = ConfigDict(from_attributes=True)
 
 
-@pick("email", "username", "password")
-class UserCreateSchema(_BaseUserSchema): ...
+class UserCreateSchema(Pick[_BaseUserSchema, "email", "username", "password"]): ...
 
 
-@pick("username")
-class UserUpdateSchema(_BaseUserSchema): ...
+class UserUpdateSchema(Pick[_BaseUserSchema, "username"]): ...
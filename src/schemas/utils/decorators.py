@@ -1,37 +1,157 @@
-from pydantic import BaseModel, create_model
+import dataclasses
+from copy import copy
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple, Type, TypeVar
 
+from pydantic import BaseModel, create_model, field_serializer, field_validator
+from pydantic_core import PydanticUndefined
 
-def omit(*fields):
-    """Omit pydantic fields from model"""
+ModelT = TypeVar("ModelT", bound=BaseModel)
 
-    def dec(_class: BaseModel):
-        for field in fields:
-            _class.model_fields.pop(field, None)
-        _clone = create_model(
-            _class.__name__,
-            __config__=_class.model_config,
-            **{k: (v.annotation, v) for k, v in _class.model_fields.items()},
-        )
-        setattr(_clone, "__pydantic_parent_namespace__", {})
-        return _clone
 
-    return dec
+def _unbound(func: Callable) -> Callable:
+    # Validators declared as classmethods are stored bound to the class they were declared on
+    return getattr(func, "__func__", func)
+
+
+def _kept(fields: Iterable[str], kept: Tuple[str, ...]) -> Tuple[str, ...]:
+    return tuple(field for field in fields if field == "*" or field in kept)
+
+
+def _decorators(source: Type[BaseModel], kept: Tuple[str, ...]) -> Dict[str, Any]:
+    """
+    Validators and serializers of the source model, re-declared for the derived one.
+
+    Field validators and serializers are limited to the kept fields. Model validators, model serializers
+    and computed fields are not carried over, they may read fields that are gone or None.
+    """
+    decorators = source.__pydantic_decorators__
+    namespace: Dict[str, Any] = {}
+    for name, decorator in decorators.field_validators.items():
+        fields = _kept(decorator.info.fields, kept)
+        if fields:
+            info = decorator.info
+            extra = {}
+            if info.mode != "after" and info.json_schema_input_type is not PydanticUndefined:
+                extra["json_schema_input_type"] = info.json_schema_input_type
+            namespace[name] = field_validator(*fields, mode=info.mode, check_fields=False, **extra)(
+                _unbound(decorator.func)
+            )
+    for name, decorator in decorators.field_serializers.items():
+        fields = _kept(decorator.info.fields, kept)
+        if fields:
+            info = decorator.info
+            namespace[name] = field_serializer(
+                *fields,
+                mode=info.mode,
+                return_type=info.return_type,
+                when_used=info.when_used,
+                check_fields=False,
+            )(_unbound(decorator.func))
+    return namespace
+
+
+@lru_cache(maxsize=None)
+def _derive(source: Type[BaseModel], kind: str, fields: Tuple[str, ...]) -> Type[BaseModel]:
+    definitions = {}
+    for name in fields:
+        field = copy(source.model_fields[name])
+        annotation = field.annotation
+        if kind == "Partial":
+            annotation = Optional[annotation]
+            field.default, field.default_factory = None, None
+        definitions[name] = (annotation, field)
+
+    if kind == "Partial":
+        model_name = f"Partial[{source.__name__}]"
+    else:
+        named = fields if kind == "Pick" else [name for name in source.model_fields if name not in fields]
+        model_name = f"{kind}[{source.__name__}, {', '.join(named)}]"
+
+    return create_model(
+        model_name,
+        __config__=source.model_config,
+        __module__=source.__module__,
+        __validators__=_decorators(source, fields),
+        **definitions,
+    )
+
+
+def _fields(source: Type[BaseModel], names: Iterable[str]) -> Tuple[str, ...]:
+    names = set(names)
+    unknown = names - source.model_fields.keys()
+    if unknown:
+        raise ValueError(f"{source.__name__} has no fields: {', '.join(sorted(unknown))}")
+    # Fields keep the order of the source, so the same selection is always the same model
+    return tuple(name for name in source.model_fields if name in names)
+
+
+class Pick:
+    """
+    `Pick[Model, "a", "b"]` is a model with only the fields `a` and `b` of `Model`.
 
+    Derived models are built once per selection and keep the config and the field validators and
+    serializers of the source model, which itself is left untouched. They are meant to be subclassed:
 
-def pick(*fields):
-    """Pick pydantic fields from model"""
+        class ProjectCreateSchema(Pick[_BaseProjectSchema, "name", "description"]): ...
+    """
 
-    def dec(_class: BaseModel):
-        _class.model_fields = {
-            key: _class.model_fields[key] for key in fields
-            if key in _class.model_fields
+    def __class_getitem__(cls, params: Tuple[Any, ...]) -> Type[BaseModel]:
+        source, *names = params
+        return _derive(source, "Pick", _fields(source, names))
+
+
+class Omit:
+    """`Omit[Model, "a", "b"]` is a model with all fields of `Model` except `a` and `b`, see `Pick`."""
+
+    def __class_getitem__(cls, params: Tuple[Any, ...]) -> Type[BaseModel]:
+        source, *names = params
+        omitted = _fields(source, names)
+        return _derive(source, "Omit", tuple(name for name in source.model_fields if name not in omitted))
+
+
+class Partial:
+    """`Partial[Model]` is `Model` with every field optional and defaulting to None, see `Pick`."""
+
+    def __class_getitem__(cls, source: Type[BaseModel]) -> Type[BaseModel]:
+        return _derive(source, "Partial", tuple(source.model_fields))
+
+
+def _declared_in_body(_class: Type[BaseModel]) -> Tuple[str, ...]:
+    """Fields, validators, serializers and computed fields declared by the class itself, not by its bases"""
+    declared = list(vars(_class).get("__annotations__", {}))
+    decorators = _class.__pydantic_decorators__
+    for kind in dataclasses.fields(decorators):
+        declared.extend(name for name in getattr(decorators, kind.name) if name in vars(_class))
+    return tuple(declared)
+
+
+def _decorator(derive: Callable[[Type[BaseModel]], Type[BaseModel]]) -> Callable[[Type[ModelT]], Type[ModelT]]:
+    def dec(_class: Type[ModelT]) -> Type[ModelT]:
+        # The decorated class only lends its name, the fields come from its base
+        declared = _declared_in_body(_class)
+        if declared:
+            raise TypeError(
+                f"{_class.__name__} declares {', '.join(declared)}, which the decorator would drop: "
+                "subclass `Pick[Model, ...]` or `Omit[Model, ...]` instead"
+            )
+        base = _class.__mro__[1]
+        derived = derive(base)
+        namespace = {
+            "__module__": _class.__module__,
+            "__qualname__": _class.__qualname__,
+            "model_config": _class.model_config,
         }
-        _clone = create_model(
-            _class.__name__,
-            __config__=_class.model_config,
-            **{k: (v.annotation, v) for k, v in _class.model_fields.items()},
-        )
-        setattr(_clone, "__pydantic_parent_namespace__", {})
-        return _clone
+        return type(_class.__name__, (derived,), namespace)
 
     return dec
+
+
+def omit(*fields: str):
+    """Omit pydantic fields from model, prefer subclassing `Omit[Model, ...]`"""
+    return _decorator(lambda base: Omit[(base, *fields)])
+
+
+def pick(*fields: str):
+    """Pick pydantic fields from model, prefer subclassing `Pick[Model, ...]`"""
+    return _decorator(lambda base: Pick[(base, *fields)])
@@ -1,44 +1,60 @@
-from typing import Sequence
+from typing import Dict, List, Optional, Sequence, Tuple
 from uuid import UUID
 
 from fastapi import HTTPException
+from sqlalchemy import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
 from models.associations.application import ApplicationModel, ApplicationStatus
+from repositories.access_repository import AccessRepository, ApplicationAccess
 from repositories.application_repository import ApplicationRepository
-from schemas.application import ApplicationCreateSchema, ApplicationUpdateSchema
+from schemas.application import (
+    ApplicationCreateSchema,
+    ApplicationDecisionResultSchema,
+    ApplicationDecisionSchema,
+    ApplicationSchema,
+    ApplicationUpdateSchema,
+)
+from schemas.pagination import PaginationParams
 from services.position_service import PositionService
 
+# Attempts of a batch whose vacant slots have been taken by concurrent approvals
+BATCH_ATTEMPTS = 3
+
+# Columns of applications serialized straight from rows
+_APPLICATION_FIELDS = tuple(ApplicationSchema.model_fields)
+
+# Messages of the single and the batch status changes, which must stay the same
+_NOT_PENDING = 'Status change is allowed only for "PENDING" applications'
+_NO_VACANT_SLOTS = "There are no vacant slots for this position"
+
 
 class ApplicationService:
     def __init__(self, session: AsyncSession):
         self._repository = ApplicationRepository(session)
+        self._access_repository = AccessRepository(session)
         self._position_service = PositionService(session)
 
     async def create(self, position_id: UUID, data: ApplicationCreateSchema, user_id: UUID) -> ApplicationModel:
-        position = await self._position_service.get_by_id(position_id)
+        position = await self._position_service.get_access(position_id, applicant_id=user_id)
 
-        owner = await self._position_service.get_project_owner(position.id)
-        if owner.id == user_id:
+        if position.is_owned_by(user_id):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="The owner cannot apply for positions in his project",
             )
 
-        if await self._position_service.check_if_user_alerady_applied(position.id, user_id):
+        if position.has_applied:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="You have already applied to this position",
             )
 
-        approved_applcications_count = await self._position_service.get_count_of_applications_with_status(
-            position_id, ApplicationStatus.APPROVED
-        )
-        if approved_applcications_count >= position.count:
+        if position.approved_count >= position.count:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="There are no vacant slots for this position",
+                detail=_NO_VACANT_SLOTS,
             )
 
         new_application = await self._repository.create(data, position_id=position_id, user_id=user_id)
@@ -49,27 +65,38 @@ class ApplicationService:
             )
         return new_application
 
-    async def _get_by_id(self, application_id: UUID) -> ApplicationModel:
-        application = await self._repository.get_by_id(application_id)
-        if application is None:
+    async def _get_access(self, application_id: UUID) -> ApplicationAccess:
+        access = await self._access_repository.get_application_access(application_id)
+        if access is None:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Application not found")
 
-        return application
+        return access
+
+    async def get_all_by_position_id(
+        self, position_id: UUID, user_id: UUID, pagination: PaginationParams
+    ) -> Tuple[Sequence[Row], Optional[str]]:
+        """
+        Get a page of applications of the position as rows with the fields of `ApplicationSchema`.
 
-    async def get_all_by_position_id(self, position_id: UUID, user_id: UUID) -> Sequence[ApplicationModel]:
-        position = await self._position_service.get_by_id(position_id)
-        owner = await self._position_service.get_project_owner(position.id)
-        if owner.id != user_id:
+        :param position_id: The ID of the position.
+        :param user_id: The ID of the user, who must own the project of the position.
+        :param pagination: Size of the page and the position of the previous one.
+        :raises HTTPException: If the position does not exist or belongs to someone else.
+        """
+        position = await self._position_service.get_access(position_id)
+        if not position.is_owned_by(user_id):
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
 
-        return await self._repository.get_all_by_position_id(position_id)
+        return await self._repository.get_all_by_position_id(
+            position_id, _APPLICATION_FIELDS, pagination.limit, pagination.after
+        )
 
     async def update(self, application_id: UUID, data: ApplicationUpdateSchema, user_id: UUID):
-        application = await self._get_by_id(application_id)
-        if application.user_id != user_id:
+        application = await self._get_access(application_id)
+        if not application.is_authored_by(user_id):
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
 
-        updated_application = await self._repository.update(application_id, data)
+        updated_application = await self._repository.update(application.id, data)
         if updated_application is None:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -78,36 +105,42 @@ class ApplicationService:
         return updated_application
 
     async def delete(self, application_id: UUID, user_id: UUID) -> bool:
-        application = await self._get_by_id(application_id)
-        if application.user_id != user_id:
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
-        return await self._repository.delete(application_id)
+        deleted = await self._repository.delete(application_id, ApplicationModel.user_id == user_id)
+        if deleted is None:
+            # Distinguish a missing application from someone else's one
+            application = await self._get_access(application_id)
+            if not application.is_authored_by(user_id):
+                raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Error while deleting an application",
+            )
+        return True
 
     async def __set_status(
-        self, application_id: UUID, new_status: ApplicationStatus, user_id: UUID
+        self, application: ApplicationAccess, new_status: ApplicationStatus, user_id: UUID
     ) -> ApplicationModel:
         """
         Sets the status of an application.
 
-        :param application_id: The ID of the application to update.
+        :param application: Access record of the application to update.
         :param new_status: The new status of the application.
         :param user_id: The ID of the user updating the application status.
-        :return: None
+        :return: Updated application
         """
-        application = await self._get_by_id(application_id)
-
         if application.status != ApplicationStatus.PENDING:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail='Status change is allowed only for "PENDING" applications',
+                detail=_NOT_PENDING,
             )
 
-        position = await self._position_service.get_by_id(application.position_id)
-        owner = await self._position_service.get_project_owner(position.id)
-        if owner.id != user_id:
+        if not application.is_owned_by(user_id):
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
 
-        updated_application = await self._repository.update(application_id, {"status": new_status})
+        if new_status == ApplicationStatus.APPROVED:
+            return await self.__take_slot(application)
+
+        updated_application = await self._repository.set_status(application.id, new_status)
         if updated_application is None:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -116,21 +149,126 @@ class ApplicationService:
 
         return updated_application
 
-    async def approve(self, application_id: UUID, user_id: UUID) -> ApplicationModel:
-        application = await self._get_by_id(application_id)
-        position = await self._position_service.get_by_id(application.position_id)
+    async def __take_slot(self, application: ApplicationAccess) -> ApplicationModel:
+        """
+        Approves an application, atomically taking one of the vacant slots of its position.
 
-        approved_applcications_count = await self._position_service.get_count_of_applications_with_status(
-            position.id, ApplicationStatus.APPROVED
-        )
+        :param application: Access record of the application to approve.
+        :return: Approved application
+        """
+        approved_application, slot_taken = await self._repository.approve(application.id)
+        if approved_application is None:
+            # The status has been changed by a concurrent request
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=_NOT_PENDING,
+            )
+        if not slot_taken:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=_NO_VACANT_SLOTS,
+            )
+
+        return approved_application
 
-        if approved_applcications_count >= position.count:
+    async def approve(self, application_id: UUID, user_id: UUID) -> ApplicationModel:
+        application = await self._get_access(application_id)
+
+        if application.approved_count >= application.position_count:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="There are no vacant slots for this position",
+                detail=_NO_VACANT_SLOTS,
             )
 
-        return await self.__set_status(application_id, ApplicationStatus.APPROVED, user_id)
+        return await self.__set_status(application, ApplicationStatus.APPROVED, user_id)
 
     async def reject(self, application_id: UUID, user_id: UUID) -> ApplicationModel:
-        return await self.__set_status(application_id, ApplicationStatus.REJECTED, user_id)
+        application = await self._get_access(application_id)
+        return await self.__set_status(application, ApplicationStatus.REJECTED, user_id)
+
+    async def set_statuses(
+        self, position_id: UUID, decisions: Sequence[ApplicationDecisionSchema], user_id: UUID
+    ) -> List[ApplicationDecisionResultSchema]:
+        """
+        Approves and rejects applications of the position in one transaction.
+
+        Decisions that cannot be applied (unknown or already processed applications, approvals beyond
+        the vacant slots, repeated applications) are reported in the result and do not affect the others.
+        Approvals take the vacant slots in the order of the decisions.
+
+        :param position_id: The ID of the position.
+        :param decisions: New statuses of the applications.
+        :param user_id: The ID of the user updating the application statuses.
+        :return: Result of every decision, in the order of the decisions.
+        """
+        ids = [decision.application_id for decision in decisions]
+
+        for _ in range(BATCH_ATTEMPTS):
+            position = await self._position_service.get_access(position_id)
+            if not position.is_owned_by(user_id):
+                raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
+
+            statuses = await self._repository.get_statuses(position_id, ids)
+
+            errors: Dict[int, str] = {}
+            approve_ids: List[UUID] = []
+            reject_ids: List[UUID] = []
+            vacant_slots = position.count - position.approved_count
+            seen = set()
+            for index, decision in enumerate(decisions):
+                application_id = decision.application_id
+                if application_id in seen:
+                    errors[index] = "Duplicate decision for the application"
+                elif application_id not in statuses:
+                    errors[index] = "Application not found"
+                elif statuses[application_id] != ApplicationStatus.PENDING:
+                    errors[index] = _NOT_PENDING
+                elif decision.status == ApplicationStatus.APPROVED and vacant_slots <= 0:
+                    errors[index] = _NO_VACANT_SLOTS
+                elif decision.status == ApplicationStatus.APPROVED:
+                    vacant_slots -= 1
+                    approve_ids.append(application_id)
+                else:
+                    reject_ids.append(application_id)
+                seen.add(application_id)
+
+            updated, slots_taken = await self._repository.set_statuses(position_id, approve_ids, reject_ids)
+            if updated is None:
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail="Error while updating status",
+                )
+            if slots_taken:
+                break
+        else:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Vacant slots of the position are being taken concurrently, try again",
+            )
+
+        updated_statuses = {application.id: application.status for application in updated}
+        results = []
+        for index, decision in enumerate(decisions):
+            application_id = decision.application_id
+            if index not in errors and application_id not in updated_statuses:
+                # Processed by a concurrent request after the statuses have been read
+                errors[index] = _NOT_PENDING
+
+            if index in errors:
+                results.append(
+                    ApplicationDecisionResultSchema(
+                        application_id=application_id,
+                        success=False,
+                        status=updated_statuses.get(application_id, statuses.get(application_id)),
+                        detail=errors[index],
+                    )
+                )
+            else:
+                results.append(
+                    ApplicationDecisionResultSchema(
+                        application_id=application_id,
+                        success=True,
+                        status=updated_statuses[application_id],
+                    )
+                )
+        return results
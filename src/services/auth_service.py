@@ -1,26 +1,68 @@
-from datetime import timedelta
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from uuid import UUID, uuid4
 
-from fastapi import HTTPException
+from fastapi import BackgroundTasks, HTTPException
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
-from auth.security import pwd_context, ACCESS_TOKEN_EXPIRE_MINUTES, create_access_token
+from auth.hashing import password_hasher
+from auth.revocation import revocation_list
+from auth.security import (
+    ACCESS_TOKEN_EXPIRE_MINUTES,
+    REFRESH_TOKEN_EXPIRE_DAYS,
+    create_access_token,
+    create_refresh_token,
+    hash_refresh_token,
+    password_needs_update,
+)
+from core.database import session_router
 from models import UserModel
-from schemas.auth import TokenSchema
+from repositories.token_repository import TokenRepository
+from repositories.user_repository import UserRepository
+from schemas.auth import RefreshSchema, TokenData, TokenSchema
 from schemas.user import UserCreateSchema as RegisterSchema
 
 from services.user_service import UserService
+from settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+async def rehash_password(user_id: UUID, password: str, hashed_password: str) -> None:
+    """
+    Hash the password under the current policy and store the new hash.
+
+    Runs after the response to the login has been sent, in a session of its own.
+
+    :param user_id: The ID of the user
+    :param password: The password the user has just logged in with
+    :param hashed_password: The stored hash the password has been verified against
+    """
+    try:
+        new_hash = await password_hasher.hash(password)
+    except HTTPException:
+        # The pool is saturated, the hash is replaced after one of the next logins
+        return
+
+    async with session_router.primary() as session:
+        if not await UserRepository(session).replace_password_hash(user_id, hashed_password, new_hash):
+            logger.info("Password hash of user %s changed before it could be replaced", user_id)
 
 
 class AuthService:
     def __init__(self, session: AsyncSession):
         self._user_service = UserService(session)
+        self._token_repository = TokenRepository(session)
 
     async def signup(self, register_schema: RegisterSchema) -> UserModel:
         return await self._user_service.create(register_schema)
 
-    async def login(self, data: OAuth2PasswordRequestForm) -> TokenSchema:
+    async def login(
+        self, data: OAuth2PasswordRequestForm, background_tasks: Optional[BackgroundTasks] = None
+    ) -> TokenSchema:
         invalid_credentials_exc = HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials",
@@ -30,11 +72,70 @@ class AuthService:
         candidate = await self._user_service.get_by_email(data.username)
         if candidate is None:
             raise invalid_credentials_exc
-        if not pwd_context.verify(data.password, candidate.hashed_password):
+        if not await password_hasher.verify(data.password, candidate.hashed_password):
             raise invalid_credentials_exc
+        if (
+            background_tasks is not None
+            and settings.auth.rehash_on_login
+            and password_needs_update(candidate.hashed_password)
+        ):
+            background_tasks.add_task(rehash_password, candidate.id, data.password, candidate.hashed_password)
+
+        return await self._issue_tokens(candidate.id, family_id=uuid4())
+
+    async def refresh(self, data: RefreshSchema) -> TokenSchema:
+        """
+        Exchange a refresh token for a new pair of tokens, the presented one cannot be used again.
+
+        A refresh token that has already been used was either stolen or its holder was, so the whole login
+        session is revoked, including the access token issued last.
+        """
+        invalid_token_exc = HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+        token, used = await self._token_repository.use_refresh_token(hash_refresh_token(data.refresh_token))
+        if token is None:
+            raise invalid_token_exc
+        if not used:
+            if token.used_at is not None and token.revoked_at is None:
+                logger.warning("Refresh token of user %s reused, revoking session %s", token.user_id, token.family_id)
+                revocation_list.add(await self._token_repository.revoke_family(token.family_id))
+            raise invalid_token_exc
+
+        return await self._issue_tokens(token.user_id, family_id=token.family_id)
 
-        payload = {"sub": str(candidate.id)}
+    async def logout(self, principal: TokenData) -> bool:
+        """Revoke the login session the access token belongs to, with its refresh and access tokens"""
+        if principal.sid is None:
+            return False
+        jtis = await self._token_repository.revoke_family(principal.sid, user_id=principal.id)
+        revocation_list.add(jtis)
+        return bool(jtis)
+
+    async def _issue_tokens(self, user_id: UUID, family_id: UUID) -> TokenSchema:
         access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+        jti = uuid4()
+        payload = {"sub": str(user_id), "jti": str(jti), "sid": str(family_id)}
         access_token = create_access_token(data=payload, expires_delta=access_token_expires)
+        # Taken after the token, so that the stored expiry is never earlier than the claim
+        issued_at = datetime.now(timezone.utc)
+
+        refresh_token, token_hash = create_refresh_token()
+        await self._token_repository.create_refresh_token(
+            user_id=user_id,
+            family_id=family_id,
+            token_hash=token_hash,
+            access_jti=jti,
+            access_expires_at=issued_at + access_token_expires,
+            expires_at=issued_at + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+        )
 
-        return TokenSchema(access_token=access_token, token_type="bearer")
+        return TokenSchema(
+            access_token=access_token,
+            token_type="bearer",
+            refresh_token=refresh_token,
+            expires_in=int(access_token_expires.total_seconds()),
+        )
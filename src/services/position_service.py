@@ -1,24 +1,31 @@
-from typing import Sequence
+from typing import List, Optional
 from uuid import UUID
 
 from fastapi import HTTPException
+from pydantic import TypeAdapter
+from sqlalchemy import exists
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
-from models import PositionModel, UserModel
-from models.associations.application import ApplicationStatus
+from core.response_cache import CachedResponse, response_cache
+from models import PositionModel, ProjectModel
+from repositories.access_repository import AccessRepository, PositionAccess
 from repositories.position_repository import PositionRepository
-from schemas.position import PositionCreateSchema, PositionUpdateSchema
-from services.project_service import ProjectService
+from schemas.pagination import PaginationParams
+from schemas.position import PositionCreateSchema, PositionSchema, PositionUpdateSchema
+from services.project_service import ProjectService, project_positions_cache_tag
+
+_positions_adapter = TypeAdapter(List[PositionSchema])
 
 
 class PositionService:
     def __init__(self, session: AsyncSession):
         self._repository = PositionRepository(session)
+        self._access_repository = AccessRepository(session)
         self._project_service = ProjectService(session)
 
     async def create(self, project_id: UUID, data: PositionCreateSchema, user_id: UUID) -> PositionModel:
-        await self.__check_project_ownership(project_id, user_id)
+        await self._project_service.check_ownership(project_id, user_id)
 
         new_position = await self._repository.create(data, project_id=project_id)
         if new_position is None:
@@ -27,6 +34,7 @@ class PositionService:
                 detail="Error while creating a position",
             )
 
+        await response_cache.invalidate(project_positions_cache_tag(project_id))
         return new_position
 
     async def get_by_id(self, position_id: UUID) -> PositionModel:
@@ -36,51 +44,73 @@ class PositionService:
 
         return position
 
-    async def get_all_by_project_id(self, project_id: UUID) -> Sequence[PositionModel]:
-        return await self._repository.get_by_project_id(project_id)
+    async def get_access(self, position_id: UUID, applicant_id: Optional[UUID] = None) -> PositionAccess:
+        """
+        Get the position together with the owner of its project in a single query.
+
+        :param position_id: The ID of the position.
+        :param applicant_id: The ID of a user to check for an existing application to the position.
+        :raises HTTPException: If the position does not exist.
+        """
+        access = await self._access_repository.get_position_access(position_id, applicant_id)
+        if access is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Position not found")
+
+        return access
+
+    async def get_all_by_project_id(
+        self, project_id: UUID, pagination: PaginationParams, fresh: bool = False
+    ) -> CachedResponse:
+        """
+        Get a serialized page of positions of the project, served from the response cache when possible.
+
+        :param project_id: The ID of the project.
+        :param pagination: Size of the page and the position of the previous one.
+        :param fresh: Load the page even if it is cached, see `ResponseCache.get_or_load`.
+        """
+        after = pagination.after
+        variant = f"{pagination.limit}:{after[0].isoformat()}:{after[1]}" if after else str(pagination.limit)
+
+        async def load() -> CachedResponse:
+            positions, next_cursor = await self._repository.get_by_project_id(
+                project_id, pagination.limit, pagination.after
+            )
+            body = _positions_adapter.dump_json(_positions_adapter.validate_python(positions, from_attributes=True))
+            return CachedResponse.from_body(body, next_cursor)
+
+        return await response_cache.get_or_load(project_positions_cache_tag(project_id), variant, load, fresh=fresh)
 
     async def update(self, position_id: UUID, data: PositionUpdateSchema, user_id: UUID):
-        position = await self.get_by_id(position_id)
-        await self.__check_project_ownership(position.project_id, user_id)
+        position = await self.get_access(position_id)
+        if not position.is_owned_by(user_id):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
 
-        updated_position = await self._repository.update(position_id, data)
+        criteria = []
+        if "count" in data.model_fields_set:
+            # Checked by the update itself: approvals may take slots after the position has been read
+            criteria.append(PositionModel.approved_count <= data.count)
+
+        updated_position = await self._repository.update(position_id, data, *criteria)
         if updated_position is None:
+            if criteria and (await self.get_access(position_id)).approved_count > data.count:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="Count of the position is lower than the number of approved applications",
+                )
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Error while updating a position",
             )
+        await response_cache.invalidate(project_positions_cache_tag(position.project_id))
         return updated_position
 
     async def delete(self, position_id: UUID, user_id: UUID) -> bool:
-        position = await self.get_by_id(position_id)
-        await self.__check_project_ownership(position.project_id, user_id)
-
-        return await self._repository.delete(position_id)
-
-    async def get_project_owner(self, position_id: UUID) -> UserModel:
-        owner = await self._repository.get_project_owner(position_id)
-        if owner is None:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Owner of project not found",
-            )
-        return owner
-
-    async def check_if_user_alerady_applied(self, position_id: UUID, user_id: UUID) -> bool:
-        return await self._repository.check_if_user_alerady_applied(position_id, user_id)
-
-    async def get_count_of_applications_with_status(self, position_id: UUID, status: ApplicationStatus) -> int:
-        return await self._repository.get_count_of_applications_with_status(position_id, status)
-
-    async def __check_project_ownership(self, project_id: UUID, user_id: UUID) -> None:
-        """
-        Check if the provided user has ownership of the given project.
-
-        :param project_id: The ID of the project.
-        :param user_id: The ID of the user.
-        :raises HTTPException: If the user does not have ownership.
-        """
+        owned = exists().where(ProjectModel.id == PositionModel.project_id, ProjectModel.owner_id == user_id)
+        deleted = await self._repository.delete(position_id, owned)
+        if deleted is None:
+            if await self._repository.exists_by_id(position_id):
+                raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Position not found")
 
-        project = await self._project_service.get_by_id(project_id)
-        if project.owner_id != user_id:
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
+        await response_cache.invalidate(project_positions_cache_tag(deleted.project_id))
+        return True
@@ -1,17 +1,37 @@
+from typing import AbstractSet, Optional, Sequence, Tuple
 from uuid import UUID
 
 from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
+from core.response_cache import CachedResponse, response_cache
 from models import ProjectModel
+from repositories.access_repository import AccessRepository
 from repositories.project_repository import ProjectRepository
-from schemas.project import ProjectCreateSchema, ProjectUpdateSchema
+from schemas.pagination import PaginationParams
+from schemas.search import ProjectSearchParams, ProjectSearchSchema
+from schemas.project import (
+    ProjectCreateSchema,
+    ProjectSchema,
+    ProjectUpdateSchema,
+    ProjectWithPositionsSchema,
+    ProjectWithVacanciesSchema,
+)
+
+
+def project_cache_tag(project_id: UUID) -> str:
+    return f"project:{project_id}"
+
+
+def project_positions_cache_tag(project_id: UUID) -> str:
+    return f"project:{project_id}:positions"
 
 
 class ProjectService:
     def __init__(self, session: AsyncSession):
         self._repository = ProjectRepository(session)
+        self._access_repository = AccessRepository(session)
 
     async def create(self, data: ProjectCreateSchema, user_id: UUID) -> ProjectModel:
         new_project = await self._repository.create(data, owner_id=user_id)
@@ -21,11 +41,72 @@ class ProjectService:
             )
         return new_project
 
-    async def get_by_id(self, project_id: UUID) -> ProjectModel:
+    async def get_by_id(
+        self, project_id: UUID, include: AbstractSet[str] = frozenset(), fresh: bool = False
+    ) -> CachedResponse:
+        """
+        Get the serialized project, served from the response cache when possible.
+
+        :param project_id: The ID of the project.
+        :param include: Related data to embed: `positions`, `vacancies` (positions with their vacant slots).
+        :param fresh: Load the project even if it is cached, see `ResponseCache.get_or_load`.
+        :raises HTTPException: If the project does not exist.
+        """
+        if include:
+            # Vacancies change with every approval, so the aggregate is not cached
+            return await self._load_with_positions(project_id, vacancies="vacancies" in include)
+        return await response_cache.get_or_load(
+            project_cache_tag(project_id), "", lambda: self._load(project_id), fresh=fresh
+        )
+
+    async def _load_with_positions(self, project_id: UUID, vacancies: bool) -> CachedResponse:
+        project = await self._repository.get_with_positions(project_id)
+        if project is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+
+        schema = ProjectWithVacanciesSchema if vacancies else ProjectWithPositionsSchema
+        return CachedResponse.from_body(schema.model_validate(project).model_dump_json().encode())
+
+    async def _load(self, project_id: UUID) -> CachedResponse:
         project = await self._repository.get_by_id(project_id)
         if project is None:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
-        return project
+        return CachedResponse.from_body(ProjectSchema.model_validate(project).model_dump_json().encode())
+
+    async def get_all(self, pagination: PaginationParams) -> Tuple[Sequence[ProjectModel], Optional[str]]:
+        return await self._repository.get_page(pagination.limit, pagination.after)
+
+    async def search(
+        self, params: ProjectSearchParams, limit: int, after: Optional[Tuple] = None
+    ) -> Tuple[ProjectSearchSchema, Optional[str]]:
+        """
+        Search projects by text and filters, together with the number of matches per difficulty.
+
+        :param params: Text query and filters.
+        :param limit: Maximum number of projects on the page.
+        :param after: Decoded cursor of the previous page.
+        :return: Page of projects with facets and the cursor of the next page.
+        """
+        projects, next_cursor = await self._repository.search(params, limit, after)
+        facets, truncated = await self._repository.count_by_difficulty(params)
+        return (
+            ProjectSearchSchema(items=projects, difficulty_facets=facets, difficulty_facets_truncated=truncated),
+            next_cursor,
+        )
+
+    async def check_ownership(self, project_id: UUID, user_id: UUID) -> None:
+        """
+        Check if the provided user has ownership of the given project.
+
+        :param project_id: The ID of the project.
+        :param user_id: The ID of the user.
+        :raises HTTPException: If the project does not exist or the user does not have ownership.
+        """
+        owner_id = await self._access_repository.get_project_owner_id(project_id)
+        if owner_id is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+        if str(owner_id) != str(user_id):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
 
     async def update(self, project_id: UUID, data: ProjectUpdateSchema, user_id: UUID) -> ProjectModel:
         candidate = await self._repository.get_by_id(project_id)
@@ -35,19 +116,20 @@ class ProjectService:
         if candidate.owner_id != user_id:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
 
-        updated_project = await self._repository.update(project_id, data)
+        updated_project = await self._repository.update(candidate, data)
         if updated_project is None:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error while updating a project"
             )
+        await response_cache.invalidate(project_cache_tag(project_id))
         return updated_project
 
     async def delete(self, project_id: UUID, user_id: UUID) -> bool:
-        candidate = await self._repository.get_by_id(project_id)
-
-        if not candidate:
+        deleted = await self._repository.delete(project_id, ProjectModel.owner_id == user_id)
+        if deleted is None:
+            if await self._repository.exists_by_id(project_id):
+                raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
-        if candidate.owner_id != user_id:
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
 
-        return await self._repository.delete(project_id)
+        await response_cache.invalidate(project_cache_tag(project_id), project_positions_cache_tag(project_id))
+        return True
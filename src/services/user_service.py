@@ -5,12 +5,18 @@ from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
+from auth.current_user import invalidate_current_user
+from core.response_cache import CachedResponse, response_cache
 from models import UserModel
 from repositories.user_repository import UserRepository
-from schemas.user import UserCreateSchema, UserUpdateSchema
+from schemas.user import UserCreateSchema, UserSchema, UserUpdateSchema
 from services.utils.repository_validation import validate_creation, validate_update
 
 
+def user_cache_tag(user_id: UUID) -> str:
+    return f"user:{user_id}"
+
+
 class UserService:
     def __init__(self, session: AsyncSession):
         self._repository = UserRepository(session)
@@ -25,24 +31,44 @@ class UserService:
         validate_creation(new_user)
         return new_user
 
-    async def get_by_id(self, user_id: UUID) -> UserModel:
+    async def get_by_id(self, user_id: UUID, fresh: bool = False) -> CachedResponse:
+        """
+        Get the serialized user, served from the response cache when possible.
+
+        :param user_id: The ID of the user.
+        :param fresh: Load the user even if it is cached, see `ResponseCache.get_or_load`.
+        :raises HTTPException: If the user does not exist.
+        """
+        return await response_cache.get_or_load(user_cache_tag(user_id), "", lambda: self._load(user_id), fresh=fresh)
+
+    async def _load(self, user_id: UUID) -> CachedResponse:
         user = await self._repository.get_by_id(user_id)
         if user is None:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-        return user
+        return CachedResponse.from_body(UserSchema.model_validate(user).model_dump_json().encode())
 
     async def get_by_email(self, email: str) -> Optional[UserModel]:
         return await self._repository.get_by_email(email)
 
     async def update(self, user_id: UUID, data: UserUpdateSchema) -> UserModel:
-        if not await self._repository.exists_by_id(user_id):
+        user = await self._repository.get_by_id(user_id)
+        if user is None:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
-        updated_user = await self._repository.update(user_id, data)
+        updated_user = await self._repository.update(user, data)
         validate_update(updated_user)
+        invalidate_current_user(user_id)
+        await response_cache.invalidate(user_cache_tag(user_id))
         return updated_user
 
     async def delete(self, user_id: UUID) -> bool:
-        if not await self._repository.exists_by_id(user_id):
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-        return await self._repository.delete(user_id)
+        deleted = await self._repository.delete(user_id)
+        if deleted is None:
+            if not await self._repository.exists_by_id(user_id):
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+            # Applications of the user are kept, they are not deleted along with the user
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="User has applications")
+
+        invalidate_current_user(user_id)
+        await response_cache.invalidate(user_cache_tag(user_id))
+        return True
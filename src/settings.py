@@ -1,5 +1,6 @@
 from pydantic import Field
 from functools import lru_cache
+from typing import List, Literal, Optional
 import os
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -11,6 +12,8 @@ _default_model_config = SettingsConfigDict(
     env_file=ENV_FILE, env_file_encoding="utf-8", extra="ignore"
 )
 
+RATE_LIMIT_PATTERN = r"^(\d+/(second|minute|hour|\d+(\.\d+)?))?$"
+
 
 class PostgresSettings(BaseSettings):
     """Settings for postgres"""
@@ -23,10 +26,138 @@ class PostgresSettings(BaseSettings):
     db_user: str = Field(alias="POSTGRES_USER")
     db_pass: str = Field(alias="POSTGRES_PASSWORD")
 
+    # Streaming replica with the same database and credentials, reads of GET requests go there when it is set
+    replica_host: Optional[str] = Field(default=None, alias="POSTGRES_REPLICA_HOST")
+    replica_port: Optional[int] = Field(default=None, alias="POSTGRES_REPLICA_PORT")
+    # The primary itself when POSTGRES_HOST is PgBouncer, for the connections LISTEN on notifications
+    direct_host: Optional[str] = Field(default=None, alias="POSTGRES_DIRECT_HOST")
+    direct_port: Optional[int] = Field(default=None, alias="POSTGRES_DIRECT_PORT")
+
     @property
     def db_url(self) -> str:
         return f"postgresql+asyncpg://{self.db_user}:{self.db_pass}@{self.db_host}:{self.db_port}/{self.db_name}"
 
+    @property
+    def replica_db_url(self) -> Optional[str]:
+        if not self.replica_host:
+            return None
+        port = self.replica_port or self.db_port
+        return f"postgresql+asyncpg://{self.db_user}:{self.db_pass}@{self.replica_host}:{port}/{self.db_name}"
+
+    @property
+    def dsn(self) -> str:
+        """URL for connections opened by asyncpg itself, outside SQLAlchemy"""
+        return f"postgresql://{self.db_user}:{self.db_pass}@{self.db_host}:{self.db_port}/{self.db_name}"
+
+    @property
+    def direct_dsn(self) -> str:
+        """URL for connections opened by asyncpg that must reach Postgres itself, not PgBouncer"""
+        if not self.direct_host:
+            return self.dsn
+        port = self.direct_port or self.db_port
+        return f"postgresql://{self.db_user}:{self.db_pass}@{self.direct_host}:{port}/{self.db_name}"
+
+
+class DatabaseSettings(BaseSettings):
+    """Settings for the connection pool and the database driver"""
+
+    model_config = _default_model_config
+
+    # Every gunicorn worker has its own pool: up to workers * (pool_size + max_overflow) connections in total
+    pool_size: int = Field(default=5, ge=1, alias="DB_POOL_SIZE")
+    max_overflow: int = Field(default=10, ge=0, alias="DB_MAX_OVERFLOW")
+    pool_timeout: float = Field(default=30, gt=0, alias="DB_POOL_TIMEOUT")
+    pool_recycle: int = Field(default=1800, alias="DB_POOL_RECYCLE")
+    pool_pre_ping: bool = Field(default=False, alias="DB_POOL_PRE_PING")
+
+    # Milliseconds, 0 disables the timeout
+    statement_timeout: int = Field(default=0, ge=0, alias="DB_STATEMENT_TIMEOUT")
+    prepared_statement_cache_size: int = Field(default=100, ge=0, alias="DB_PREPARED_STATEMENT_CACHE_SIZE")
+
+    # Transaction pooling in PgBouncer: no prepared statement cache, no pool on the application side
+    pgbouncer: bool = Field(default=False, alias="DB_PGBOUNCER")
+
+    # Seconds after a write during which reads of the client go to the primary, must exceed the replication lag
+    replica_stickiness: float = Field(default=5, ge=0, alias="DB_REPLICA_STICKINESS")
+
+
+class HealthSettings(BaseSettings):
+    """Settings for the readiness probe"""
+
+    model_config = _default_model_config
+
+    # Seconds, probes within the interval get the cached result of the previous check
+    check_interval: float = Field(default=5, ge=0, alias="HEALTH_CHECK_INTERVAL")
+    check_timeout: float = Field(default=2, gt=0, alias="HEALTH_CHECK_TIMEOUT")
+    # Milliseconds, mean wait for a pooled connection above which the worker reports itself as degraded
+    degraded_pool_wait: float = Field(default=200, ge=0, alias="HEALTH_DEGRADED_POOL_WAIT")
+
+
+class ResponseCacheSettings(BaseSettings):
+    """Settings for the cache of public read endpoints"""
+
+    model_config = _default_model_config
+
+    # `local` keeps entries per worker, `redis` shares them between workers (requires the `redis` extra)
+    backend: Literal["local", "redis"] = Field(default="local", alias="RESPONSE_CACHE_BACKEND")
+    size: int = Field(default=4096, ge=0, alias="RESPONSE_CACHE_SIZE")
+    ttl: float = Field(default=30, ge=0, alias="RESPONSE_CACHE_TTL")
+    redis_url: str = Field(default="redis://localhost:6379/0", alias="RESPONSE_CACHE_REDIS_URL")
+
+
+class OutboxSettings(BaseSettings):
+    """Settings for the dispatcher of the transactional outbox"""
+
+    model_config = _default_model_config
+
+    # Every event is delivered to all sinks, `webhook` posts it to `webhook_url`
+    sinks: List[Literal["log", "webhook"]] = Field(default=["log"], alias="OUTBOX_SINKS")
+    webhook_url: str = Field(default="", alias="OUTBOX_WEBHOOK_URL")
+    webhook_timeout: float = Field(default=5, gt=0, alias="OUTBOX_WEBHOOK_TIMEOUT")
+
+    batch_size: int = Field(default=100, ge=1, alias="OUTBOX_BATCH_SIZE")
+    # Seconds between polls while the outbox is empty
+    poll_interval: float = Field(default=1, gt=0, alias="OUTBOX_POLL_INTERVAL")
+    # Failed deliveries are retried after base * 2 ** (attempts - 1) seconds (with jitter), at most `backoff_max`
+    max_attempts: int = Field(default=10, ge=1, alias="OUTBOX_MAX_ATTEMPTS")
+    backoff_base: float = Field(default=1, gt=0, alias="OUTBOX_BACKOFF_BASE")
+    backoff_max: float = Field(default=300, gt=0, alias="OUTBOX_BACKOFF_MAX")
+
+
+class EventStreamSettings(BaseSettings):
+    """Settings for the server-sent event streams of users"""
+
+    model_config = _default_model_config
+
+    # Seconds, idle streams get a comment and the listening connection is checked this often
+    heartbeat_interval: float = Field(default=15, gt=0, alias="EVENTS_HEARTBEAT_INTERVAL")
+    # Recent events kept per worker for streams resumed with `Last-Event-ID`
+    replay_size: int = Field(default=1024, ge=0, alias="EVENTS_REPLAY_SIZE")
+    # Messages waiting for a slow client, beyond them it gets a `resync` event instead
+    queue_size: int = Field(default=256, ge=1, alias="EVENTS_QUEUE_SIZE")
+    connect_timeout: float = Field(default=5, gt=0, alias="EVENTS_CONNECT_TIMEOUT")
+
+
+class RateLimitSettings(BaseSettings):
+    """Settings for rate limiting of the login and signup endpoints"""
+
+    model_config = _default_model_config
+
+    enabled: bool = Field(default=True, alias="RATE_LIMIT_ENABLED")
+    # `shared` keeps buckets in a memory-mapped file used by all workers of the machine, `local` per worker
+    # (every gunicorn worker then allows the whole limit)
+    backend: Literal["local", "shared"] = Field(default="shared", alias="RATE_LIMIT_BACKEND")
+    local_size: int = Field(default=65536, ge=1, alias="RATE_LIMIT_LOCAL_SIZE")
+    # Defaults to a file in the temporary directory
+    shared_path: str = Field(default="", alias="RATE_LIMIT_SHARED_PATH")
+    shared_slots: int = Field(default=65536, ge=1, alias="RATE_LIMIT_SHARED_SLOTS")
+
+    # Bursts refilled over a period: `<requests>/<second|minute|hour|seconds>`, empty disables the limit
+    login_ip: str = Field(default="30/minute", pattern=RATE_LIMIT_PATTERN, alias="RATE_LIMIT_LOGIN_IP")
+    login_account: str = Field(default="10/minute", pattern=RATE_LIMIT_PATTERN, alias="RATE_LIMIT_LOGIN_ACCOUNT")
+    signup_ip: str = Field(default="10/minute", pattern=RATE_LIMIT_PATTERN, alias="RATE_LIMIT_SIGNUP_IP")
+    signup_account: str = Field(default="5/minute", pattern=RATE_LIMIT_PATTERN, alias="RATE_LIMIT_SIGNUP_ACCOUNT")
+
 
 class AuthSettings(BaseSettings):
     """Settings for auth"""
@@ -35,7 +166,45 @@ class AuthSettings(BaseSettings):
 
     secret_key: str = Field(alias="SECRET_KEY")
     algorithm: str = Field(alias="ALGORITHM")
+    # `jose` supports every algorithm of python-jose, `native` verifies faster and supports HS256/384/512 and EdDSA
+    jwt_codec: Literal["jose", "native"] = Field(default="jose", alias="JWT_CODEC")
+    # PEM private key of asymmetric algorithms, tokens are signed with it instead of `secret_key`
+    jwt_private_key_file: Optional[str] = Field(default=None, alias="JWT_PRIVATE_KEY_FILE")
     access_token_expire_minutes: int = Field(alias="ACCESS_TOKEN_EXPIRE_MINUTES")
+    # Refresh tokens are rotated on every use, a session ends after this long without a refresh
+    refresh_token_expire_days: int = Field(default=30, ge=1, alias="REFRESH_TOKEN_EXPIRE_DAYS")
+
+    # Revoked access tokens are mirrored per worker in a Bloom filter, synchronized every `sync_interval` seconds
+    revocation_filter_capacity: int = Field(default=100_000, ge=1, alias="REVOCATION_FILTER_CAPACITY")
+    revocation_filter_error_rate: float = Field(default=0.001, gt=0, lt=1, alias="REVOCATION_FILTER_ERROR_RATE")
+    revocation_sync_interval: float = Field(default=1, ge=0, alias="REVOCATION_SYNC_INTERVAL")
+    revocation_rebuild_interval: float = Field(default=3600, gt=0, alias="REVOCATION_REBUILD_INTERVAL")
+
+    # Password hashing is offloaded from the event loop to a bounded pool
+    password_hashing_executor: Literal["thread", "process", "inline"] = Field(
+        default="thread", alias="PASSWORD_HASHING_EXECUTOR"
+    )
+    password_hashing_workers: int = Field(default=2, ge=1, alias="PASSWORD_HASHING_WORKERS")
+    password_hashing_queue_size: int = Field(default=32, ge=0, alias="PASSWORD_HASHING_QUEUE_SIZE")
+
+    # Scheme and cost of new hashes, tune them with `python -m auth.calibrate`. Hashes made under another policy
+    # are still verified and are replaced after the next successful login. `argon2` (argon2id) requires the
+    # `argon2` extra
+    password_hash_scheme: Literal["bcrypt", "argon2"] = Field(default="bcrypt", alias="PASSWORD_HASH_SCHEME")
+    bcrypt_rounds: int = Field(default=12, ge=4, le=31, alias="PASSWORD_BCRYPT_ROUNDS")
+    argon2_time_cost: int = Field(default=3, ge=1, alias="PASSWORD_ARGON2_TIME_COST")
+    # KiB
+    argon2_memory_cost: int = Field(default=65536, ge=8, alias="PASSWORD_ARGON2_MEMORY_COST")
+    argon2_parallelism: int = Field(default=4, ge=1, alias="PASSWORD_ARGON2_PARALLELISM")
+    rehash_on_login: bool = Field(default=True, alias="PASSWORD_REHASH_ON_LOGIN")
+
+    # Verified tokens are cached per worker until they expire or for at most `ttl` seconds, revocations still apply
+    decoded_token_cache_size: int = Field(default=4096, ge=0, alias="DECODED_TOKEN_CACHE_SIZE")
+    decoded_token_cache_ttl: float = Field(default=300, ge=0, alias="DECODED_TOKEN_CACHE_TTL")
+
+    # Authenticated users are cached per worker, so updates reach other workers after at most `ttl` seconds
+    current_user_cache_size: int = Field(default=1024, ge=0, alias="CURRENT_USER_CACHE_SIZE")
+    current_user_cache_ttl: float = Field(default=60, ge=0, alias="CURRENT_USER_CACHE_TTL")
 
 
 class Settings(BaseSettings):
@@ -43,6 +212,12 @@ class Settings(BaseSettings):
 
     environment: str = Field(alias="ENVIRONMENT")
     postgres: PostgresSettings = PostgresSettings()
+    database: DatabaseSettings = DatabaseSettings()
+    health: HealthSettings = HealthSettings()
+    response_cache: ResponseCacheSettings = ResponseCacheSettings()
+    outbox: OutboxSettings = OutboxSettings()
+    events: EventStreamSettings = EventStreamSettings()
+    rate_limit: RateLimitSettings = RateLimitSettings()
     auth: AuthSettings = AuthSettings()
 
 
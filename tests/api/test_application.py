@@ -1,12 +1,21 @@
+import asyncio
+from collections import Counter
+
 import pytest
 from httpx import AsyncClient
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 
-from models.associations.application import ApplicationStatus
+from models.associations.application import ApplicationModel, ApplicationStatus
+from models.position import PositionModel
 from schemas import application
+from schemas.application import ApplicationSchema
+from repositories.application_repository import ApplicationRepository
 from tests.utils.application import create_new_application, set_status
+from tests.utils.outbox import get_application_events
 from tests.utils.position import create_new_position
 from tests.utils.project import create_new_project
+from tests.utils.queries import assert_num_queries
 from tests.utils.random_ import random_uuid
 from tests.utils.user import authentication_token_from_email, create_new_user
 
@@ -120,6 +129,80 @@ async def test_user_can_set_status_for_application(
     assert response.status_code == 200
 
 
+@pytest.mark.parametrize("action", ("approved", "rejected"))
+async def test_set_status_takes_two_queries(
+    async_client: AsyncClient,
+    session: AsyncSession,
+    engine: AsyncEngine,
+    action: str,
+):
+    project_owner = await create_new_user(session)
+    project = await create_new_project(session, project_owner)
+    position = await create_new_position(session, project)
+    application = await create_new_application(session, position)
+
+    project_owner_token_headers = await authentication_token_from_email(
+        async_client=async_client,
+        session=session,
+        email=project_owner.email,
+    )
+
+    # One lookup of the whole ownership chain and one UPDATE ... RETURNING
+    with assert_num_queries(engine, 2):
+        response = await async_client.post(
+            f"/api/v1/applications/{application.id}/{action}",
+            headers=project_owner_token_headers,
+        )
+    assert response.status_code == 200
+    assert response.json()["status"] == action.upper()
+
+
+@pytest.mark.parametrize("action", ("approved", "rejected"))
+async def test_status_change_writes_outbox_event(async_client: AsyncClient, session: AsyncSession, action: str):
+    project_owner = await create_new_user(session)
+    project = await create_new_project(session, project_owner)
+    position = await create_new_position(session, project)
+    application = await create_new_application(session, position)
+
+    project_owner_token_headers = await authentication_token_from_email(
+        async_client=async_client,
+        session=session,
+        email=project_owner.email,
+    )
+
+    response = await async_client.post(
+        f"/api/v1/applications/{application.id}/{action}",
+        headers=project_owner_token_headers,
+    )
+    assert response.status_code == 200
+
+    events = await get_application_events(session, application.id)
+    assert [event.event_type for event in events] == ["application.created", f"application.{action}"]
+    assert events[-1].payload == {
+        "application_id": str(application.id),
+        "position_id": str(position.id),
+        "project_id": str(project.id),
+        "user_id": str(application.user_id),
+        "owner_id": str(project_owner.id),
+        "status": action.upper(),
+    }
+
+
+async def test_approval_without_vacant_slot_writes_no_outbox_event(session: AsyncSession):
+    position = await create_new_position(session, count=1)
+    approved = await create_new_application(session, position)
+    application = await create_new_application(session, position)
+    application_id = application.id
+    await set_status(session, approved, ApplicationStatus.APPROVED)
+
+    # The transaction is rolled back, together with the event of the approval
+    _, slot_taken = await ApplicationRepository(session).approve(application_id)
+    assert not slot_taken
+
+    events = await get_application_events(session, application_id)
+    assert [event.event_type for event in events] == ["application.created"]
+
+
 async def test_user_can_not_approve_when_there_are_no_vacant_slots(async_client: AsyncClient, session: AsyncSession):
     VACANT_SLOTS = 2
     project_owner = await create_new_user(session)
@@ -153,6 +236,42 @@ async def test_user_can_not_approve_when_there_are_no_vacant_slots(async_client:
     assert response.json() == {"detail": "There are no vacant slots for this position"}
 
 
+async def test_concurrent_approvals_do_not_overfill_position(async_client: AsyncClient, session: AsyncSession):
+    VACANT_SLOTS = 3
+    APPLICATIONS_COUNT = 10
+
+    project_owner = await create_new_user(session)
+    project = await create_new_project(session, project_owner)
+    position = await create_new_position(session, project, count=VACANT_SLOTS)
+
+    applications = [await create_new_application(session, position) for _ in range(APPLICATIONS_COUNT)]
+
+    project_owner_token_headers = await authentication_token_from_email(
+        async_client=async_client,
+        session=session,
+        email=project_owner.email,
+    )
+
+    responses = await asyncio.gather(
+        *(
+            async_client.post(f"/api/v1/applications/{application.id}/approved", headers=project_owner_token_headers)
+            for application in applications
+        )
+    )
+    assert Counter(response.status_code for response in responses) == {
+        200: VACANT_SLOTS,
+        400: APPLICATIONS_COUNT - VACANT_SLOTS,
+    }
+
+    approved_count = await session.scalar(
+        select(func.count())
+        .select_from(ApplicationModel)
+        .filter_by(position_id=position.id, status=ApplicationStatus.APPROVED)
+    )
+    assert approved_count == VACANT_SLOTS
+    assert await session.scalar(select(PositionModel.approved_count).filter_by(id=position.id)) == VACANT_SLOTS
+
+
 async def test_user_can_retrieve_applications(
     async_client: AsyncClient,
     session: AsyncSession,
@@ -176,6 +295,25 @@ async def test_user_can_retrieve_applications(
     assert len(response.json()) == APPLICATIONS_COUNT
 
 
+async def test_applications_from_rows_match_response_model(async_client: AsyncClient, session: AsyncSession):
+    project_owner = await create_new_user(session)
+    project = await create_new_project(session, project_owner)
+    position = await create_new_position(session, project)
+    created = await create_new_application(session, position)
+    await set_status(session, created, ApplicationStatus.APPROVED)
+    token_headers = await authentication_token_from_email(
+        async_client=async_client, session=session, email=project_owner.email
+    )
+
+    response = await async_client.get(f"/api/v1/positions/{position.id}/applications", headers=token_headers)
+    assert response.status_code == 200
+
+    # Rows are serialized without the response model, the output must be the same as with it
+    await session.refresh(created)
+    expected = ApplicationSchema.model_validate(created).model_dump(mode="json")
+    assert response.json() == [expected]
+
+
 async def test_user_can_not_retrieve_application_for_not_exist_position(
     async_client: AsyncClient,
     session: AsyncSession,
@@ -325,3 +463,120 @@ async def test_user_can_not_delete_application_if_he_does_not_own_it(async_clien
     )
     assert response.status_code == 200
     assert len(response.json()) == 1
+
+
+async def test_deleting_approved_application_frees_slot_in_one_statement(session: AsyncSession, engine: AsyncEngine):
+    position = await create_new_position(session, count=2)
+    approved = await create_new_application(session, position)
+    pending = await create_new_application(session, position)
+    position_id, approved_id, pending_id = position.id, approved.id, pending.id
+    await set_status(session, approved, ApplicationStatus.APPROVED)
+
+    repository = ApplicationRepository(session)
+    with assert_num_queries(engine, 1):
+        assert await repository.delete(pending_id) is not None
+    assert await session.scalar(select(PositionModel.approved_count).filter_by(id=position_id)) == 1
+
+    with assert_num_queries(engine, 1):
+        assert await repository.delete(approved_id) is not None
+    assert await session.scalar(select(PositionModel.approved_count).filter_by(id=position_id)) == 0
+    assert await repository.delete(approved_id) is None
+
+
+async def test_owner_can_set_statuses_in_batch(
+    async_client: AsyncClient, session: AsyncSession, engine: AsyncEngine
+):
+    VACANT_SLOTS = 2
+
+    project_owner = await create_new_user(session)
+    project = await create_new_project(session, project_owner)
+    position = await create_new_position(session, project, count=VACANT_SLOTS)
+    applications = [await create_new_application(session, position) for _ in range(4)]
+    processed = await create_new_application(session, position)
+    await set_status(session, processed, ApplicationStatus.REJECTED)
+
+    project_owner_token_headers = await authentication_token_from_email(
+        async_client=async_client,
+        session=session,
+        email=project_owner.email,
+    )
+
+    missing_id = random_uuid()
+    decisions = [
+        (applications[0].id, "APPROVED"),
+        (applications[1].id, "APPROVED"),
+        (applications[2].id, "APPROVED"),
+        (applications[3].id, "REJECTED"),
+        (processed.id, "APPROVED"),
+        (missing_id, "REJECTED"),
+        (applications[0].id, "REJECTED"),
+    ]
+    # Ownership chain, statuses of the applications and a single UPDATE of applications and the position
+    with assert_num_queries(engine, 3):
+        response = await async_client.post(
+            f"/api/v1/positions/{position.id}/applications:batch",
+            headers=project_owner_token_headers,
+            json={"decisions": [{"application_id": str(id_), "status": status} for id_, status in decisions]},
+        )
+    assert response.status_code == 200
+
+    results = [(result["success"], result["status"], result["detail"]) for result in response.json()]
+    assert results == [
+        (True, "APPROVED", None),
+        (True, "APPROVED", None),
+        (False, "PENDING", "There are no vacant slots for this position"),
+        (True, "REJECTED", None),
+        (False, "REJECTED", 'Status change is allowed only for "PENDING" applications'),
+        (False, None, "Application not found"),
+        (False, "APPROVED", "Duplicate decision for the application"),
+    ]
+    assert await session.scalar(select(PositionModel.approved_count).filter_by(id=position.id)) == VACANT_SLOTS
+
+
+async def test_owner_can_reject_in_batch_without_vacant_slots(async_client: AsyncClient, session: AsyncSession):
+    project_owner = await create_new_user(session)
+    project = await create_new_project(session, project_owner)
+    position = await create_new_position(session, project, count=2)
+    applications = [await create_new_application(session, position) for _ in range(2)]
+    # More approved applications than slots, e.g. approved before the count of the position was lowered
+    await session.execute(update(PositionModel).filter_by(id=position.id).values(approved_count=3))
+    await session.commit()
+
+    project_owner_token_headers = await authentication_token_from_email(
+        async_client=async_client,
+        session=session,
+        email=project_owner.email,
+    )
+
+    response = await async_client.post(
+        f"/api/v1/positions/{position.id}/applications:batch",
+        headers=project_owner_token_headers,
+        json={"decisions": [{"application_id": str(item.id), "status": "REJECTED"} for item in applications]},
+    )
+    assert response.status_code == 200
+    assert [(result["success"], result["status"]) for result in response.json()] == [(True, "REJECTED")] * 2
+    assert await session.scalar(select(PositionModel.approved_count).filter_by(id=position.id)) == 3
+
+
+async def test_user_can_not_set_statuses_in_batch_for_not_authored_position(
+    async_client: AsyncClient, session: AsyncSession
+):
+    position = await create_new_position(session)
+    application = await create_new_application(session, position)
+
+    user = await create_new_user(session)
+    token_headers = await authentication_token_from_email(async_client=async_client, session=session, email=user.email)
+
+    response = await async_client.post(
+        f"/api/v1/positions/{position.id}/applications:batch",
+        headers=token_headers,
+        json={"decisions": [{"application_id": str(application.id), "status": "APPROVED"}]},
+    )
+    assert response.status_code == 403
+
+    response = await async_client.post(
+        f"/api/v1/positions/{position.id}/applications:batch",
+        headers=token_headers,
+        json={"decisions": [{"application_id": str(application.id), "status": "PENDING"}]},
+    )
+    assert response.status_code == 422
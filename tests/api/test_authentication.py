@@ -1,5 +1,13 @@
+import asyncio
+import hashlib
+from datetime import timedelta
+from typing import Dict
+
 from httpx import AsyncClient
 
+from auth import security
+from auth.current_user import decoded_token_cache
+
 
 async def test_no_jwt_token(async_client: AsyncClient):
     response = await async_client.get("/api/v1/users/me")
@@ -11,3 +19,20 @@ async def test_invalid_jwt_token(async_client: AsyncClient):
     response = await async_client.get("/api/v1/users/me", headers={"Authorization": "Bearer invalid"})
     assert response.status_code == 401
     assert response.json() == {"detail": "Could not validate credentials"}
+
+
+async def test_cached_token_expires_with_its_claim(
+    async_client: AsyncClient, default_user_token_headers: Dict[str, str]
+):
+    response = await async_client.get("/api/v1/users/me", headers=default_user_token_headers)
+    token = security.create_access_token(data={"sub": response.json()["id"]}, expires_delta=timedelta(seconds=1))
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = await async_client.get("/api/v1/users/me", headers=headers)
+    assert response.status_code == 200
+    assert hashlib.sha256(token.encode()).digest() in decoded_token_cache._data
+
+    # python-jose compares `exp` with the current time truncated to seconds
+    await asyncio.sleep(2.1)
+    response = await async_client.get("/api/v1/users/me", headers=headers)
+    assert response.status_code == 401
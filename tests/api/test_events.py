@@ -0,0 +1,221 @@
+import functools
+import json
+import time
+from datetime import timedelta
+from typing import AsyncGenerator
+
+import pytest
+from httpx import AsyncClient
+from prometheus_client import REGISTRY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from auth.security import create_access_token, jwt_codec
+from core.events import EventBroadcaster, get_event_broadcaster, listen_dsn
+from main import app
+from settings import DatabaseSettings, PostgresSettings
+from tests.conftest import DATABASE_URL_TEST
+from tests.utils.application import create_new_application
+from tests.utils.position import create_new_position
+from tests.utils.project import create_new_project
+from tests.utils.random_ import random_uuid
+from tests.utils.sse import EventStream
+from tests.utils.user import authentication_token_from_email, create_new_user
+
+EVENTS_PATH = "/api/v1/users/me/events"
+
+
+@pytest.fixture
+async def broadcaster() -> AsyncGenerator[EventBroadcaster, None]:
+    broadcaster = EventBroadcaster(DATABASE_URL_TEST.replace("+asyncpg", ""), heartbeat_interval=0.5)
+    app.dependency_overrides[get_event_broadcaster] = lambda: broadcaster
+    yield broadcaster
+    del app.dependency_overrides[get_event_broadcaster]
+    await broadcaster.close()
+
+
+async def test_applicant_receives_status_changes(
+    async_client: AsyncClient, session: AsyncSession, broadcaster: EventBroadcaster
+):
+    project_owner = await create_new_user(session)
+    project = await create_new_project(session, project_owner)
+    position = await create_new_position(session, project)
+    applicant = await create_new_user(session)
+    application = await create_new_application(session, position, applicant)
+
+    applicant_headers = await authentication_token_from_email(
+        async_client=async_client, session=session, email=applicant.email
+    )
+    project_owner_headers = await authentication_token_from_email(
+        async_client=async_client, session=session, email=project_owner.email
+    )
+
+    async with EventStream(app, EVENTS_PATH, applicant_headers) as stream:
+        assert stream.status == 200
+        assert stream.headers["content-type"].startswith("text/event-stream")
+
+        response = await async_client.post(
+            f"/api/v1/applications/{application.id}/approved", headers=project_owner_headers
+        )
+        assert response.status_code == 200
+
+        event = await stream.read_event()
+        data = json.loads(event["data"])
+        assert event["event"] == data["type"] == "application.approved"
+        assert event["id"] == data["id"]
+        assert data["payload"]["application_id"] == str(application.id)
+        assert data["payload"]["status"] == "APPROVED"
+
+
+async def test_owner_receives_new_applications(
+    async_client: AsyncClient, session: AsyncSession, broadcaster: EventBroadcaster
+):
+    project_owner = await create_new_user(session)
+    project = await create_new_project(session, project_owner)
+    position = await create_new_position(session, project)
+
+    project_owner_headers = await authentication_token_from_email(
+        async_client=async_client, session=session, email=project_owner.email
+    )
+
+    async with EventStream(app, EVENTS_PATH, project_owner_headers) as stream:
+        application = await create_new_application(session, position)
+
+        event = await stream.read_event()
+        assert event["event"] == "application.created"
+        assert json.loads(event["data"])["payload"]["application_id"] == str(application.id)
+
+
+async def test_stream_resumes_after_last_event_id(
+    async_client: AsyncClient, session: AsyncSession, broadcaster: EventBroadcaster
+):
+    project_owner = await create_new_user(session)
+    project = await create_new_project(session, project_owner)
+    position = await create_new_position(session, project, count=2)
+    applicant = await create_new_user(session)
+    other_position = await create_new_position(session, project)
+    approved = await create_new_application(session, position, applicant)
+    rejected = await create_new_application(session, other_position, applicant)
+
+    applicant_headers = await authentication_token_from_email(
+        async_client=async_client, session=session, email=applicant.email
+    )
+    project_owner_headers = await authentication_token_from_email(
+        async_client=async_client, session=session, email=project_owner.email
+    )
+
+    async with EventStream(app, EVENTS_PATH, applicant_headers) as stream:
+        await async_client.post(f"/api/v1/applications/{approved.id}/approved", headers=project_owner_headers)
+        last_event_id = (await stream.read_event())["id"]
+
+    # Sent while the client is disconnected
+    await async_client.post(f"/api/v1/applications/{rejected.id}/rejected", headers=project_owner_headers)
+
+    async with EventStream(app, EVENTS_PATH, {**applicant_headers, "Last-Event-ID": last_event_id}) as stream:
+        event = await stream.read_event()
+        assert event["event"] == "application.rejected"
+        assert json.loads(event["data"])["payload"]["application_id"] == str(rejected.id)
+
+
+async def test_stream_with_unknown_last_event_id_gets_resync(
+    async_client: AsyncClient, session: AsyncSession, broadcaster: EventBroadcaster
+):
+    user = await create_new_user(session)
+    headers = await authentication_token_from_email(async_client=async_client, session=session, email=user.email)
+
+    async with EventStream(app, EVENTS_PATH, {**headers, "Last-Event-ID": str(random_uuid())}) as stream:
+        assert (await stream.read_event())["event"] == "resync"
+
+
+async def test_idle_stream_gets_heartbeats(
+    async_client: AsyncClient, session: AsyncSession, broadcaster: EventBroadcaster
+):
+    user = await create_new_user(session)
+    headers = await authentication_token_from_email(async_client=async_client, session=session, email=user.email)
+
+    async with EventStream(app, EVENTS_PATH, headers) as stream:
+        assert await stream.read_message() == [("retry", "3000")]
+        assert await stream.read_message() == [("", "heartbeat")]
+
+
+async def test_stream_requires_authentication(async_client: AsyncClient):
+    response = await async_client.get(EVENTS_PATH)
+    assert response.status_code == 401
+
+
+async def test_stream_ends_when_token_expires(session: AsyncSession, broadcaster: EventBroadcaster):
+    user = await create_new_user(session)
+    token = create_access_token(data={"sub": str(user.id)}, expires_delta=timedelta(seconds=2))
+    expires_at = jwt_codec.decode(token)["exp"]
+
+    async with EventStream(app, EVENTS_PATH, {"Authorization": f"Bearer {token}"}) as stream:
+        assert stream.status == 200
+        await stream.wait_closed()
+        assert time.time() >= expires_at
+
+
+async def test_stream_ends_when_token_is_revoked(
+    async_client: AsyncClient, session: AsyncSession, broadcaster: EventBroadcaster
+):
+    user = await create_new_user(session)
+    headers = await authentication_token_from_email(async_client=async_client, session=session, email=user.email)
+
+    async with EventStream(app, EVENTS_PATH, headers) as stream:
+        assert await stream.read_message() == [("retry", "3000")]
+        response = await async_client.post("/api/v1/auth/logout", headers=headers)
+        assert response.status_code == 200
+        await stream.wait_closed(timeout=2)
+
+
+async def test_streams_are_not_measured_as_requests(
+    async_client: AsyncClient, session: AsyncSession, broadcaster: EventBroadcaster
+):
+    user = await create_new_user(session)
+    headers = await authentication_token_from_email(async_client=async_client, session=session, email=user.email)
+    labels = {"method": "GET", "route": EVENTS_PATH}
+    in_progress = REGISTRY.get_sample_value("http_requests_in_progress")
+    # Requests rejected before the stream starts are measured
+    measured = REGISTRY.get_sample_value("http_request_duration_seconds_count", labels)
+
+    async with EventStream(app, EVENTS_PATH, headers) as stream:
+        assert await stream.read_message() == [("retry", "3000")]
+        assert REGISTRY.get_sample_value("http_requests_in_progress") == in_progress
+
+    assert REGISTRY.get_sample_value("http_requests_in_progress") == in_progress
+    assert REGISTRY.get_sample_value("http_request_duration_seconds_count", labels) == measured
+    assert REGISTRY.get_sample_value("http_requests_total", {**labels, "status": "200"}) >= 1
+
+
+def test_notifications_are_not_listened_to_through_pgbouncer():
+    postgres = PostgresSettings(
+        _env_file=None,
+        POSTGRES_HOST="pgbouncer",
+        POSTGRES_PORT=6432,
+        POSTGRES_DB="db",
+        POSTGRES_USER="user",
+        POSTGRES_PASSWORD="pw",
+    )
+    pgbouncer = DatabaseSettings(_env_file=None, DB_PGBOUNCER=True)
+
+    assert listen_dsn(postgres, DatabaseSettings(_env_file=None)) == "postgresql://user:pw@pgbouncer:6432/db"
+    with pytest.raises(RuntimeError):
+        listen_dsn(postgres, pgbouncer)
+
+    postgres.direct_host = "primary"
+    assert listen_dsn(postgres, pgbouncer) == "postgresql://user:pw@primary:6432/db"
+
+
+async def test_missing_direct_host_fails_on_first_subscription():
+    postgres = PostgresSettings(
+        _env_file=None,
+        POSTGRES_HOST="pgbouncer",
+        POSTGRES_PORT=6432,
+        POSTGRES_DB="db",
+        POSTGRES_USER="user",
+        POSTGRES_PASSWORD="pw",
+    )
+    pgbouncer = DatabaseSettings(_env_file=None, DB_PGBOUNCER=True)
+    # Creating the broadcaster, i.e. importing the app, does not need the connection
+    broadcaster = EventBroadcaster(functools.partial(listen_dsn, postgres, pgbouncer))
+
+    with pytest.raises(RuntimeError, match="POSTGRES_DIRECT_HOST"):
+        await broadcaster.start()
@@ -1,6 +1,13 @@
+import pytest
 from httpx import AsyncClient
+from passlib.context import CryptContext
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from auth import security
+from auth.hashing import password_hasher
+from settings import settings
 from tests.typing_ import UserCredentials
+from tests.utils.user import create_new_user
 
 
 async def test_successful_login(async_client: AsyncClient, defalt_user_credentials: UserCredentials):
@@ -21,3 +28,74 @@ async def test_wrong_credentials_login(async_client: AsyncClient, defalt_user_cr
     )
     assert response.status_code == 401
     assert response.json() == {"detail": "Invalid credentials"}
+
+
+async def test_login_is_rejected_when_password_hasher_is_busy(
+    async_client: AsyncClient, defalt_user_credentials: UserCredentials, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setattr(password_hasher, "_capacity", password_hasher.pending)
+
+    response = await async_client.post(
+        "/api/v1/auth/login",
+        data={"username": defalt_user_credentials.email, "password": defalt_user_credentials.password},
+    )
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert response.json() == {"detail": "Server is busy, try again later"}
+
+
+@pytest.fixture
+def hash_policy(monkeypatch: pytest.MonkeyPatch):
+    """Switch the policy of new password hashes, cheap costs keep the tests fast"""
+
+    def switch(**policy) -> CryptContext:
+        context = security.create_password_context(settings.auth.model_copy(update=policy))
+        monkeypatch.setattr(security, "pwd_context", context)
+        return context
+
+    return switch
+
+
+async def login_with_hash(async_client: AsyncClient, session: AsyncSession, hashed_password: str, password: str):
+    user = await create_new_user(session)
+    user.hashed_password = hashed_password
+    await session.commit()
+
+    response = await async_client.post("/api/v1/auth/login", data={"username": user.email, "password": password})
+    await session.refresh(user)
+    return response, user
+
+
+async def test_login_rehashes_password_of_outdated_policy(
+    async_client: AsyncClient, session: AsyncSession, hash_policy
+):
+    old_hash = hash_policy(bcrypt_rounds=4).hash("password")
+    context = hash_policy(bcrypt_rounds=5)
+
+    response, user = await login_with_hash(async_client, session, old_hash, "password")
+    assert response.status_code == 200
+    assert user.hashed_password.startswith("$2b$05$")
+    assert context.verify("password", user.hashed_password)
+    assert not context.needs_update(user.hashed_password)
+
+
+async def test_login_migrates_bcrypt_hash_to_argon2(async_client: AsyncClient, session: AsyncSession, hash_policy):
+    pytest.importorskip("argon2")
+    old_hash = hash_policy(bcrypt_rounds=4).hash("password")
+    hash_policy(password_hash_scheme="argon2", argon2_time_cost=1, argon2_memory_cost=1024, argon2_parallelism=1)
+
+    response, user = await login_with_hash(async_client, session, old_hash, "password")
+    assert response.status_code == 200
+    assert user.hashed_password.startswith("$argon2id$v=19$m=1024,t=1,p=1$")
+
+    response = await async_client.post("/api/v1/auth/login", data={"username": user.email, "password": "password"})
+    assert response.status_code == 200
+
+
+async def test_failed_login_keeps_outdated_hash(async_client: AsyncClient, session: AsyncSession, hash_policy):
+    old_hash = hash_policy(bcrypt_rounds=4).hash("password")
+    hash_policy(bcrypt_rounds=5)
+
+    response, user = await login_with_hash(async_client, session, old_hash, "wrong_password")
+    assert response.status_code == 401
+    assert user.hashed_password == old_hash
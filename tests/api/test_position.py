@@ -1,10 +1,13 @@
 from calendar import c
 
 from httpx import AsyncClient
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 
+from models.associations.application import ApplicationStatus
+from tests.utils.application import create_new_application, set_status
 from tests.utils.position import create_new_position
 from tests.utils.project import create_new_project
+from tests.utils.queries import assert_num_queries
 from tests.utils.user import authentication_token_from_email, create_new_user
 
 
@@ -98,6 +101,32 @@ async def test_user_can_update_position(async_client: AsyncClient, session: Asyn
     assert content["count"] == new_data["count"]
 
 
+async def test_user_can_not_lower_count_below_approved_applications(async_client: AsyncClient, session: AsyncSession):
+    user = await create_new_user(session)
+    project = await create_new_project(session, user)
+    position = await create_new_position(session, project, count=3)
+    for _ in range(2):
+        await set_status(session, await create_new_application(session, position), ApplicationStatus.APPROVED)
+
+    token_headers = await authentication_token_from_email(
+        async_client=async_client,
+        session=session,
+        email=user.email,
+    )
+    new_data = {"name": position.name, "description": position.description}
+    response = await async_client.put(
+        f"/api/v1/positions/{position.id}", headers=token_headers, json={**new_data, "count": 1}
+    )
+    assert response.status_code == 409
+    assert response.json() == {"detail": "Count of the position is lower than the number of approved applications"}
+
+    response = await async_client.put(
+        f"/api/v1/positions/{position.id}", headers=token_headers, json={**new_data, "count": 2}
+    )
+    assert response.status_code == 200
+    assert response.json()["count"] == 2
+
+
 async def test_user_can_not_update_position_for_not_authored_project(
     async_client: AsyncClient,
     session: AsyncSession,
@@ -157,3 +186,60 @@ async def test_user_can_not_delete_position_for_not_authored_project(async_clien
     response = await async_client.delete(f"/api/v1/positions/{position.id}", headers=another_user_token_headers)
     assert response.status_code == 403
     assert response.json() == {"detail": "Access denied"}
+
+
+async def test_positions_are_paginated(async_client: AsyncClient, session: AsyncSession):
+    POSITIONS_COUNT = 3
+
+    user = await create_new_user(session)
+    project = await create_new_project(session, user)
+
+    for _ in range(POSITIONS_COUNT):
+        await create_new_position(session, project)
+
+    response = await async_client.get(f"/api/v1/projects/{project.id}/positions", params={"limit": 2})
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+
+    cursor = response.headers["X-Next-Cursor"]
+    response = await async_client.get(
+        f"/api/v1/projects/{project.id}/positions", params={"limit": 2, "cursor": cursor}
+    )
+    assert response.status_code == 200
+    assert len(response.json()) == 1
+    assert "X-Next-Cursor" not in response.headers
+
+
+async def test_new_position_invalidates_cached_positions(async_client: AsyncClient, session: AsyncSession):
+    project = await create_new_project(session)
+    await create_new_position(session, project)
+
+    response = await async_client.get(f"/api/v1/projects/{project.id}/positions")
+    assert len(response.json()) == 1
+    etag = response.headers["etag"]
+
+    response = await async_client.get(f"/api/v1/projects/{project.id}/positions", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    await create_new_position(session, project)
+
+    response = await async_client.get(f"/api/v1/projects/{project.id}/positions", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+
+
+async def test_delete_position_with_applications_takes_one_query(
+    async_client: AsyncClient, session: AsyncSession, engine: AsyncEngine
+):
+    user = await create_new_user(session)
+    project = await create_new_project(session, user)
+    position = await create_new_position(session, project)
+    await create_new_application(session, position)
+    token_headers = await authentication_token_from_email(async_client=async_client, session=session, email=user.email)
+
+    with assert_num_queries(engine, 1):
+        response = await async_client.delete(f"/api/v1/positions/{position.id}", headers=token_headers)
+    assert response.status_code == 200
+
+    response = await async_client.delete(f"/api/v1/positions/{position.id}", headers=token_headers)
+    assert response.status_code == 404
@@ -1,7 +1,17 @@
+import pytest
 from httpx import AsyncClient
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 
+from core.response_cache import CachedResponse, ResponseCache, response_cache
+from models.associations.application import ApplicationModel, ApplicationStatus
+from repositories.project_repository import ProjectRepository
+from services.project_service import project_cache_tag
+from tests.utils.application import create_new_application, set_status
+from tests.utils.cache import FakeSharedCacheBackend
+from tests.utils.position import create_new_position
 from tests.utils.project import create_new_project
+from tests.utils.queries import assert_num_queries
 from tests.utils.random_ import random_uuid
 from tests.utils.user import authentication_token_from_email, create_new_user
 
@@ -109,3 +119,177 @@ async def test_user_can_not_delete_project_that_is_not_authored_by_him(
     )
     assert response.status_code == 403
     assert response.json() == {"detail": "Access denied"}
+
+
+async def test_any_user_can_page_through_projects(async_client: AsyncClient, session: AsyncSession):
+    PROJECTS_COUNT = 5
+    PAGE_SIZE = 2
+
+    user = await create_new_user(session)
+    created_ids = [str((await create_new_project(session, user)).id) for _ in range(PROJECTS_COUNT)]
+
+    seen_ids = []
+    params = {"limit": PAGE_SIZE}
+    while True:
+        response = await async_client.get("/api/v1/projects/", params=params)
+        assert response.status_code == 200
+
+        content = response.json()
+        assert len(content) <= PAGE_SIZE
+        seen_ids.extend(project["id"] for project in content)
+
+        if "X-Next-Cursor" not in response.headers:
+            break
+        params["cursor"] = response.headers["X-Next-Cursor"]
+
+    # Newest projects come first and no project is returned twice
+    assert len(seen_ids) == len(set(seen_ids))
+    assert seen_ids[:PROJECTS_COUNT] == created_ids[::-1]
+
+
+async def test_projects_feed_rejects_invalid_cursor(async_client: AsyncClient):
+    response = await async_client.get("/api/v1/projects/", params={"cursor": "invalid"})
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Invalid cursor"}
+
+
+async def test_project_is_revalidated_with_etag(async_client: AsyncClient, session: AsyncSession):
+    project = await create_new_project(session)
+
+    response = await async_client.get(f"/api/v1/projects/{project.id}")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+
+    response = await async_client.get(f"/api/v1/projects/{project.id}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert response.content == b""
+
+
+async def test_project_update_invalidates_cache(async_client: AsyncClient, session: AsyncSession):
+    user = await create_new_user(session)
+    project = await create_new_project(session, user)
+    token_headers = await authentication_token_from_email(async_client=async_client, session=session, email=user.email)
+
+    response = await async_client.get(f"/api/v1/projects/{project.id}")
+    etag = response.headers["etag"]
+
+    new_data = {"name": "Renamed Project", "description": "New description of project", "difficulty": "hard"}
+    response = await async_client.put(f"/api/v1/projects/{project.id}", headers=token_headers, json=new_data)
+    assert response.status_code == 200
+
+    response = await async_client.get(f"/api/v1/projects/{project.id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert response.json()["name"] == new_data["name"]
+
+
+async def test_shared_cache_is_invalidated_for_all_workers(
+    async_client: AsyncClient, session: AsyncSession, monkeypatch: pytest.MonkeyPatch
+):
+    backend = FakeSharedCacheBackend()
+    monkeypatch.setattr(response_cache, "backend", backend)
+    other_worker = ResponseCache(backend)
+
+    user = await create_new_user(session)
+    project = await create_new_project(session, user)
+    token_headers = await authentication_token_from_email(async_client=async_client, session=session, email=user.email)
+
+    response = await async_client.get(f"/api/v1/projects/{project.id}")
+    assert response.status_code == 200
+    assert backend.data
+
+    async def load() -> CachedResponse:
+        raise AssertionError("Entry must be served from the shared cache")
+
+    cached = await other_worker.get_or_load(project_cache_tag(project.id), "", load)
+    assert cached.etag == response.headers["etag"]
+
+    new_data = {"name": "Renamed Project", "description": "New description of project", "difficulty": "hard"}
+    response = await async_client.put(f"/api/v1/projects/{project.id}", headers=token_headers, json=new_data)
+    assert response.status_code == 200
+
+    async def reload() -> CachedResponse:
+        return CachedResponse.from_body(b"{}")
+
+    cached = await other_worker.get_or_load(project_cache_tag(project.id), "", reload)
+    assert cached.body == b"{}"
+
+
+async def test_update_project_takes_two_queries(
+    async_client: AsyncClient, session: AsyncSession, engine: AsyncEngine
+):
+    user = await create_new_user(session)
+    project = await create_new_project(session, user)
+    token_headers = await authentication_token_from_email(async_client=async_client, session=session, email=user.email)
+
+    # The project is loaded for the ownership check and updated with a single UPDATE ... RETURNING
+    new_data = {"name": "Renamed Project", "description": "New description of project", "difficulty": "hard"}
+    with assert_num_queries(engine, 2):
+        response = await async_client.put(f"/api/v1/projects/{project.id}", headers=token_headers, json=new_data)
+    assert response.status_code == 200
+    assert response.json()["name"] == new_data["name"]
+
+
+async def test_update_rejects_unknown_columns(session: AsyncSession):
+    project = await create_new_project(session)
+
+    with pytest.raises(ValueError):
+        await ProjectRepository(session).update(project.id, {"owner": "someone"})
+
+
+async def test_delete_project_takes_one_query_and_cascades(
+    async_client: AsyncClient, session: AsyncSession, engine: AsyncEngine
+):
+    user = await create_new_user(session)
+    project = await create_new_project(session, user)
+    position = await create_new_position(session, project)
+    await create_new_application(session, position)
+    token_headers = await authentication_token_from_email(async_client=async_client, session=session, email=user.email)
+
+    with assert_num_queries(engine, 1):
+        response = await async_client.delete(f"/api/v1/projects/{project.id}", headers=token_headers)
+    assert response.status_code == 200
+
+    remaining = await session.scalar(
+        select(func.count()).select_from(ApplicationModel).filter_by(position_id=position.id)
+    )
+    assert remaining == 0
+
+
+async def test_user_can_not_delete_not_exist_project(async_client: AsyncClient, session: AsyncSession):
+    user = await create_new_user(session)
+    token_headers = await authentication_token_from_email(async_client=async_client, session=session, email=user.email)
+
+    response = await async_client.delete(f"/api/v1/projects/{random_uuid()}", headers=token_headers)
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Project not found"}
+
+
+@pytest.mark.parametrize("positions_count", (0, 1, 5))
+async def test_project_with_vacancies_takes_one_query(
+    async_client: AsyncClient, session: AsyncSession, engine: AsyncEngine, positions_count: int
+):
+    project = await create_new_project(session)
+    positions = [await create_new_position(session, project, count=2) for _ in range(positions_count)]
+    if positions:
+        await set_status(session, await create_new_application(session, positions[0]), ApplicationStatus.APPROVED)
+
+    with assert_num_queries(engine, 1):
+        response = await async_client.get(f"/api/v1/projects/{project.id}?include=positions,vacancies")
+    assert response.status_code == 200
+
+    content = response.json()
+    assert content["id"] == str(project.id)
+    assert len(content["positions"]) == positions_count
+    slots = {position["id"]: (position["approved_count"], position["free_slots"]) for position in content["positions"]}
+    for index, position in enumerate(positions):
+        assert slots[str(position.id)] == ((1, 1) if index == 0 else (0, 2))
+
+
+async def test_project_with_unknown_include(async_client: AsyncClient, session: AsyncSession):
+    project = await create_new_project(session)
+
+    response = await async_client.get(f"/api/v1/projects/{project.id}?include=positions,owner")
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Unknown include: owner"}
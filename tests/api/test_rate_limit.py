@@ -0,0 +1,114 @@
+from typing import AsyncGenerator, List
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from auth.hashing import password_hasher
+from core.rate_limit import LocalRateLimitBackend, RateLimit, RateLimiter, RateLimitPolicy, rate_limiter
+from main import app
+from tests.typing_ import UserCredentials
+from tests.utils.queries import assert_num_queries
+from tests.utils.random_ import random_email, random_lower_string
+
+LOGIN_PATH = "/api/v1/auth/login"
+SIGNUP_PATH = "/api/v1/auth/signup"
+
+
+@pytest.fixture(autouse=True)
+def limiter(monkeypatch: pytest.MonkeyPatch) -> None:
+    limiter = RateLimiter(
+        LocalRateLimitBackend(maxsize=1024),
+        [
+            RateLimitPolicy("login", "POST", LOGIN_PATH, RateLimit(3, 60), RateLimit(2, 60), "username"),
+            RateLimitPolicy("signup", "POST", SIGNUP_PATH, RateLimit(2, 60), None, "email"),
+        ],
+    )
+    monkeypatch.setattr(rate_limiter, "backend", limiter.backend)
+    monkeypatch.setattr(rate_limiter, "policies", limiter.policies)
+    monkeypatch.setattr(rate_limiter, "enabled", True)
+
+
+@pytest.fixture
+async def client_from() -> AsyncGenerator:
+    clients: List[AsyncClient] = []
+
+    def client_from(ip: str) -> AsyncClient:
+        client = AsyncClient(transport=ASGITransport(app, client=(ip, 12345)), base_url="http://test")
+        clients.append(client)
+        return client
+
+    yield client_from
+    for client in clients:
+        await client.aclose()
+
+
+@pytest.fixture
+def password_verifications(monkeypatch: pytest.MonkeyPatch) -> List[str]:
+    verified: List[str] = []
+    verify = password_hasher.verify
+
+    async def counting_verify(plain_password: str, hashed_password: str) -> bool:
+        verified.append(plain_password)
+        return await verify(plain_password, hashed_password)
+
+    monkeypatch.setattr(password_hasher, "verify", counting_verify)
+    return verified
+
+
+async def test_login_is_limited_per_ip_before_any_work(
+    client_from, engine: AsyncEngine, defalt_user_credentials: UserCredentials, password_verifications: List[str]
+):
+    client = client_from("10.0.0.1")
+    for _ in range(3):
+        response = await client.post(LOGIN_PATH, data={"username": random_email(), "password": "wrong_password"})
+        assert response.status_code == 401
+
+    with assert_num_queries(engine, 0):
+        response = await client.post(
+            LOGIN_PATH, data={"username": defalt_user_credentials.email, "password": "wrong_password"}
+        )
+    assert response.status_code == 429
+    assert response.json() == {"detail": "Too many requests"}
+    assert 1 <= int(response.headers["Retry-After"]) <= 20
+    assert password_verifications == []
+
+    response = await client_from("10.0.0.2").post(
+        LOGIN_PATH, data={"username": defalt_user_credentials.email, "password": defalt_user_credentials.password}
+    )
+    assert response.status_code == 200
+
+
+async def test_login_is_limited_per_account_across_ips(client_from, defalt_user_credentials: UserCredentials):
+    email = defalt_user_credentials.email
+    for ip in ("10.0.1.1", "10.0.1.2"):
+        response = await client_from(ip).post(LOGIN_PATH, data={"username": email, "password": "wrong_password"})
+        assert response.status_code == 401
+
+    # The account is matched case-insensitively, whatever the encoding of the form
+    response = await client_from("10.0.1.3").post(
+        LOGIN_PATH, files={"username": (None, email.upper()), "password": (None, "wrong_password")}
+    )
+    assert response.status_code == 429
+    # The bucket refills while the failed logins are verified
+    assert 28 <= int(response.headers["Retry-After"]) <= 30
+
+    response = await client_from("10.0.1.3").post(
+        LOGIN_PATH, data={"username": random_email(), "password": "wrong_password"}
+    )
+    assert response.status_code == 401
+
+
+async def test_signup_is_limited_per_ip(client_from):
+    client = client_from("10.0.2.1")
+    for _ in range(2):
+        signup_data = {"email": random_email(), "username": random_lower_string(), "password": random_lower_string()}
+        response = await client.post(SIGNUP_PATH, json=signup_data)
+        assert response.status_code == 200
+
+    signup_data = {"email": random_email(), "username": random_lower_string(), "password": random_lower_string()}
+    response = await client.post(SIGNUP_PATH, json=signup_data)
+    assert response.status_code == 429
+
+    response = await client_from("10.0.2.2").post(SIGNUP_PATH, json=signup_data)
+    assert response.status_code == 200
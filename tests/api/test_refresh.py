@@ -0,0 +1,100 @@
+from typing import Dict
+
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from auth.revocation import revocation_list
+from models import RefreshTokenModel
+from repositories.token_repository import TokenRepository
+from tests.utils.user import create_new_user, user_password
+
+
+async def login(async_client: AsyncClient, session: AsyncSession) -> Dict[str, str]:
+    user = await create_new_user(session)
+    response = await async_client.post(
+        "/api/v1/auth/login", data={"username": user.email, "password": user_password(user.email)}
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+def bearer(tokens: Dict[str, str]) -> Dict[str, str]:
+    return {"Authorization": f"Bearer {tokens['access_token']}"}
+
+
+async def test_login_issues_refresh_token(async_client: AsyncClient, session: AsyncSession):
+    tokens = await login(async_client, session)
+    assert tokens["refresh_token"]
+    assert tokens["expires_in"] > 0
+
+    response = await async_client.get("/api/v1/users/me", headers=bearer(tokens))
+    assert response.status_code == 200
+
+
+async def test_refresh_rotates_tokens(async_client: AsyncClient, session: AsyncSession):
+    tokens = await login(async_client, session)
+
+    response = await async_client.post("/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 200
+    refreshed = response.json()
+    assert refreshed["refresh_token"] != tokens["refresh_token"]
+    assert refreshed["access_token"] != tokens["access_token"]
+
+    response = await async_client.get("/api/v1/users/me", headers=bearer(refreshed))
+    assert response.status_code == 200
+
+
+async def test_unknown_refresh_token(async_client: AsyncClient):
+    response = await async_client.post("/api/v1/auth/refresh", json={"refresh_token": "unknown"})
+    assert response.status_code == 401
+    assert response.json() == {"detail": "Invalid refresh token"}
+
+
+async def test_reused_refresh_token_revokes_session(async_client: AsyncClient, session: AsyncSession):
+    tokens = await login(async_client, session)
+    response = await async_client.post("/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    refreshed = response.json()
+
+    # The first token is replayed by someone who has stolen it
+    response = await async_client.post("/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 401
+
+    response = await async_client.post("/api/v1/auth/refresh", json={"refresh_token": refreshed["refresh_token"]})
+    assert response.status_code == 401
+    for issued in (tokens, refreshed):
+        response = await async_client.get("/api/v1/users/me", headers=bearer(issued))
+        assert response.status_code == 401
+
+
+async def test_logout_revokes_tokens(async_client: AsyncClient, session: AsyncSession):
+    tokens = await login(async_client, session)
+    other_session = await async_client.post(
+        "/api/v1/auth/refresh", json={"refresh_token": (await login(async_client, session))["refresh_token"]}
+    )
+
+    response = await async_client.post("/api/v1/auth/logout", headers=bearer(tokens))
+    assert response.status_code == 200
+    assert response.json() is True
+
+    response = await async_client.get("/api/v1/users/me", headers=bearer(tokens))
+    assert response.status_code == 401
+    response = await async_client.post("/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 401
+    # Other sessions are not affected
+    response = await async_client.get("/api/v1/users/me", headers=bearer(other_session.json()))
+    assert response.status_code == 200
+
+
+async def test_revocation_by_another_worker_applies_after_sync(async_client: AsyncClient, session: AsyncSession):
+    tokens = await login(async_client, session)
+    response = await async_client.get("/api/v1/users/me", headers=bearer(tokens))
+    assert response.status_code == 200
+
+    # Revoked straight in the database, as another worker would, this worker learns of it from the table
+    token = await session.scalar(select(RefreshTokenModel).where(RefreshTokenModel.user_id == response.json()["id"]))
+    await TokenRepository(session).revoke_family(token.family_id)
+    await revocation_list.sync()
+
+    response = await async_client.get("/api/v1/users/me", headers=bearer(tokens))
+    assert response.status_code == 401
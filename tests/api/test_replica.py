@@ -0,0 +1,140 @@
+import asyncio
+from typing import AsyncGenerator
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from core.database import get_async_session, get_primary_session, session_router
+from core.response_cache import LocalCacheBackend, response_cache
+from core.routing import STICKY_COOKIE
+from main import app
+from tests.conftest import async_session_maker
+from tests.utils.application import create_new_application
+from tests.utils.position import create_new_position
+from tests.utils.project import create_new_project
+from tests.utils.replica import LaggingReplica
+from tests.utils.user import authentication_token_from_email, create_new_user
+
+
+@pytest.fixture
+async def replica(engine: AsyncEngine, monkeypatch: pytest.MonkeyPatch) -> AsyncGenerator[LaggingReplica, None]:
+    replica = LaggingReplica(engine)
+    monkeypatch.setattr(session_router, "primary", async_session_maker)
+    monkeypatch.setattr(session_router, "replica", replica.session_maker)
+    monkeypatch.delitem(app.dependency_overrides, get_async_session)
+    monkeypatch.delitem(app.dependency_overrides, get_primary_session)
+    yield replica
+    await replica.catch_up()
+
+
+@pytest.fixture
+async def writer() -> AsyncGenerator[AsyncClient, None]:
+    """Client of its own, keeping the cookies it gets"""
+    async with AsyncClient(transport=ASGITransport(app), base_url="http://test") as client:
+        yield client
+
+
+PROJECT_DATA = {"name": "Renamed", "description": "Description of the renamed project", "difficulty": "medium"}
+
+
+async def get_statuses(client: AsyncClient, position_id, headers) -> list:
+    response = await client.get(f"/api/v1/positions/{position_id}/applications", headers=headers)
+    assert response.status_code == 200
+    return [application["status"] for application in response.json()]
+
+
+async def test_reads_see_lagging_replica_and_writer_reads_own_writes(
+    async_client: AsyncClient, writer: AsyncClient, session: AsyncSession, replica: LaggingReplica
+):
+    project_owner = await create_new_user(session)
+    project = await create_new_project(session, project_owner)
+    position = await create_new_position(session, project)
+    application = await create_new_application(session, position)
+    headers = await authentication_token_from_email(async_client=writer, session=session, email=project_owner.email)
+    writer.cookies.clear()
+
+    await replica.freeze()
+    response = await writer.post(f"/api/v1/applications/{application.id}/approved", headers=headers)
+    assert response.status_code == 200
+    assert STICKY_COOKIE in response.cookies
+
+    assert await get_statuses(writer, position.id, headers) == ["APPROVED"]
+    async with AsyncClient(transport=ASGITransport(app), base_url="http://test") as other:
+        assert await get_statuses(other, position.id, headers) == ["PENDING"]
+
+    await replica.catch_up()
+    async with AsyncClient(transport=ASGITransport(app), base_url="http://test") as other:
+        assert await get_statuses(other, position.id, headers) == ["APPROVED"]
+
+
+async def test_reads_return_to_replica_after_stickiness_window(
+    writer: AsyncClient, session: AsyncSession, replica: LaggingReplica, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setattr(session_router, "stickiness", 0.5)
+    project_owner = await create_new_user(session)
+    project = await create_new_project(session, project_owner)
+    position = await create_new_position(session, project)
+    application = await create_new_application(session, position)
+    headers = await authentication_token_from_email(async_client=writer, session=session, email=project_owner.email)
+
+    await replica.freeze()
+    await writer.post(f"/api/v1/applications/{application.id}/rejected", headers=headers)
+    assert await get_statuses(writer, position.id, headers) == ["REJECTED"]
+
+    await asyncio.sleep(0.6)
+    assert await get_statuses(writer, position.id, headers) == ["PENDING"]
+
+
+async def test_failed_write_does_not_stick(
+    writer: AsyncClient, session: AsyncSession, replica: LaggingReplica, default_user_token_headers
+):
+    project = await create_new_project(session)
+
+    response = await writer.put(
+        f"/api/v1/projects/{project.id}", json=PROJECT_DATA, headers=default_user_token_headers
+    )
+    assert response.status_code == 403
+    assert STICKY_COOKIE not in response.cookies
+
+
+async def test_cached_reads_use_primary(writer: AsyncClient, session: AsyncSession, replica: LaggingReplica):
+    project_owner = await create_new_user(session)
+    project = await create_new_project(session, project_owner)
+    headers = await authentication_token_from_email(async_client=writer, session=session, email=project_owner.email)
+
+    await replica.freeze()
+    response = await writer.put(f"/api/v1/projects/{project.id}", json=PROJECT_DATA, headers=headers)
+    assert response.status_code == 200
+
+    # The write has invalidated the shared cache, the first read fills it again for everybody
+    async with AsyncClient(transport=ASGITransport(app), base_url="http://test") as other:
+        response = await other.get(f"/api/v1/projects/{project.id}")
+    assert response.json()["name"] == "Renamed"
+
+
+async def test_writer_reads_skip_cache_of_other_workers(
+    writer: AsyncClient, session: AsyncSession, replica: LaggingReplica, monkeypatch: pytest.MonkeyPatch
+):
+    # Each backend stands in for the local cache of one gunicorn worker
+    workers = [LocalCacheBackend(maxsize=64, ttl=30), LocalCacheBackend(maxsize=64, ttl=30)]
+    project_owner = await create_new_user(session)
+    project = await create_new_project(session, project_owner)
+    headers = await authentication_token_from_email(async_client=writer, session=session, email=project_owner.email)
+    writer.cookies.clear()
+
+    monkeypatch.setattr(response_cache, "backend", workers[0])
+    response = await writer.get(f"/api/v1/projects/{project.id}")
+    assert response.json()["name"] == project.name
+
+    monkeypatch.setattr(response_cache, "backend", workers[1])
+    response = await writer.put(f"/api/v1/projects/{project.id}", json=PROJECT_DATA, headers=headers)
+    assert response.status_code == 200
+
+    monkeypatch.setattr(response_cache, "backend", workers[0])
+    response = await writer.get(f"/api/v1/projects/{project.id}")
+    assert response.json()["name"] == "Renamed"
+    # The fresh read has replaced the stale entry in the cache of this worker
+    async with AsyncClient(transport=ASGITransport(app), base_url="http://test") as other:
+        response = await other.get(f"/api/v1/projects/{project.id}")
+    assert response.json()["name"] == "Renamed"
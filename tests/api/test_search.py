@@ -0,0 +1,142 @@
+from typing import Optional
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.project import ProjectModel
+from repositories import project_repository
+from schemas.project import ProjectCreateSchema
+from services.project_service import ProjectService
+from tests.utils.position import create_new_position
+from tests.utils.random_ import random_lower_string
+from tests.utils.user import create_new_user
+
+
+async def create_project(
+    session: AsyncSession, name: str, description: str = "Description of project", difficulty: str = "easy"
+) -> ProjectModel:
+    owner = await create_new_user(session)
+    return await ProjectService(session).create(
+        ProjectCreateSchema(name=name, description=description, difficulty=difficulty),
+        str(owner.id),
+    )
+
+
+async def search(async_client: AsyncClient, cursor: Optional[str] = None, **params):
+    if cursor:
+        params["cursor"] = cursor
+    response = await async_client.get("/api/v1/search/projects", params=params)
+    assert response.status_code == 200
+    return response.json(), response.headers.get("X-Next-Cursor")
+
+
+async def test_search_ranks_name_matches_first(async_client: AsyncClient, session: AsyncSession):
+    word = random_lower_string()
+    in_description = await create_project(session, "Some project", description=f"Built around {word}")
+    in_name = await create_project(session, f"{word} platform")
+    await create_project(session, "Unrelated project")
+
+    content, next_cursor = await search(async_client, q=word)
+    assert [item["id"] for item in content["items"]] == [str(in_name.id), str(in_description.id)]
+    assert next_cursor is None
+
+
+async def test_search_facets_ignore_difficulty_filter(async_client: AsyncClient, session: AsyncSession):
+    word = random_lower_string()
+    await create_project(session, f"{word} one", difficulty="easy")
+    await create_project(session, f"{word} two", difficulty="easy")
+    hard = await create_project(session, f"{word} three", difficulty="hard")
+
+    content, _ = await search(async_client, q=word, difficulty="hard")
+    assert [item["id"] for item in content["items"]] == [str(hard.id)]
+    assert content["difficulty_facets"] == {"easy": 2, "medium": 0, "hard": 1}
+    assert content["difficulty_facets_truncated"] is False
+
+
+async def test_search_facets_are_capped(
+    async_client: AsyncClient, session: AsyncSession, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setattr(project_repository, "SEARCH_FACETS_LIMIT", 2)
+    word = random_lower_string()
+    for i in range(3):
+        await create_project(session, f"{word} {i}", difficulty="medium")
+
+    content, _ = await search(async_client, q=word)
+    assert len(content["items"]) == 3
+    assert content["difficulty_facets"] == {"easy": 0, "medium": 2, "hard": 0}
+    assert content["difficulty_facets_truncated"] is True
+
+
+async def test_search_by_vacancies(async_client: AsyncClient, session: AsyncSession):
+    word = random_lower_string()
+    with_vacancy = await create_project(session, f"{word} hiring")
+    await create_new_position(session, with_vacancy)
+    without_positions = await create_project(session, f"{word} solo")
+
+    content, _ = await search(async_client, q=word, has_vacancies="true")
+    assert [item["id"] for item in content["items"]] == [str(with_vacancy.id)]
+
+    content, _ = await search(async_client, q=word, has_vacancies="false")
+    assert [item["id"] for item in content["items"]] == [str(without_positions.id)]
+
+
+async def test_search_by_vacancies_follows_positions(async_client: AsyncClient, session: AsyncSession):
+    word = random_lower_string()
+    project = await create_project(session, f"{word} hiring")
+    position = await create_new_position(session, project, count=2)
+
+    position.approved_count = 2
+    await session.commit()
+    content, _ = await search(async_client, q=word, has_vacancies="true")
+    assert content["items"] == []
+
+    position.count = 3
+    await session.commit()
+    content, _ = await search(async_client, q=word, has_vacancies="true")
+    assert [item["id"] for item in content["items"]] == [str(project.id)]
+
+    await session.delete(position)
+    await session.commit()
+    content, _ = await search(async_client, q=word, has_vacancies="false")
+    assert [item["id"] for item in content["items"]] == [str(project.id)]
+
+
+async def test_search_results_are_paginated(async_client: AsyncClient, session: AsyncSession):
+    PROJECTS_COUNT = 5
+
+    word = random_lower_string()
+    created_ids = {str((await create_project(session, f"{word} {i}")).id) for i in range(PROJECTS_COUNT)}
+
+    seen, cursor = [], None
+    for _ in range(PROJECTS_COUNT):
+        content, cursor = await search(async_client, q=word, limit=2, cursor=cursor)
+        seen.extend(item["id"] for item in content["items"])
+        if cursor is None:
+            break
+
+    assert len(seen) == PROJECTS_COUNT
+    assert set(seen) == created_ids
+
+
+async def test_search_with_invalid_cursor(async_client: AsyncClient):
+    response = await async_client.get("/api/v1/search/projects", params={"q": "project", "cursor": "garbage"})
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Invalid cursor"}
+
+
+async def test_search_pages_through_both_tiers(async_client: AsyncClient, session: AsyncSession):
+    word = random_lower_string()
+    in_description = [await create_project(session, f"Project {i}", description=f"About {word}") for i in range(3)]
+    in_name = [await create_project(session, f"{word} {i}") for i in range(3)]
+    # Name matches first, each tier newest first
+    expected = [str(project.id) for project in in_name[::-1] + in_description[::-1]]
+
+    seen, cursor = [], None
+    for _ in range(len(expected)):
+        content, cursor = await search(async_client, q=word, limit=2, cursor=cursor)
+        seen.extend(item["id"] for item in content["items"])
+        if cursor is None:
+            break
+
+    assert seen == expected
@@ -1,10 +1,15 @@
 from typing import Dict
 
 import pytest
+from fastapi import HTTPException
 from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from models import UserModel
+from services.user_service import UserService
 from tests.typing_ import UserCredentials
+from tests.utils.application import create_new_application
+from tests.utils.random_ import random_lower_string
 from tests.utils.user import authentication_token_from_email, create_new_user
 
 
@@ -29,3 +34,75 @@ async def test_update_me(async_client: AsyncClient, session: AsyncSession):
 
     content = response.json()
     assert content["username"] == new_username
+
+
+async def test_get_me_reflects_update(async_client: AsyncClient, session: AsyncSession):
+    user = await create_new_user(session)
+    token_headers = await authentication_token_from_email(async_client=async_client, session=session, email=user.email)
+
+    # Warm up the cache of current users
+    response = await async_client.get("/api/v1/users/me", headers=token_headers)
+    assert response.status_code == 200
+
+    new_username = random_lower_string()
+    response = await async_client.put("/api/v1/users/me", headers=token_headers, json={"username": new_username})
+    assert response.status_code == 200
+
+    response = await async_client.get("/api/v1/users/me", headers=token_headers)
+    assert response.status_code == 200
+    assert response.json()["username"] == new_username
+
+
+async def test_current_user_is_cached(async_client: AsyncClient, default_user_token_headers: Dict[str, str]):
+    response = await async_client.get("/api/v1/users/me", headers=default_user_token_headers)
+    assert response.status_code == 200
+
+    hits_before = (await async_client.get("/api/stats")).json()["current_user_cache"]["hits"]
+
+    response = await async_client.get("/api/v1/users/me", headers=default_user_token_headers)
+    assert response.status_code == 200
+
+    hits_after = (await async_client.get("/api/stats")).json()["current_user_cache"]["hits"]
+    assert hits_after == hits_before + 1
+
+
+async def test_user_update_invalidates_cached_user(async_client: AsyncClient, session: AsyncSession):
+    user = await create_new_user(session)
+    token_headers = await authentication_token_from_email(async_client=async_client, session=session, email=user.email)
+
+    response = await async_client.get(f"/api/v1/users/{user.id}")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+
+    response = await async_client.get(f"/api/v1/users/{user.id}", headers={"If-None-Match": f"W/{etag}"})
+    assert response.status_code == 304
+
+    new_username = random_lower_string()
+    response = await async_client.put("/api/v1/users/me", headers=token_headers, json={"username": new_username})
+    assert response.status_code == 200
+
+    response = await async_client.get(f"/api/v1/users/{user.id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["username"] == new_username
+
+
+async def test_delete_user(session: AsyncSession):
+    user = await create_new_user(session)
+    user_service = UserService(session)
+
+    assert await user_service.delete(user.id)
+    with pytest.raises(HTTPException) as exc_info:
+        await user_service.delete(user.id)
+    assert exc_info.value.status_code == 404
+
+
+async def test_delete_user_with_applications(session: AsyncSession):
+    user = await create_new_user(session)
+    await create_new_application(session, user=user)
+    user_id = user.id
+    user_service = UserService(session)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await user_service.delete(user_id)
+    assert exc_info.value.status_code == 409
+    assert await session.get(UserModel, user_id) is not None
@@ -0,0 +1,31 @@
+from passlib.context import CryptContext
+
+from auth.calibrate import calibrate_argon2, calibrate_bcrypt
+
+
+def bcrypt_timing(context: CryptContext) -> float:
+    # 2 ** rounds iterations, 100 ms at 12 rounds
+    return 0.1 * 2 ** (context.to_dict()["bcrypt__rounds"] - 12)
+
+
+def test_calibrate_bcrypt_picks_highest_rounds_within_target():
+    best, timings = calibrate_bcrypt(0.25, bcrypt_timing)
+    assert best == {"PASSWORD_BCRYPT_ROUNDS": 13}
+    assert [rounds for rounds, _ in timings] == [10, 11, 12, 13, 14]
+
+    best, _ = calibrate_bcrypt(0.01, bcrypt_timing)
+    assert best is None
+
+
+def test_calibrate_argon2_halves_memory_when_single_pass_is_too_slow():
+    def argon2_timing(context: CryptContext) -> float:
+        policy = context.to_dict()
+        return policy["argon2__memory_cost"] / 65536 * 0.12 * policy["argon2__rounds"]
+
+    best, timings = calibrate_argon2(0.1, argon2_timing, memory_cost=65536, parallelism=4)
+    assert best == {
+        "PASSWORD_ARGON2_TIME_COST": 1,
+        "PASSWORD_ARGON2_MEMORY_COST": 32768,
+        "PASSWORD_ARGON2_PARALLELISM": 4,
+    }
+    assert [(memory_cost, time_cost) for memory_cost, time_cost, _ in timings] == [(65536, 1), (32768, 1), (32768, 2)]
@@ -0,0 +1,111 @@
+import time
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+
+from auth.jwt_codecs import EdDSACodec, HMACCodec, InvalidTokenError, JoseCodec, JWTCodec
+from auth.security import create_jwt_codec
+from settings import settings
+
+SECRET = "test-secret"
+
+
+def eddsa_codec() -> EdDSACodec:
+    return EdDSACodec(Ed25519PrivateKey.generate())
+
+
+def jose_es256_codec() -> JoseCodec:
+    private_key = ec.generate_private_key(ec.SECP256R1())
+    pem = private_key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    )
+    return JoseCodec("ES256", pem.decode())
+
+
+CODECS = {
+    "jose": lambda: JoseCodec("HS256", SECRET),
+    "jose-es256": jose_es256_codec,
+    "hmac": lambda: HMACCodec("HS256", SECRET),
+    "eddsa": eddsa_codec,
+}
+
+
+@pytest.fixture(params=list(CODECS))
+def codec(request: pytest.FixtureRequest) -> JWTCodec:
+    return CODECS[request.param]()
+
+
+def test_round_trip(codec: JWTCodec):
+    claims = {"sub": "user", "jti": "token", "exp": int(time.time()) + 60}
+    assert codec.decode(codec.encode(claims)) == claims
+
+
+@pytest.mark.parametrize("claim,offset", [("exp", -1), ("nbf", 60)], ids=["expired", "not-yet-valid"])
+def test_rejects_tokens_outside_validity(codec: JWTCodec, claim: str, offset: int):
+    with pytest.raises(InvalidTokenError):
+        codec.decode(codec.encode({"sub": "user", claim: int(time.time()) + offset}))
+
+
+def test_rejects_tampered_tokens(codec: JWTCodec):
+    header, payload, signature = codec.encode({"sub": "user"}).split(".")
+    forged_payload = HMACCodec("HS256", SECRET).encode({"sub": "admin"}).split(".")[1]
+
+    for token in (f"{header}.{forged_payload}.{signature}", f"{header}.{payload}.", "invalid", ""):
+        with pytest.raises(InvalidTokenError):
+            codec.decode(token)
+
+
+def test_rejects_other_algorithms():
+    hs512 = HMACCodec("HS512", SECRET).encode({"sub": "user"})
+    with pytest.raises(InvalidTokenError):
+        HMACCodec("HS256", SECRET).decode(hs512)
+    # The secret of a symmetric algorithm must not be accepted in place of a key pair
+    with pytest.raises(InvalidTokenError):
+        eddsa_codec().decode(HMACCodec("HS256", SECRET).encode({"sub": "user"}))
+
+
+def test_hmac_codec_is_interchangeable_with_jose():
+    jose, hmac = JoseCodec("HS256", SECRET), HMACCodec("HS256", SECRET)
+    claims = {"sub": "user", "exp": int(time.time()) + 60}
+    assert jose.encode(claims) == hmac.encode(claims)
+    assert hmac.decode(jose.encode(claims)) == jose.decode(hmac.encode(claims)) == claims
+
+
+def test_eddsa_tokens_are_verified_with_the_public_key_alone():
+    private_key = Ed25519PrivateKey.generate()
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    )
+    verifier = EdDSACodec.from_pem(public_pem=public_pem)
+
+    token = EdDSACodec.from_pem(private_pem).encode({"sub": "user"})
+    assert verifier.decode(token) == {"sub": "user"}
+    with pytest.raises(RuntimeError):
+        verifier.encode({"sub": "user"})
+
+
+def test_create_jwt_codec(tmp_path):
+    key_file = tmp_path / "jwt.pem"
+    key_file.write_bytes(
+        Ed25519PrivateKey.generate().private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+        )
+    )
+
+    def create(**config) -> JWTCodec:
+        return create_jwt_codec(settings.auth.model_copy(update={"secret_key": SECRET, **config}))
+
+    assert isinstance(create(jwt_codec="jose", algorithm="HS256"), JoseCodec)
+    assert isinstance(create(jwt_codec="native", algorithm="HS384"), HMACCodec)
+    assert isinstance(create(jwt_codec="native", algorithm="EdDSA", jwt_private_key_file=str(key_file)), EdDSACodec)
+    with pytest.raises(ValueError):
+        create(jwt_codec="jose", algorithm="EdDSA", jwt_private_key_file=str(key_file))
+    with pytest.raises(ValueError):
+        create(jwt_codec="native", algorithm="EdDSA")
+    with pytest.raises(ValueError):
+        create(jwt_codec="native", algorithm="RS256")
@@ -0,0 +1,60 @@
+import datetime
+from uuid import uuid4
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from auth.revocation import BloomFilter, RevocationList, token_id
+from models import TokenRevocationModel
+from tests.conftest import async_session_maker
+
+
+def test_bloom_filter_has_no_false_negatives_and_bounded_false_positives():
+    bloom = BloomFilter(capacity=10_000, error_rate=0.01)
+    added = [uuid4() for _ in range(10_000)]
+    for jti in added:
+        bloom.add(jti)
+
+    assert all(jti in bloom for jti in added)
+    false_positives = sum(uuid4() in bloom for _ in range(20_000))
+    assert false_positives < 20_000 * 0.02
+
+
+def test_token_id_of_foreign_jti_is_stable():
+    jti = uuid4()
+    assert token_id(str(jti)) == jti
+    assert token_id("not-a-uuid") == token_id("not-a-uuid") != token_id("other")
+
+
+async def test_filter_hits_are_confirmed_by_database(session: AsyncSession):
+    revocations = RevocationList(lambda: async_session_maker, sync_interval=3600)
+    revoked, false_positive = uuid4(), uuid4()
+    session.add(
+        TokenRevocationModel(
+            jti=revoked, expires_at=datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(minutes=5)
+        )
+    )
+    await session.commit()
+
+    await revocations.sync()
+    revocations.add([false_positive])
+
+    assert await revocations.is_revoked(revoked)
+    assert not await revocations.is_revoked(false_positive)
+    assert not await revocations.is_revoked(uuid4())
+
+
+async def test_rebuild_drops_expired_revocations(session: AsyncSession):
+    revocations = RevocationList(lambda: async_session_maker, sync_interval=0, rebuild_interval=3600)
+    expired = uuid4()
+    session.add(
+        TokenRevocationModel(
+            jti=expired, expires_at=datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(minutes=5)
+        )
+    )
+    await session.commit()
+
+    await revocations.sync()
+    assert not await revocations.is_revoked(expired)
+    remaining = await session.scalar(select(func.count()).where(TokenRevocationModel.jti == expired))
+    assert remaining == 0
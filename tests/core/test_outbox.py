@@ -0,0 +1,116 @@
+import asyncio
+from datetime import timedelta
+from typing import List
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from core.outbox import OutboxDispatcher, OutboxSink, WebhookSink, backoff
+from models import OutboxEventModel
+from tests.utils.application import create_new_application
+from tests.utils.outbox import clear_outbox, get_application_events
+from tests.utils.webhook import WebhookStub
+
+
+class SlowSink(OutboxSink):
+    name = "slow"
+
+    def __init__(self):
+        self.delivered: List[str] = []
+
+    async def deliver(self, event: OutboxEventModel) -> None:
+        await asyncio.sleep(0.01)
+        self.delivered.append(str(event.id))
+
+
+@pytest.fixture
+def session_maker(engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(engine, expire_on_commit=False)
+
+
+@pytest.fixture(autouse=True)
+async def empty_outbox(session: AsyncSession):
+    await clear_outbox(session)
+
+
+async def test_dispatcher_delivers_events_to_webhook(session: AsyncSession, session_maker):
+    application = await create_new_application(session)
+
+    async with WebhookStub() as stub:
+        sink = WebhookSink(stub.url, timeout=5)
+        try:
+            assert await OutboxDispatcher(session_maker, [sink]).dispatch_batch() == 1
+        finally:
+            await sink.close()
+
+    [(_, headers, body)] = stub.requests
+    assert body["type"] == headers["x-event-type"] == "application.created"
+    assert body["id"] == headers["x-event-id"]
+    assert body["payload"]["application_id"] == str(application.id)
+    assert body["payload"]["status"] == "PENDING"
+    # Delivered events are removed from the outbox
+    assert await get_application_events(session, application.id) == []
+
+
+async def test_failed_delivery_is_retried_later(session: AsyncSession, session_maker):
+    application = await create_new_application(session)
+
+    async with WebhookStub(500) as stub:
+        sink = WebhookSink(stub.url, timeout=5)
+        dispatcher = OutboxDispatcher(session_maker, [sink], backoff_base=60)
+        try:
+            assert await dispatcher.dispatch_batch() == 1
+            # The event is not due until the backoff has passed
+            assert await dispatcher.dispatch_batch() == 0
+        finally:
+            await sink.close()
+
+    [event] = await get_application_events(session, application.id)
+    assert event.attempts == 1
+    assert "500" in event.last_error
+    assert event.dead_at is None
+    assert event.available_at - event.created_at >= timedelta(seconds=30)
+
+
+async def test_event_is_dead_after_max_attempts(session: AsyncSession, session_maker):
+    application = await create_new_application(session)
+
+    async with WebhookStub(503, 503) as stub:
+        sink = WebhookSink(stub.url, timeout=5)
+        dispatcher = OutboxDispatcher(session_maker, [sink], max_attempts=2, backoff_base=0.001, backoff_max=0.001)
+        try:
+            assert await dispatcher.dispatch_batch() == 1
+            await asyncio.sleep(0.01)
+            assert await dispatcher.dispatch_batch() == 1
+            assert await dispatcher.dispatch_batch() == 0
+        finally:
+            await sink.close()
+
+    assert len(stub.requests) == 2
+    [event] = await get_application_events(session, application.id)
+    assert event.attempts == 2
+    assert event.dead_at is not None
+
+
+async def test_concurrent_dispatchers_deliver_every_event_once(session: AsyncSession, session_maker):
+    for _ in range(12):
+        await create_new_application(session)
+
+    sink = SlowSink()
+    dispatchers = [OutboxDispatcher(session_maker, [sink], batch_size=4) for _ in range(3)]
+
+    async def drain(dispatcher: OutboxDispatcher) -> None:
+        while await dispatcher.dispatch_batch():
+            pass
+
+    await asyncio.gather(*(drain(dispatcher) for dispatcher in dispatchers))
+
+    assert len(sink.delivered) == len(set(sink.delivered)) == 12
+    assert await session.scalar(select(func.count()).select_from(OutboxEventModel)) == 0
+
+
+def test_backoff_grows_exponentially_up_to_maximum():
+    assert 0.5 <= backoff(1, base=1, maximum=300) <= 1
+    assert 4 <= backoff(4, base=1, maximum=300) <= 8
+    assert 150 <= backoff(20, base=1, maximum=300) <= 300
@@ -0,0 +1,78 @@
+import asyncio
+import multiprocessing
+
+import pytest
+
+from core.rate_limit import LocalRateLimitBackend, RateLimit, SharedRateLimitBackend, create_backend
+from settings import RateLimitSettings
+
+
+def test_parse_rate_limit():
+    assert RateLimit.parse("10/minute") == RateLimit(10, 60)
+    assert RateLimit.parse("5/30") == RateLimit(5, 30)
+    assert RateLimit.parse("") is None
+    assert RateLimit.parse("0/second") is None
+    with pytest.raises(ValueError):
+        RateLimit.parse("10 per minute")
+
+
+def test_buckets_are_shared_by_default(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.delenv("RATE_LIMIT_BACKEND", raising=False)
+    config = RateLimitSettings(_env_file=None)
+    assert isinstance(create_backend(config), SharedRateLimitBackend)
+
+
+@pytest.mark.parametrize("backend_name", ["local", "shared"])
+async def test_bucket_allows_burst_and_refills(backend_name: str, tmp_path):
+    if backend_name == "local":
+        backend = LocalRateLimitBackend(maxsize=16)
+    else:
+        backend = SharedRateLimitBackend(str(tmp_path / "buckets"), slots=16)
+    limit = RateLimit(3, 0.3)
+
+    assert [await backend.acquire("key", limit) for _ in range(3)] == [0, 0, 0]
+    wait = await backend.acquire("key", limit)
+    assert 0 < wait <= 0.1
+    assert await backend.acquire("other", limit) == 0
+
+    await asyncio.sleep(wait + 0.01)
+    assert await backend.acquire("key", limit) == 0
+    assert await backend.acquire("key", limit) > 0
+
+
+def _acquire_many(backend: SharedRateLimitBackend, attempts: int, allowed) -> None:
+    async def acquire() -> int:
+        return sum([await backend.acquire("key", RateLimit(50, 3600)) == 0 for _ in range(attempts)])
+
+    with allowed.get_lock():
+        allowed.value += asyncio.run(acquire())
+
+
+def test_shared_buckets_are_shared_by_forked_workers(tmp_path):
+    backend = SharedRateLimitBackend(str(tmp_path / "buckets"), slots=16)
+    # Opened by the parent before the fork, like a backend imported by the gunicorn master
+    assert asyncio.run(backend.acquire("key", RateLimit(50, 3600))) == 0
+
+    context = multiprocessing.get_context("fork")
+    allowed = context.Value("i", 0)
+    workers = [context.Process(target=_acquire_many, args=(backend, 40, allowed)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=30)
+        assert worker.exitcode == 0
+
+    assert allowed.value == 49
+
+
+def test_shared_backend_reuses_least_recently_updated_slot(tmp_path):
+    backend = SharedRateLimitBackend(str(tmp_path / "buckets"), slots=SharedRateLimitBackend.PROBES)
+    limit = RateLimit(1, 3600)
+
+    async def fill() -> None:
+        for index in range(SharedRateLimitBackend.PROBES + 1):
+            assert await backend.acquire(f"key-{index}", limit) == 0
+
+    # With every slot taken the first key is evicted and gets a full bucket again
+    asyncio.run(fill())
+    assert asyncio.run(backend.acquire("key-0", limit)) == 0
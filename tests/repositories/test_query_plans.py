@@ -0,0 +1,304 @@
+import functools
+import importlib
+import inspect
+import pkgutil
+from datetime import datetime, timedelta, timezone
+from typing import Set, Tuple
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import UniqueConstraint, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+import repositories
+from core.database import metadata
+from models import (
+    OutboxEventModel,
+    PositionModel,
+    ProjectModel,
+    RefreshTokenModel,
+    TokenRevocationModel,
+    UserModel,
+)
+from models.associations.application import ApplicationModel, ApplicationStatus
+from models.project import Difficulty
+from repositories.access_repository import AccessRepository
+from repositories.application_repository import ApplicationRepository
+from repositories.outbox_repository import OutboxRepository
+from repositories.position_repository import PositionRepository
+from repositories.project_repository import ProjectRepository
+from repositories.token_repository import TokenRepository
+from repositories.user_repository import UserRepository
+from repositories.utils.pagination import decode_cursor
+from schemas.application import ApplicationCreateSchema
+from schemas.project import ProjectCreateSchema
+from schemas.search import ProjectSearchParams
+from schemas.user import UserCreateSchema
+from tests.utils.explain import find_seq_scans
+from tests.utils.queries import capture_queries
+from tests.utils.random_ import random_lower_string
+
+USERS_COUNT = 2_000
+PROJECTS_COUNT = 2_000
+POSITIONS_COUNT = 5_000
+APPLICATIONS_COUNT = 10_000
+TOKENS_COUNT = 2_000
+EVENTS_COUNT = 2_000
+
+# Sequential scans are fine for tables smaller than this
+MIN_ROWS = 1_000
+
+
+def test_foreign_keys_are_indexed():
+    # Without an index on the referencing columns, deleting a referenced row scans the whole referencing table
+    failures = []
+    for table in metadata.sorted_tables:
+        leading_columns = [list(index.columns.keys()) for index in table.indexes]
+        leading_columns += [
+            list(constraint.columns.keys())
+            for constraint in table.constraints
+            if isinstance(constraint, UniqueConstraint) or constraint is table.primary_key
+        ]
+        for foreign_key in table.foreign_key_constraints:
+            columns = list(foreign_key.columns.keys())
+            if not any(indexed[: len(columns)] == columns for indexed in leading_columns):
+                failures.append(f"{table.name}({', '.join(columns)})")
+
+    assert not failures, f"Foreign keys without an index: {', '.join(failures)}"
+
+
+@pytest.fixture
+async def seeded_connection(engine: AsyncEngine):
+    """Connection to the database seeded with production-like volumes. Everything is rolled back afterwards."""
+    async with engine.connect() as connection:
+        transaction = await connection.begin()
+        now = datetime.utcnow()
+
+        users = [
+            {"id": uuid4(), "email": f"{i}@seed", "username": f"seed-{i}", "hashed_password": "-"}
+            for i in range(USERS_COUNT)
+        ]
+        projects = [
+            {
+                "id": uuid4(),
+                "name": f"Project {i}",
+                "description": "Seeded project",
+                "difficulty": Difficulty.EASY,
+                "owner_id": users[i % USERS_COUNT]["id"],
+                "created_at": now - timedelta(seconds=i),
+            }
+            for i in range(PROJECTS_COUNT)
+        ]
+        positions = [
+            {"id": uuid4(), "name": f"Position {i}", "count": 3, "project_id": projects[i % PROJECTS_COUNT]["id"]}
+            for i in range(POSITIONS_COUNT)
+        ]
+        applications = [
+            {
+                "id": uuid4(),
+                "user_id": users[(i // POSITIONS_COUNT) % USERS_COUNT]["id"],
+                "position_id": positions[i % POSITIONS_COUNT]["id"],
+                "message": "Seeded application",
+                "status": list(ApplicationStatus)[i % len(ApplicationStatus)],
+            }
+            for i in range(APPLICATIONS_COUNT)
+        ]
+
+        refresh_tokens = [
+            {
+                "id": uuid4(),
+                "user_id": users[i % USERS_COUNT]["id"],
+                "family_id": uuid4(),
+                "token_hash": f"seed-{i}",
+                "access_jti": uuid4(),
+                "access_expires_at": now + timedelta(minutes=5),
+                "expires_at": now + timedelta(days=i % 30 - 1),
+            }
+            for i in range(TOKENS_COUNT)
+        ]
+        revocations = [
+            {"jti": uuid4(), "expires_at": now + timedelta(minutes=i % 30 - 1)} for i in range(TOKENS_COUNT)
+        ]
+        events = [
+            {"event_type": "seed", "payload": {"i": i}, "available_at": now + timedelta(minutes=i % 30 - 1)}
+            for i in range(EVENTS_COUNT)
+        ]
+
+        await connection.execute(insert(UserModel), users)
+        await connection.execute(insert(ProjectModel), projects)
+        await connection.execute(insert(PositionModel), positions)
+        await connection.execute(insert(ApplicationModel), applications)
+        await connection.execute(insert(RefreshTokenModel), refresh_tokens)
+        await connection.execute(insert(TokenRevocationModel), revocations)
+        await connection.execute(insert(OutboxEventModel), events)
+        await connection.execute(
+            text("ANALYZE users, projects, positions, applications, refresh_tokens, token_revocations, outbox_events")
+        )
+        # New entries of GIN indexes wait in a pending list until a vacuum, which cannot run in a transaction
+        await connection.execute(
+            text(
+                "SELECT gin_clean_pending_list(pg_class.oid) FROM pg_class JOIN pg_am ON pg_am.oid = pg_class.relam "
+                "WHERE pg_am.amname = 'gin'"
+            )
+        )
+
+        yield connection
+
+        await transaction.rollback()
+
+
+def _repository_methods() -> Set[Tuple[type, str]]:
+    """Public methods of every repository class, keyed by the class that defines them"""
+    methods = set()
+    for module_info in pkgutil.iter_modules(repositories.__path__):
+        module = importlib.import_module(f"{repositories.__name__}.{module_info.name}")
+        for cls in vars(module).values():
+            is_repository = isinstance(cls, type) and cls.__name__.endswith("Repository")
+            if not is_repository or cls.__module__ != module.__name__:
+                continue
+            for name, _ in inspect.getmembers(cls, inspect.iscoroutinefunction):
+                if not name.startswith("_"):
+                    methods.add((next(base for base in cls.__mro__ if name in vars(base)), name))
+    return methods
+
+
+def _record_calls(monkeypatch: pytest.MonkeyPatch, methods: Set[Tuple[type, str]]) -> Set[Tuple[type, str]]:
+    called: Set[Tuple[type, str]] = set()
+
+    def recording(key: Tuple[type, str]):
+        method = vars(key[0])[key[1]]
+
+        @functools.wraps(method)
+        async def wrapper(*args, **kwargs):
+            called.add(key)
+            return await method(*args, **kwargs)
+
+        return wrapper
+
+    for key in methods:
+        monkeypatch.setattr(key[0], key[1], recording(key))
+    return called
+
+
+async def test_repository_queries_do_not_scan_large_tables(
+    engine: AsyncEngine, seeded_connection, monkeypatch: pytest.MonkeyPatch
+):
+    session = AsyncSession(bind=seeded_connection, join_transaction_mode="create_savepoint", expire_on_commit=False)
+
+    user = await UserRepository(session).get_by_username("seed-1")
+    project = (await session.execute(select(ProjectModel).filter_by(owner_id=user.id).limit(1))).scalar_one()
+    position = (await session.execute(select(PositionModel).filter_by(project_id=project.id).limit(1))).scalar_one()
+    application = (await session.execute(select(ApplicationModel).filter_by(user_id=user.id).limit(1))).scalar_one()
+    pending = (
+        (
+            await session.execute(
+                select(ApplicationModel)
+                .filter_by(message="Seeded application", status=ApplicationStatus.PENDING)
+                .limit(2)
+            )
+        )
+        .scalars()
+        .all()
+    )
+    refresh_token = (await session.execute(select(RefreshTokenModel).filter_by(user_id=user.id))).scalar_one()
+    user_id, user_email, user_hash = user.id, user.email, user.hashed_password
+    project_id, position_id, application_id = project.id, position.id, application.id
+    pending_ids = [pending_application.id for pending_application in pending]
+    family_id, token_hash = refresh_token.family_id, refresh_token.token_hash
+    session.expunge_all()
+
+    # Every public method of the repositories has to be called below, new ones cannot be left out
+    methods = _repository_methods()
+    called = _record_calls(monkeypatch, methods)
+
+    with capture_queries(engine) as statements:
+        users = UserRepository(session)
+        await users.get_by_id(user_id)
+        await users.exists_by_id(user_id)
+        await users.get_by_email(user_email)
+        await users.exists_by_email(user_email)
+        await users.get_by_username("seed-1")
+        await users.exists_by_username("seed-1")
+        await users.replace_password_hash(user_id, user_hash, user_hash)
+        await users.update(user_id, {"username": "seed-1"})
+        new_user = await users.create(
+            UserCreateSchema(email="plans@example.com", username="plans", password=random_lower_string())
+        )
+        new_user_id = new_user.id
+
+        projects = ProjectRepository(session)
+        await projects.get_by_id(project_id)
+        await projects.get_with_positions(project_id)
+        _, cursor = await projects.get_page(limit=10)
+        await projects.get_page(limit=10, after=decode_cursor(cursor))
+        await projects.search(ProjectSearchParams(query="project"), limit=10)
+        await projects.search(ProjectSearchParams(difficulty=Difficulty.EASY, has_vacancies=True), limit=10)
+        # Counts of a word matching every project read them up to the limit, a rare word must use the indexes
+        await projects.count_by_difficulty(ProjectSearchParams(query="1234"))
+        new_project = await projects.create(
+            ProjectCreateSchema(name="Plans", description="Plans", difficulty=Difficulty.HARD), owner_id=new_user_id
+        )
+        new_project_id = new_project.id
+
+        positions = PositionRepository(session)
+        await positions.get_by_id(position_id)
+        await positions.get_by_project_id(project_id, limit=10)
+
+        applications = ApplicationRepository(session)
+        await applications.get_by_id(application_id)
+        await applications.get_all_by_position_id(position_id, ("id", "created_at", "status"), limit=10)
+        await applications.get_all_by_position_id_and_status(position_id, ApplicationStatus.APPROVED)
+        await applications.get_statuses(position_id, pending_ids)
+        await applications.set_statuses(position_id, pending_ids[:1], [])
+        await applications.approve(pending_ids[1])
+        await applications.set_status(application_id, ApplicationStatus.REJECTED)
+        new_application = await applications.create(
+            ApplicationCreateSchema(message="Plans"), position_id=position_id, user_id=new_user_id
+        )
+        await applications.delete(new_application.id)
+
+        access = AccessRepository(session)
+        await access.get_project_owner_id(project_id)
+        await access.get_position_access(position_id, applicant_id=user_id)
+        await access.get_application_access(application_id)
+
+        outbox = OutboxRepository(session)
+        events = await outbox.claim(limit=10)
+        await outbox.retry(events[0][0].id, delay=1, error="Plans")
+        await outbox.bury(events[1][0].id, error="Plans")
+        await outbox.delete([event.id for event, _ in events[2:]])
+
+        tokens = TokenRepository(session)
+        await tokens.use_refresh_token(token_hash)
+        await tokens.create_refresh_token(
+            user_id=user_id,
+            family_id=family_id,
+            token_hash=random_lower_string(),
+            access_jti=uuid4(),
+            access_expires_at=datetime.now(timezone.utc) + timedelta(minutes=5),
+            expires_at=datetime.now(timezone.utc) + timedelta(days=1),
+        )
+        await tokens.revoke_family(family_id, user_id)
+        await tokens.is_revoked(uuid4())
+        await tokens.get_revocations(since=datetime.now(timezone.utc))
+        await tokens.delete_expired()
+
+        await projects.delete(new_project_id)
+        await users.delete(new_user_id)
+
+    # The initial synchronization of a worker reads every revocation that has not expired, i.e. the whole table
+    await TokenRepository(session).get_revocations()
+
+    missing = sorted(f"{owner.__name__}.{name}" for owner, name in methods - called)
+    assert not missing, f"Repository methods without a query plan check: {', '.join(missing)}"
+
+    failures = []
+    for statement, parameters in statements:
+        # Savepoints of the session
+        if not statement.lstrip().upper().startswith(("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")):
+            continue
+        seq_scans = await find_seq_scans(seeded_connection, statement, parameters, MIN_ROWS)
+        if seq_scans:
+            failures.append(f"{statement}\n  -> sequential scan of {', '.join(seq_scans)}")
+
+    assert not failures, "\n\n".join(failures)
@@ -0,0 +1,112 @@
+from typing import Optional
+
+import pytest
+from pydantic import BaseModel, ConfigDict, ValidationError, field_validator, model_validator
+
+from schemas.utils.decorators import Omit, Partial, Pick, omit, pick
+
+
+class _Source(BaseModel):
+    model_config = ConfigDict(str_strip_whitespace=True)
+
+    name: str
+    secret: str
+    count: int = 1
+
+    @field_validator("name")
+    @classmethod
+    def name_must_not_be_admin(cls, value: str) -> str:
+        if value == "admin":
+            raise ValueError("Reserved name")
+        return value
+
+    @field_validator("secret")
+    @classmethod
+    def secret_must_be_long(cls, value: str) -> str:
+        if len(value) < 8:
+            raise ValueError("Too short")
+        return value
+
+    @model_validator(mode="after")
+    def count_must_be_positive(self):
+        if self.count < 1:
+            raise ValueError("Count must be positive")
+        return self
+
+
+def test_derived_models_leave_source_untouched():
+    fields = dict(_Source.model_fields)
+
+    picked = Pick[_Source, "name"]
+    omitted = Omit[_Source, "secret"]
+
+    assert list(picked.model_fields) == ["name"]
+    assert list(omitted.model_fields) == ["name", "count"]
+    assert _Source.model_fields == fields
+
+
+def test_derived_models_are_built_once():
+    assert Pick[_Source, "name", "count"] is Pick[_Source, "count", "name"]
+    assert Omit[_Source, "secret"] is Omit[_Source, "secret"]
+    assert Partial[_Source] is Partial[_Source]
+
+
+def test_derived_models_keep_field_validators_and_config():
+    derived = Omit[_Source, "secret"]
+
+    assert derived(name="  project ").name == "project"
+    with pytest.raises(ValidationError, match="Reserved name"):
+        derived(name="admin")
+    # Model validators may read omitted fields, they are not carried over
+    assert derived(name="project", count=0).count == 0
+
+
+def test_subclasses_of_derived_models_have_their_own_config():
+    class Schema(Pick[_Source, "name"]):
+        model_config = ConfigDict(from_attributes=True)
+
+    class Row:
+        name = " project "
+
+    assert Schema.model_validate(Row()).name == "project"
+
+
+def test_partial_makes_every_field_optional():
+    derived = Partial[_Source]
+
+    empty = derived()
+    assert (empty.name, empty.secret, empty.count) == (None, None, None)
+    assert derived.model_fields["count"].annotation == Optional[int]
+    with pytest.raises(ValidationError, match="Too short"):
+        derived(secret="short")
+
+
+def test_unknown_fields_are_rejected():
+    with pytest.raises(ValueError, match="has no fields: password"):
+        Pick[_Source, "password"]
+
+
+def test_decorator_does_not_mutate_base():
+    @pick("name")
+    class Schema(_Source): ...
+
+    assert Schema.__name__ == "Schema"
+    assert list(Schema.model_fields) == ["name"]
+    assert list(_Source.model_fields) == ["name", "secret", "count"]
+
+
+def test_decorator_rejects_declarations_it_would_drop():
+    with pytest.raises(TypeError, match="declares extra"):
+
+        @omit("secret")
+        class WithField(_Source):
+            extra: int = 0
+
+    with pytest.raises(TypeError, match="declares name_must_be_lower"):
+
+        @pick("name")
+        class WithValidator(_Source):
+            @field_validator("name")
+            @classmethod
+            def name_must_be_lower(cls, value: str) -> str:
+                return value.lower()
@@ -33,4 +33,8 @@ async def create_new_application(
 
 async def set_status(session: AsyncSession, application: ApplicationModel, new_status: ApplicationStatus):
     repository = ApplicationRepository(session)
-    return await repository.update(application.id, {"status": new_status})
+    if new_status == ApplicationStatus.APPROVED:
+        # Approvals have to take a slot of the position
+        approved_application, _ = await repository.approve(application.id)
+        return approved_application
+    return await repository.set_status(application.id, new_status)
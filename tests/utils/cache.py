@@ -0,0 +1,20 @@
+from typing import Dict, Optional
+
+from core.response_cache import CacheBackend
+
+
+class FakeSharedCacheBackend(CacheBackend):
+    """Stands in for a cache shared by several workers, entries never expire"""
+
+    def __init__(self):
+        self.data: Dict[str, bytes] = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self.data.get(key)
+
+    async def set(self, key: str, value: bytes) -> None:
+        assert isinstance(value, bytes)
+        self.data[key] = value
+
+    async def delete(self, key: str) -> None:
+        self.data.pop(key, None)
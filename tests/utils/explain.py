@@ -0,0 +1,41 @@
+import json
+from typing import Any, Dict, Iterator, List
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+
+def _walk(plan: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _walk(child)
+
+
+async def find_seq_scans(connection: AsyncConnection, statement: str, parameters: Any, min_rows: int) -> List[str]:
+    """
+    Run EXPLAIN for the statement and find sequential scans of large tables in its plan.
+
+    :param connection: Connection to the seeded database
+    :param statement: SQL statement exactly as it was sent to the driver
+    :param parameters: Parameters the statement was executed with
+    :param min_rows: Tables with fewer rows than this are allowed to be scanned sequentially
+    :return: Names of the tables that are scanned sequentially
+    """
+    result = await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+    plan = result.scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    seq_scans = []
+    for node in _walk(plan[0]["Plan"]):
+        if node["Node Type"] != "Seq Scan":
+            continue
+
+        relation = node["Relation Name"]
+        rows = await connection.scalar(
+            text("SELECT reltuples FROM pg_class WHERE oid = CAST(:relation AS regclass)"), {"relation": relation}
+        )
+        if rows >= min_rows:
+            seq_scans.append(f"{relation} (~{int(rows)} rows)")
+
+    return seq_scans
@@ -0,0 +1,22 @@
+from typing import Sequence
+from uuid import UUID
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import OutboxEventModel
+
+
+async def get_application_events(session: AsyncSession, application_id: UUID) -> Sequence[OutboxEventModel]:
+    statement = (
+        select(OutboxEventModel)
+        .where(OutboxEventModel.payload["application_id"].astext == str(application_id))
+        .order_by(OutboxEventModel.created_at)
+        .execution_options(populate_existing=True)
+    )
+    return (await session.execute(statement)).scalars().all()
+
+
+async def clear_outbox(session: AsyncSession) -> None:
+    await session.execute(delete(OutboxEventModel))
+    await session.commit()
@@ -0,0 +1,41 @@
+from contextlib import contextmanager
+from typing import Any, Iterator, List, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+@contextmanager
+def capture_queries(engine: AsyncEngine) -> Iterator[List[Tuple[str, Any]]]:
+    """
+    Collect SQL statements executed by the engine inside the block.
+
+    :param engine: The engine to listen to
+    :return: The list of executed statements with their parameters, filled while the block runs
+    """
+    statements: List[Tuple[str, Any]] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+@contextmanager
+def assert_num_queries(engine: AsyncEngine, expected: int) -> Iterator[List[Tuple[str, Any]]]:
+    """
+    Assert that exactly `expected` SQL statements are executed by the engine inside the block.
+
+    :param engine: The engine to listen to
+    :param expected: Expected number of statements
+    """
+    with capture_queries(engine) as statements:
+        yield statements
+
+    assert len(statements) == expected, f"Expected {expected} queries, got {len(statements)}:\n" + "\n\n".join(
+        statement for statement, _ in statements
+    )
@@ -0,0 +1,43 @@
+from typing import Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+
+
+class ReplicaSession(Session):
+    pass
+
+
+class LaggingReplica:
+    """
+    Stands in for a replica that lags behind the primary.
+
+    After `freeze`, sessions of `session_maker` see the database as it was at that moment: their transactions
+    import the snapshot exported by a transaction kept open until `catch_up`.
+    """
+
+    def __init__(self, engine: AsyncEngine):
+        self._engine = engine.execution_options(isolation_level="REPEATABLE READ")
+        self._connection: Optional[AsyncConnection] = None
+        self._snapshot: Optional[str] = None
+        self.session_maker = async_sessionmaker(
+            self._engine, class_=AsyncSession, sync_session_class=ReplicaSession, expire_on_commit=False
+        )
+        event.listen(ReplicaSession, "after_begin", self._import_snapshot)
+
+    def _import_snapshot(self, session, transaction, connection) -> None:
+        if self._snapshot is not None:
+            connection.exec_driver_sql(f"SET TRANSACTION SNAPSHOT '{self._snapshot}'")
+
+    async def freeze(self) -> None:
+        await self.catch_up()
+        self._connection = await self._engine.connect()
+        await self._connection.begin()
+        self._snapshot = await self._connection.scalar(text("SELECT pg_export_snapshot()"))
+
+    async def catch_up(self) -> None:
+        self._snapshot = None
+        if self._connection is not None:
+            await self._connection.close()
+            self._connection = None
@@ -0,0 +1,80 @@
+import asyncio
+from typing import Dict, List, Optional, Tuple
+
+from starlette.types import ASGIApp, Message
+
+
+class EventStream:
+    """
+    Streaming GET request straight against the ASGI app.
+
+    The transport of httpx collects the whole body before returning, which never happens for an event stream.
+    Here every chunk sent by the app is available as soon as it is sent, leaving the block disconnects the client.
+    """
+
+    def __init__(self, app: ASGIApp, path: str, headers: Dict[str, str]):
+        self._app = app
+        self._scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "root_path": "",
+            "query_string": b"",
+            "headers": [(name.lower().encode(), value.encode()) for name, value in headers.items()],
+            "client": ("127.0.0.1", 12345),
+            "server": ("test", 80),
+        }
+        self._disconnected = asyncio.Event()
+        self._request_sent = False
+        self._started = asyncio.Event()
+        self._chunks: asyncio.Queue[bytes] = asyncio.Queue()
+        self.status: Optional[int] = None
+        self.headers: Dict[str, str] = {}
+
+    async def __aenter__(self) -> "EventStream":
+        self._task = asyncio.create_task(self._app(self._scope, self._receive, self._send))
+        await asyncio.wait_for(self._started.wait(), timeout=10)
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self._disconnected.set()
+        await asyncio.wait_for(self._task, timeout=10)
+
+    async def wait_closed(self, timeout: float = 5) -> None:
+        """Wait until the app ends the stream by itself"""
+        await asyncio.wait_for(asyncio.shield(self._task), timeout=timeout)
+
+    async def _receive(self) -> Message:
+        if not self._request_sent:
+            self._request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await self._disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def _send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.status = message["status"]
+            self.headers = {name.decode(): value.decode() for name, value in message["headers"]}
+            self._started.set()
+        elif message["type"] == "http.response.body" and message.get("body"):
+            await self._chunks.put(message["body"])
+
+    async def read_message(self, timeout: float = 5) -> List[Tuple[str, str]]:
+        """Next message of the stream as (field, value) pairs, comments have the empty field name"""
+        chunk = await asyncio.wait_for(self._chunks.get(), timeout=timeout)
+        fields = []
+        for line in chunk.decode().strip("\n").split("\n"):
+            name, _, value = line.partition(":")
+            fields.append((name, value.strip()))
+        return fields
+
+    async def read_event(self, timeout: float = 5) -> Dict[str, str]:
+        """Next event of the stream, comments and the `retry` field are skipped"""
+        while True:
+            fields = dict(await self.read_message(timeout))
+            if "event" in fields:
+                return fields
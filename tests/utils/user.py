@@ -32,6 +32,11 @@ async def create_new_user(session: AsyncSession, email: Optional[str] = None) ->
     return await user_service.create(user_in)
 
 
+def user_password(email: str) -> str:
+    """Password of a user created with `create_new_user`"""
+    return __email_password_mapping[email]
+
+
 async def user_authentication_headers(async_client: AsyncClient, email: str, password: str) -> Dict[str, str]:
     
     """
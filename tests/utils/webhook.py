@@ -0,0 +1,50 @@
+import asyncio
+from collections import deque
+from typing import Any, Deque, Dict, List, Tuple
+
+import orjson
+
+
+class WebhookStub:
+    """
+    Local HTTP server standing in for a webhook receiver.
+
+    Every request is recorded with the status it was answered with. Statuses are taken from `statuses`,
+    requests beyond them are answered with 200.
+    """
+
+    def __init__(self, *statuses: int):
+        self.statuses: Deque[int] = deque(statuses)
+        self.requests: List[Tuple[int, Dict[str, str], Any]] = []
+        self.url = ""
+
+    @property
+    def delivered(self) -> List[Any]:
+        return [body for status, _, body in self.requests if 200 <= status < 300]
+
+    async def __aenter__(self) -> "WebhookStub":
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        host, port = self._server.sockets[0].getsockname()[:2]
+        self.url = f"http://{host}:{port}/events"
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            # Connections are kept alive by the client, one request after another
+            while await reader.readline():
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b""):
+                    name, _, value = line.decode().partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                status = self.statuses.popleft() if self.statuses else 200
+                self.requests.append((status, headers, orjson.loads(body)))
+                writer.write(f"HTTP/1.1 {status} Stub\r\nContent-Length: 0\r\n\r\n".encode())
+                await writer.drain()
+        finally:
+            writer.close()